@@ -0,0 +1,37 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Synthetic data directories the tests run the scripts on (see ``synthetic_corpus``)."""
+
+import pytest
+
+from un_knowledge_extraction.benchmark import prepare_data_dir
+from un_knowledge_extraction.synthetic_corpus import write_data_dir
+
+
+PARAGRAPHS = 100
+
+
+def has_nltk_data(*resources):
+    import nltk
+
+    for resource in resources:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            return False
+    return True
+
+
+@pytest.fixture(scope='session')
+def corpus_data_dir(tmp_path_factory):
+    """Reference files and a synthetic corpus, enough for the resolution level script."""
+    return write_data_dir(str(tmp_path_factory.mktemp('corpus_data')), PARAGRAPHS)
+
+
+@pytest.fixture(scope='session')
+def paragraph_data_dir(tmp_path_factory):
+    """``corpus_data_dir`` plus the stand-in word2vec cache and the compiled reference data of the benchmark."""
+    if not (has_nltk_data('corpora/stopwords') and (has_nltk_data('tokenizers/punkt_tab') or has_nltk_data('tokenizers/punkt'))):
+        pytest.skip('the NLTK stopwords and punkt data are not installed')
+    return prepare_data_dir(str(tmp_path_factory.mktemp('paragraph_data')), PARAGRAPHS, vector_size=50)
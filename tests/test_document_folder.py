@@ -0,0 +1,59 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Rows read from the CSV and JSON output of the document parser (see ``document_parser``)."""
+
+import os
+import shutil
+
+import pytest
+
+from un_knowledge_extraction.document_folder import DOCUMENT_TYPES, DocumentFolderSource, read_document
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'document_parser')
+CSV_DOCUMENT = os.path.join(FIXTURE_DIR, 'csv', 'A_RES_64_1.csv')
+JSON_DOCUMENT = os.path.join(FIXTURE_DIR, 'json', 'A_RES_64_1.pdf.json')
+
+# The rows of A/RES/64/1 after the five metadata lines: the blank paragraph and the empty second clause are
+# skipped without being numbered, the tab and the non-ASCII characters are dropped as by the parser.
+ROWS = [
+    ('A_RES_64_1.pdf', 5, 'Paragraph', 'United Nations'),
+    ('A_RES_64_1.pdf', 6, 'Paragraph', 'A/RES/64/1'),
+    ('A_RES_64_1.pdf', 7, 'Paragraph', 'General Assembly'),
+    ('A_RES_64_1.pdf', 8, 'Session', 'Sixty-fourth session'),
+    ('A_RES_64_1.pdf', 9, 'Paragraph', 'Resolution adopted by the General Assembly on 6 October 2009'),
+    ('A_RES_64_1.pdf', 10, 'Paragraph', 'Noting the "Tripoli Declaration", adopted on 31 August 2009, by the Special '
+                                        'Session of the Assembly of the African Union,'),
+    ('A_RES_64_1.pdf', 11, 'Paragraph', 'Welcoming thecooperation of Cte dIvoire,'),
+    ('A_RES_64_1.pdf', 12, 'AgendaItem', 'Agenda item 12'),
+    ('A_RES_64_1.pdf', 13, 'Header', '64/1. Cooperation between the United Nations and the African Union'),
+    ('A_RES_64_1.pdf', 14, 'Section', 'Decides to include in the provisional agenda of its sixty-fifth session the item '
+                                      'entitled "Cooperation between the United Nations and the African Union".'),
+    ('A_RES_64_1.pdf', 15, 'Clause', 'Requests the Secretary-General to submit a report, in consultation with the '
+                                     'African Union'),
+]
+HEADER_CLAUSE = ('A_RES_64_1.pdf', 16, 'HeaderClause', 'The General Assembly,')
+
+
+@pytest.mark.parametrize('path', [CSV_DOCUMENT, JSON_DOCUMENT])
+def test_rows_of_the_document(path):
+    assert read_document(path) == ROWS
+
+
+@pytest.mark.parametrize('path', [CSV_DOCUMENT, JSON_DOCUMENT])
+def test_header_clauses_keep_their_index(path):
+    assert read_document(path, DOCUMENT_TYPES + ['HeaderClause']) == ROWS + [HEADER_CLAUSE]
+    assert read_document(path, ['Header', 'Clause']) == [row for row in ROWS if row[1] in (12, 13, 15)]
+
+
+def test_source_file_is_read_once(tmp_path):
+    folder = str(tmp_path)
+    shutil.copy(CSV_DOCUMENT, folder)
+    shutil.copy(JSON_DOCUMENT, folder)
+    source = DocumentFolderSource(folder, chunksize=4)
+    with pytest.warns(UserWarning, match='A_RES_64_1.pdf was already extracted'):
+        frames = list(source.chunks())
+    assert len(frames) == 1
+    assert list(frames[0].itertuples(index=False, name=None)) == ROWS
+    assert (source.documents_read, source.documents_skipped) == (2, 1)
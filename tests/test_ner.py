@@ -0,0 +1,38 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Loading of the spaCy model and the ORG entity cache of ``ner``."""
+
+import sys
+import types
+
+import pytest
+
+from un_knowledge_extraction.benchmark import StandInOrgPipeline
+from un_knowledge_extraction.ner import DEFAULT_SPACY_MODEL, OrgEntityExtractor, load_ner_pipeline
+from un_knowledge_extraction.pipeline import build_parser
+
+
+def test_missing_model_names_the_option(monkeypatch):
+    spacy = types.ModuleType('spacy')
+
+    def load(name):
+        raise OSError("[E050] Can't find model '%s'." % name)
+    spacy.load = load
+    monkeypatch.setitem(sys.modules, 'spacy', spacy)
+    with pytest.raises(OSError, match='--spacy-model') as error:
+        load_ner_pipeline(DEFAULT_SPACY_MODEL)
+    assert 'python -m spacy download en_core_web_sm' in str(error.value)
+
+
+def test_default_model_is_a_package_name():
+    assert build_parser().parse_args(['paragraphs']).spacy_model == DEFAULT_SPACY_MODEL == 'en_core_web_sm'
+
+
+def test_cached_texts_skip_the_model(tmp_path):
+    texts = ['Welcomes the work of the World Health Organization', 'Decides to remain seized of the matter']
+    extractor = OrgEntityExtractor('stand-in', nlp=StandInOrgPipeline(), cache_path=str(tmp_path / 'ner.sqlite'))
+    orgs = extractor.extract(texts)
+    assert orgs == [['World Health Organization'], []]
+    assert extractor.extract(texts + texts[:1]) == orgs + orgs[:1]
+    assert (extractor.docs_processed, extractor.cache_hits) == (2, 3)
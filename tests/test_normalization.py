@@ -0,0 +1,92 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""The plain text fast path of ``normalization.word_tokenize`` against the NLTK tokenizer."""
+
+import random
+
+import pytest
+
+nltk = pytest.importorskip('nltk')
+
+from nltk.tokenize import NLTKWordTokenizer  # noqa: E402
+from nltk.tokenize.destructive import MacIntyreContractions  # noqa: E402
+
+from un_knowledge_extraction import normalization  # noqa: E402
+
+
+WORDS = [
+    'General', 'Assembly', 'recalls', 'its', 'resolution', 'of', 'September', 'cannot', 'Cannot', 'gonna',
+    'Wanna', 'gimme', 'lemme', 'gotta', 'more', 'tis', 'd', 'ye', 'self-determination', 'A/RES/70/1', '70/1',
+    '25', '2015', '1,000', '12:30', 'a,b', 'x:y', '(a)', '[b]', '{c}', '<d>', '--', '-', '+', '=', '_', ';',
+    ',', ':',
+]
+SEPARATORS = [' ', ' ', '  ', '\t', '\n', ', ', '; ', ': ', '']
+ENDINGS = ['', '.', '. ', '.)', ').', ' .', ':', ',', ';']
+
+TEXTS = [
+    'Recalls its resolution 70/1 of 25 September 2015, entitled (Transforming our world)',
+    'Decides to include in the provisional agenda of its seventy-first session the item.',
+    'the Secretary-General cannot report on the implementation: 12:30, 1,000 and [more] -- wanna',
+    'Requests the Secretary-General to submit a report; gonna',
+]
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 15))]
+        text = ''.join(word + rng.choice(SEPARATORS) for word in words).strip()
+        yield text + rng.choice(ENDINGS)
+
+
+@pytest.fixture
+def fast_path_only(monkeypatch):
+    """Fail the test when a text meant for the fast path is tokenized by NLTK."""
+    def nltk_word_tokenize(text):
+        raise AssertionError('%r did not take the fast path' % text)
+    monkeypatch.setattr(normalization, 'nltk_word_tokenize', nltk_word_tokenize)
+
+
+def test_contractions_of_the_installed_nltk():
+    tokenizer = NLTKWordTokenizer()
+    assert [regexp.pattern for regexp in normalization._CONTRACTIONS] == MacIntyreContractions.CONTRACTIONS2
+    assert [regexp.pattern for regexp in tokenizer.CONTRACTIONS2] == MacIntyreContractions.CONTRACTIONS2
+    # The fast path skips the other contractions, which plain text cannot match.
+    assert all("'" in regexp.pattern for regexp in tokenizer.CONTRACTIONS3)
+
+
+def test_plain_text_takes_the_fast_path(fast_path_only):
+    for text in TEXTS:
+        assert normalization._SIMPLE_TEXT.match(text)
+        normalization.word_tokenize(text)
+
+
+def test_other_text_goes_through_nltk():
+    for text in ['He said "yes".', "the Council's report", 'First sentence. Second sentence', 'Why?', 'e.g. this']:
+        assert not normalization._SIMPLE_TEXT.match(text)
+
+
+def test_fast_path_matches_the_nltk_word_tokenizer(fast_path_only):
+    tokenizer = NLTKWordTokenizer()
+    simple_texts = [text for text in random_texts(20000) if normalization._SIMPLE_TEXT.match(text)]
+    assert len(simple_texts) > 10000
+    for text in TEXTS + simple_texts:
+        # A plain text is a single sentence, which nltk.word_tokenize gives to this tokenizer.
+        assert normalization.word_tokenize(text) == tokenizer.tokenize(text), text
+
+
+def _has_punkt():
+    for resource in ['tokenizers/punkt_tab', 'tokenizers/punkt']:
+        try:
+            nltk.data.find(resource)
+            return True
+        except LookupError:
+            pass
+    return False
+
+
+@pytest.mark.skipif(not _has_punkt(), reason='the NLTK punkt data is not installed')
+def test_fast_path_matches_nltk_word_tokenize():
+    for text in TEXTS + [text for text in random_texts(2000, seed=1) if normalization._SIMPLE_TEXT.match(text)]:
+        assert normalization.word_tokenize(text) == nltk.word_tokenize(text), text
@@ -0,0 +1,119 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""``OrganizationFilter`` against the ORG candidate screen of the original script."""
+
+import os
+import random
+
+from un_knowledge_extraction.org_filter import OrganizationFilter, SubstringIndex
+from un_knowledge_extraction.reference_data import read_lines
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data')
+
+KNOWN_ORGS = [
+    'United Nations Development Programme',
+    'United Nations Children\'s Fund',
+    'World Health Organization',
+    'Economic and Social Council',
+    'Human Rights Council',
+    'Security Council',
+    'International Court of Justice',
+    'Office of the United Nations High Commissioner for Refugees',
+    'Food and Agriculture Organization of the United Nations',
+    'Peacebuilding Commission',
+    'UN-Women',
+    'Secretariat',
+]
+
+STOP_WORDS = ['the', 'of', 'and', 'a', 'to', 'in', 'for', 'on', 'by', 'with', 'its', 'all']
+
+WORDS = ['United', 'Nations', 'Programme', 'Development', 'Council', 'Fund', 'Committee', 'Organization', 'Goals',
+         'Agenda', 'Office', 'Regional', 'Commission', 'Africa', 'Bank', 'World', 'Health', 'Human', 'Rights',
+         'Security', 'Court', 'Justice', 'Refugees', 'Union', 'African', 'Peacebuilding', 'Women', 'for', 'and',
+         'the', 'of', 'Recommends', 'Accepts', 'Recalling', 'recalling', 'noting', 'Secretariat', 'Outcome']
+
+
+def original_screen(extracted_orgs, known_un_org_list, stop_words, key_words_un_org_list, key_words_not_un_org_list,
+                    operative_verb_list, preambular_verb_list):
+    """``Organization_Names_not_from_known_orginal`` of the original resolution loop."""
+    Organization_Names_not_from_known_orginal = []
+    for org in extracted_orgs:
+        if (
+                len(org.split()) > 1
+                and (org not in known_un_org_list)
+                and (not org.lower().split()[-1] in stop_words)
+                and ((not any(key_word.lower() in org.lower() for key_word in key_words_not_un_org_list)) or (any(key_word.lower() in org.lower() for key_word in key_words_un_org_list)))
+                and (max([org.lower() in known_org.lower() for known_org in known_un_org_list]) == False)  # noqa: E712
+                and (max([org.lower().split()[0] in [word for word in operative_verb_list if word.endswith('s')]]) == 0)
+                and (max([word in preambular_verb_list for word in org.lower().split()]) == 0)
+                and (' of the ' not in org)
+                ):
+            Organization_Names_not_from_known_orginal.append(org)
+        elif (
+                len(org.split()) > 1
+                and (org not in known_un_org_list)
+                and (not org.lower().split()[-1] in stop_words)
+                and ((not any(key_word.lower() in org.lower() for key_word in key_words_not_un_org_list)) or (any(key_word.lower() in org.lower() for key_word in key_words_un_org_list)))
+                and (max([org.lower() in known_org.lower() for known_org in known_un_org_list]) == False)  # noqa: E712
+                and (max([org.lower().split()[0] in [word for word in operative_verb_list if word.endswith('s')]]) == 0)
+                and (max([word in preambular_verb_list for word in org.lower().split()]) == 0)
+                and (' of the ' in org)
+                ):
+            org_split = org.split(' of the ')
+            if (org_split[0] not in known_un_org_list) and (len(org_split[0].split()) > 1) and (org_split[1] in known_un_org_list):
+                Organization_Names_not_from_known_orginal.append(org_split[0])
+            elif (org_split[0] in known_un_org_list) and (org_split[1] not in known_un_org_list) and (len(org_split[1].split()) > 1):
+                Organization_Names_not_from_known_orginal.append(org_split[1])
+            elif (org_split[0] not in known_un_org_list) and (org_split[1] not in known_un_org_list):
+                Organization_Names_not_from_known_orginal.append(org)
+    return Organization_Names_not_from_known_orginal
+
+
+def reference_lists():
+    return (
+            KNOWN_ORGS,
+            STOP_WORDS,
+            read_lines(os.path.join(DATA_DIR, 'key_words_un_org_list.txt')),
+            read_lines(os.path.join(DATA_DIR, 'key_words_not_un_org_list.txt')),
+            read_lines(os.path.join(DATA_DIR, 'operative_verb_list.txt')),
+            read_lines(os.path.join(DATA_DIR, 'preambular_verb_list.txt')),
+            )
+
+
+def random_candidates(count, seed=0):
+    """ORG candidates: random word runs, known organizations, their parts and ``X of the Y`` combinations."""
+    rng = random.Random(seed)
+    parts = KNOWN_ORGS + [' '.join(org.split()[:2]) for org in KNOWN_ORGS] + [org.lower() for org in KNOWN_ORGS]
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.5:
+            yield ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))
+        elif choice < 0.7:
+            yield rng.choice(parts)
+        else:
+            first = rng.choice(parts + [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))])
+            second = rng.choice(parts + [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))])
+            yield '%s of the %s' % (first, second)
+
+
+def test_screen_matches_the_original_loop():
+    lists = reference_lists()
+    organization_filter = OrganizationFilter(*lists)
+    candidates = list(random_candidates(20000))
+    kept = 0
+    for org in candidates:
+        expected = original_screen([org], *lists)
+        assert organization_filter.screen(org) == expected, org
+        kept += bool(expected)
+    assert 1000 < kept < len(candidates) - 1000
+
+
+def test_substring_index():
+    texts = ['united nations development programme', 'security council', 'un-women']
+    index = SubstringIndex(texts)
+    for pattern in ['nations development', 'council', 'un', 'n', '', 'women', 'security council']:
+        assert pattern in index
+    for pattern in ['nations council', 'programme security', 'xyz', 'womenx']:
+        assert pattern not in index
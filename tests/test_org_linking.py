@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""``OrganizationLinker`` against the organization linking loop of the original script."""
+
+import random
+
+import numpy as np
+import pytest
+
+from un_knowledge_extraction.benchmark import StandInWord2Vec
+from un_knowledge_extraction.normalization import word_tokenize
+from un_knowledge_extraction.org_linking import OrganizationLinker
+
+spatial = pytest.importorskip('scipy.spatial')
+
+
+# Plain text names, tokenized without the NLTK punkt data (see test_normalization).
+KNOWN_ORGS = [
+    'United Nations Development Programme',
+    'United Nations Environment Programme',
+    'United Nations Population Fund',
+    'World Health Organization',
+    'World Food Programme',
+    'Economic and Social Council',
+    'Human Rights Council',
+    'Security Council',
+    'International Court of Justice',
+    'International Labour Organization',
+    'Office of the United Nations High Commissioner for Refugees',
+    'Peacebuilding Commission',
+    'UN-Women',
+]
+
+WORDS = ['United', 'Nations', 'Programme', 'Development', 'Council', 'Fund', 'Regional', 'Commission', 'Africa',
+         'World', 'Health', 'Human', 'Rights', 'Court', 'Justice', 'Labour', 'Refugees', 'Union', 'African', 'Bank',
+         'Office', 'for', 'and', 'of', 'the', 'national', 'UN-Women', 'Xyzzy']
+
+
+class Word2Vec(StandInWord2Vec):
+    """Stand-in vectors with the ``vocab`` of gensim < 4, as read by the linker; ``Xyzzy`` has no vector."""
+
+    def __init__(self):
+        StandInWord2Vec.__init__(self, vector_size=50, missing=('a', 'and', 'of', 'to', 'xyzzy'))
+        self.vocab = self.key_to_index
+
+
+def original_link(orgs, known_orgs, w2v_google):
+    """``Organization_Names_not_from_known_inferred`` of the original resolution loop."""
+    inferred = []
+    for org in orgs:
+        tokenized_word = word_tokenize(org)
+        tokenized_word_lower = word_tokenize(org.lower())
+        words_in_vocab_lower = [word for word in tokenized_word_lower if word in w2v_google.vocab]
+        if (len(words_in_vocab_lower) >= 1):
+            org_w2v = np.sum(w2v_google[words_in_vocab_lower], axis=0)
+        else:
+            org_w2v = np.asarray([])
+        common_words_length = []
+        w2v_similarity = []
+        for known_org in known_orgs:
+            known_org_tokenized_word = word_tokenize(known_org)
+            known_org_tokenized_word_lower = word_tokenize(known_org.lower())
+            known_org_words_in_vocab_lower = [word for word in known_org_tokenized_word_lower if word in w2v_google.vocab]
+            if len(known_org_words_in_vocab_lower) >= 1:
+                known_org_w2v = np.sum(w2v_google[known_org_words_in_vocab_lower], axis=0)
+            else:
+                known_org_w2v = np.asarray([])
+
+            common_words = [word for word in tokenized_word if (word in known_org_tokenized_word and word[0].isupper())]
+            common_words_length.append(len(common_words))
+            if ((len(org_w2v) == 0) or (len(known_org_w2v) == 0)):
+                w2v_similarity.append(0)
+            else:
+                w2v_similarity.append(1 - spatial.distance.cosine(org_w2v, known_org_w2v))
+
+        if (max(common_words_length) == 0):
+            inferred.append((org, org))
+        else:
+            if (len([l for l in common_words_length if l == max(common_words_length)]) == 1):  # noqa: E741
+                known_org_index = common_words_length.index(max(common_words_length))
+                similarity_score = w2v_similarity[known_org_index]
+                known_org = known_orgs[known_org_index]
+                inferred.append((org, known_org, similarity_score))
+            else:
+                known_org_index = [i for i, x in enumerate(common_words_length) if x == max(common_words_length)]
+                max_similarity_score = max([w2v_similarity[index] for index in known_org_index])
+                max_similarity_known_org_index = w2v_similarity.index(max_similarity_score)
+                known_org = known_orgs[max_similarity_known_org_index]
+                inferred.append((org, known_org, max_similarity_score))
+    return inferred
+
+
+def random_resolutions(count, seed=0):
+    """``(orgs, known_orgs)`` of resolutions: unknown word runs and a subset of the known organizations."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        orgs = sorted(set(' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+                          for _ in range(rng.randint(1, 6))))
+        known_orgs = rng.sample(KNOWN_ORGS, rng.randint(1, 6))
+        yield orgs, known_orgs
+
+
+def test_link_matches_the_original_loop():
+    w2v = Word2Vec()
+    linker = OrganizationLinker(KNOWN_ORGS, w2v)
+    linked = 0
+    for orgs, known_orgs in random_resolutions(500):
+        expected = original_link(orgs, known_orgs, w2v)
+        inferred = linker.link(orgs, known_orgs)
+        assert [entry[:2] for entry in inferred] == [entry[:2] for entry in expected], (orgs, known_orgs)
+        for entry, expected_entry in zip(inferred, expected):
+            if len(expected_entry) == 3:
+                linked += 1
+                assert entry[2] == pytest.approx(expected_entry[2], abs=1e-6)
+    assert linked > 250
+
+
+def test_link_without_known_orgs():
+    linker = OrganizationLinker(KNOWN_ORGS, Word2Vec())
+    assert linker.link(['African Union'], []) == []
+    assert linker.link([], ['Security Council']) == []
+
+
+def test_known_orgs_outside_the_known_list():
+    w2v = Word2Vec()
+    linker = OrganizationLinker(KNOWN_ORGS[:4], w2v)
+    for orgs, known_orgs in random_resolutions(100, seed=1):
+        expected = original_link(orgs, known_orgs + known_orgs[:1], w2v)
+        inferred = linker.link(orgs, known_orgs + known_orgs[:1])
+        assert [entry[:2] for entry in inferred] == [entry[:2] for entry in expected], (orgs, known_orgs)
+
+
+def test_only_the_last_unknown_names_are_kept():
+    linker = OrganizationLinker(KNOWN_ORGS, Word2Vec(), memo_size=10)
+    capitalized_index = {token: list(rows) for token, rows in linker._capitalized_index.items()}
+    for orgs, known_orgs in random_resolutions(100, seed=2):
+        linker.link(orgs, known_orgs)
+    assert linker._capitalized_index == capitalized_index
+    assert len(linker._memo) == 10
+    vectors = [vector for vector in linker._vectors if vector is not None and vector is not False]
+    vectors += [vector for _, vector in linker._memo.values() if vector is not None]
+    assert vectors and all(vector.dtype == np.float32 for vector in vectors)
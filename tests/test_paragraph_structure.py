@@ -0,0 +1,106 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""``ParagraphTypeClassifier`` against the first action verb and paragraph type loop of the original script."""
+
+import os
+import random
+
+import pandas as pd
+
+from un_knowledge_extraction.paragraph_structure import ParagraphTypeClassifier
+from un_knowledge_extraction.reference_data import read_lines
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data')
+
+FILLER = ['the', 'general', 'assembly', 'its', 'resolution', 'report', 'of', 'and', 'on', 'states', 'secretary-general']
+
+
+def original_classify(rows, preambular_verb_list, operative_verb_list):
+    """``First_Action_Verb`` and ``Paragraph_Type`` of the original loop for the ``(Type, Content, tokenized_word)`` rows.
+
+    The rows are those of one document, whose look-back does not reach the
+    rows of the document before.
+    """
+    frame = pd.DataFrame({'First_Action_Verb': [''] * len(rows), 'Paragraph_Type': [''] * len(rows)})
+    for index, (Type, Content, tokenized_word) in enumerate(rows):
+        if Type == 'Paragraph' and len(tokenized_word) >= 10:
+            first_action_verb = ''
+            try:
+                first_action_verb = next(word for word in tokenized_word[:10] if word in preambular_verb_list + operative_verb_list)
+            except Exception:
+                pass
+            if Content[0].islower() == False:  # noqa: E712
+                frame.loc[index, 'First_Action_Verb'] = first_action_verb
+            if first_action_verb in preambular_verb_list and Content[0].islower() == False:  # noqa: E712
+                frame.loc[index, 'Paragraph_Type'] = 'preambular'
+            elif first_action_verb in operative_verb_list and Content[0].islower() == False:  # noqa: E712
+                frame.loc[index, 'Paragraph_Type'] = 'operative'
+            elif Content[0].islower() == True:  # noqa: E712
+                previous_paragraph_types = list(frame.Paragraph_Type[max(index - 5, 0):max(index - 1, 0)])
+                previous_paragraph_types_non_empty = [x for x in previous_paragraph_types if x != '']
+                if len(previous_paragraph_types_non_empty) >= 1:
+                    frame.loc[index, 'Paragraph_Type'] = previous_paragraph_types_non_empty[-1]
+    return frame['First_Action_Verb'].tolist(), frame['Paragraph_Type'].tolist()
+
+
+def random_document(verbs, rng):
+    """``(Type, text, tokens)`` rows of a document of headers and paragraphs, some continuing the one before."""
+    rows = []
+    for _ in range(rng.randint(1, 30)):
+        Type = rng.choice(['Paragraph', 'Paragraph', 'Paragraph', 'Header'])
+        tokens = []
+        for _ in range(rng.choice([3, 9, 10, 12, 20])):
+            tokens.append(rng.choice(verbs) if rng.random() < 0.1 else rng.choice(FILLER))
+        if rng.random() < 0.5:
+            tokens.insert(rng.randint(0, 12), rng.choice(verbs))
+        text = ' '.join(tokens)
+        # A paragraph starting with a lowercase letter continues an earlier one.
+        text = text if rng.random() < 0.3 else text[0].upper() + text[1:]
+        rows.append((Type, text, tokens))
+    return rows
+
+
+def test_classify_document_matches_the_original_loop():
+    preambular_verb_list = read_lines(os.path.join(DATA_DIR, 'preambular_verb_list.txt'))
+    operative_verb_list = read_lines(os.path.join(DATA_DIR, 'operative_verb_list.txt'))
+    classifier = ParagraphTypeClassifier(preambular_verb_list, operative_verb_list)
+    verbs = sorted(set(preambular_verb_list + operative_verb_list))
+    rng = random.Random(0)
+    continued = 0
+    for _ in range(300):
+        rows = random_document(verbs, rng)
+        First_Action_Verb, Paragraph_Type = original_classify(rows, preambular_verb_list, operative_verb_list)
+        assert list(classifier.classify_document(rows)) == list(zip(First_Action_Verb, Paragraph_Type)), rows
+        continued += sum(1 for (Type, text, tokens), paragraph_type in zip(rows, Paragraph_Type)
+                         if paragraph_type and text[0].islower())
+    assert continued > 100
+
+
+def test_verbs_of_both_lists_are_preambular():
+    classifier = ParagraphTypeClassifier(['noting'], ['noting', 'decides'])
+    tokens = 'noting with appreciation the report of the secretary-general on the item'.split()
+    assert classifier.first_action_verb(tokens) == ('noting', 'preambular')
+    assert classifier.first_action_verb(['the'] * 10 + ['decides']) == ('', '')
+
+
+def test_classify_orders_the_rows_of_each_document():
+    classifier = ParagraphTypeClassifier(['recalling'], ['decides'])
+    long_text = ' of the general assembly on the item and the report'
+    frame = pd.DataFrame({
+            'SourceFile': ['b.pdf', 'a.pdf', 'b.pdf', 'a.pdf'],
+            'Index': [6, 5, 5, 6],
+            'Type': ['Paragraph'] * 4,
+            })
+    texts = ['and' + long_text, 'Decides' + long_text, 'Recalling' + long_text, 'and' + long_text]
+
+    class Normalized:
+        def __init__(self, text):
+            self.text = text
+            self.tokens = text.lower().split()
+
+    First_Action_Verb, Paragraph_Type = classifier.classify(frame, [Normalized(text) for text in texts])
+    assert First_Action_Verb == ['', 'decides', 'recalling', '']
+    # A continuation looks back at the rows p-5 to p-2, none in a document of two rows.
+    assert Paragraph_Type == ['', 'operative', 'preambular', '']
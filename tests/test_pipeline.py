@@ -0,0 +1,45 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""The importable runs of ``pipeline`` on an output directory that does not exist yet."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from un_knowledge_extraction.benchmark import STAND_IN_MODEL, StandInOrgPipeline
+from un_knowledge_extraction.ingestion import CORPUS_FILE
+from un_knowledge_extraction.pipeline import main, run_paragraph_level, run_resolution_level
+
+
+def test_resolution_level_creates_the_output_dir(corpus_data_dir, tmp_path):
+    output_dir = str(tmp_path / 'new' / 'output')
+    path = run_resolution_level(corpus_data_dir, output_dir, 'parquet')
+    corpus = pd.read_csv(os.path.join(corpus_data_dir, CORPUS_FILE), usecols=['SourceFile'])
+    assert list(pd.read_parquet(path)['SourceFile']) == list(corpus['SourceFile'].drop_duplicates())
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_paragraph_level_creates_the_output_dir(paragraph_data_dir, tmp_path, incremental):
+    output_dir = str(tmp_path / 'new' / 'output')
+    run_paragraph_level(paragraph_data_dir, output_dir, 'parquet', incremental=incremental,
+                        spacy_model=STAND_IN_MODEL, ner_pipeline=StandInOrgPipeline())
+    corpus = pd.read_csv(os.path.join(paragraph_data_dir, CORPUS_FILE))
+    UN_DOCS_Paragraphs = pd.read_parquet(os.path.join(output_dir, 'output_UN_DOCS_paragraph_level.parquet'))
+    assert len(UN_DOCS_Paragraphs.index) == len(corpus.index)
+    assert os.path.exists(os.path.join(output_dir, 'citation_graph.json'))
+
+
+@pytest.mark.parametrize('run', [run_resolution_level, run_paragraph_level])
+@pytest.mark.parametrize('output_format', ['jsonl', 'excel'])
+def test_partitions_need_parquet(run, output_format, tmp_path):
+    with pytest.raises(ValueError, match='parquet'):
+        run(str(tmp_path / 'data'), str(tmp_path / 'output'), output_format, partition_by_year=True)
+    assert not os.path.exists(str(tmp_path / 'output'))
+
+
+def test_command_line_rejects_partitions_without_parquet(capsys):
+    with pytest.raises(SystemExit):
+        main(['resolutions', '--output-format', 'jsonl', '--partition-by-year'])
+    assert '--partition-by-year needs --output-format parquet' in capsys.readouterr().err
@@ -0,0 +1,85 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Incremental paragraph level runs against fresh runs of the same corpus."""
+
+import json
+import os
+import shutil
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from un_knowledge_extraction.benchmark import STAND_IN_MODEL, StandInOrgPipeline
+from un_knowledge_extraction.ingestion import CORPUS_FILE
+from un_knowledge_extraction.output import output_path
+from un_knowledge_extraction.pipeline import PARTITION_COLUMN, reference_data_kwargs, run_paragraph_level
+from un_knowledge_extraction.reference_data import ReferenceData
+from un_knowledge_extraction.result_store import ResultStore, resolution_keys
+
+
+STORE_FILE = 'paragraph_level_results.sqlite'
+
+
+def run(data_dir, output_dir, partition_by_year, incremental, **kwargs):
+    run_paragraph_level(data_dir, output_dir, 'parquet', partition_by_year=partition_by_year, incremental=incremental,
+                        spacy_model=STAND_IN_MODEL, ner_pipeline=StandInOrgPipeline(), **kwargs)
+    partition_by = PARTITION_COLUMN if partition_by_year else None
+    UN_DOCS_Paragraphs = pd.read_parquet(output_path(output_dir, 'output_UN_DOCS_paragraph_level', 'parquet', partition_by))
+    if partition_by_year:
+        # The partitions are read back as a category column, one directory after the other.
+        UN_DOCS_Paragraphs[partition_by] = UN_DOCS_Paragraphs[partition_by].astype(str)
+        UN_DOCS_Paragraphs = UN_DOCS_Paragraphs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+    return json.loads(UN_DOCS_Paragraphs.to_json(orient='records'))
+
+
+def recomputed(capsys):
+    return int(capsys.readouterr().out.split('recomputed ')[-1].split()[0])
+
+
+@pytest.mark.parametrize('partition_by_year', [False, True])
+def test_incremental_run_matches_a_fresh_run(paragraph_data_dir, tmp_path, capsys, partition_by_year):
+    data_dir = str(tmp_path / 'data')
+    shutil.copytree(paragraph_data_dir, data_dir)
+    corpus = pd.read_csv(os.path.join(data_dir, CORPUS_FILE))
+    source_files = corpus['SourceFile'].unique()
+    output_dir = str(tmp_path / 'incremental')
+
+    run(data_dir, output_dir, partition_by_year, incremental=True)
+    assert recomputed(capsys) == len(source_files)
+
+    # One paragraph of the second resolution names another organization.
+    row = corpus.index[(corpus['SourceFile'] == source_files[1]) & (corpus['Type'] == 'Paragraph')][2]
+    corpus.loc[row, 'Content'] = corpus.loc[row, 'Content'] + ', and welcomes the work of the World Health Organization'
+    corpus.to_csv(os.path.join(data_dir, CORPUS_FILE), index=False)
+    incremental = run(data_dir, output_dir, partition_by_year, incremental=True)
+    assert recomputed(capsys) == 1
+    assert incremental == run(data_dir, str(tmp_path / 'fresh'), partition_by_year, incremental=False)
+
+    # Another SDG keyword mode changes the fingerprint: every resolution is recomputed and only its entries are kept.
+    run(data_dir, output_dir, partition_by_year, incremental=True, sdg_keyword_mode='all')
+    assert recomputed(capsys) == len(source_files)
+    fingerprint = ReferenceData(**reference_data_kwargs(data_dir, output_dir, spacy_model=STAND_IN_MODEL,
+                                                        sdg_keyword_mode='all')).fingerprint
+    connection = sqlite3.connect(os.path.join(output_dir, STORE_FILE))
+    try:
+        assert dict(connection.execute('SELECT SourceFile, key FROM resolutions')) == resolution_keys(corpus, fingerprint)
+    finally:
+        connection.close()
+
+
+def test_new_fingerprint_clears_the_store(tmp_path):
+    path = str(tmp_path / STORE_FILE)
+    store = ResultStore(path, 'a')
+    key = store.paragraph_key('Paragraph', 'Decides to remain seized of the matter')
+    store.put_paragraph_results('target_similarity', {key: [0.5, 0.25]})
+    assert ResultStore(path, 'a').get_paragraph_results('target_similarity', [key]) == {key: [0.5, 0.25]}
+
+    store = ResultStore(path, 'b')
+    assert store.get_paragraph_results('target_similarity', [key, store.paragraph_key('Paragraph', 'Decides')]) == {}
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute('SELECT COUNT(*) FROM paragraphs').fetchone() == (0,)
+    finally:
+        connection.close()
@@ -0,0 +1,114 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""The rules of ``Data/sdg_keyword_rules.json`` against the ``elif`` chain of the original script."""
+
+import os
+import random
+
+from un_knowledge_extraction.sdg_keywords import (SDG_KEYWORD_RULES_FILE, SDGKeywordRules, load_sdg_keyword_rules,
+                                                  rules_from_high_frequency_words)
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data')
+
+FILLER = ['the', 'general', 'assembly', 'recalls', 'its', 'resolution', 'on', 'and', 'of', 'report', 'states']
+
+
+def original_keyword_sdg(tokenized_word, Content):
+    """The keyword SDG of the original paragraph loop; ``Content`` is lowercased."""
+    if any(x in tokenized_word for x in ['poverty', 'poor']):
+        return ['No Poverty']
+    elif any(x in Content for x in ['hunger', 'hungry', 'malnutrition', 'food crisis', 'sufficient food', 'food producers', 'food production', 'food reserves', 'food price', 'food insecurity', 'food security', 'undernutrition']):
+        return ['Zero Hunger']
+    elif any(x in tokenized_word for x in ['health', 'well-being', 'mortality', 'disease']):
+        return ['Good Health and Well-Being']
+    elif any(x in tokenized_word for x in ['education', 'educational']):
+        return ['Quality Education']
+    elif any(x in tokenized_word for x in ['gender equality']):
+        return ['Gender Equality']
+    elif any(x in tokenized_word for x in ['water', 'sanitation', 'wastewater']):
+        return ['Clean Water and Sanitation']
+    elif any(x in tokenized_word for x in ['energy', 'renewable']):
+        return ['Affordable and Clean Energy']
+    elif any(x in tokenized_word for x in ['labour-intensive', 'employment']) or any(x in Content for x in ['child labour', 'labour rights', 'decent work', 'economic growth', 'economic productivity']):
+        return ['Decent Work and Economic Growth']
+    elif any(x in tokenized_word for x in ['industry', 'innovation', 'infrastructure']):
+        return ['Industry, Innovation and Infrastructure']
+    elif any(x in tokenized_word for x in ['inequalities', 'inequality']) and (not any(x in Content for x in ['gender equality'])):
+        return ['Reduced Inequalities']
+    elif 'sustainable cities' in Content:
+        return ['Sustainable Cities and Communities']
+    elif any(x in Content for x in ['consumption and production']):
+        return ['Responsible Consumption and Production']
+    elif any(x in Content for x in ['climate change', 'climate-related', 'natural disaster', 'national disaster', 'local disaster']):
+        return ['Climate Action']
+    elif any(x in tokenized_word for x in ['marine', 'fisheries', 'coastal']) or any(x in Content for x in ['oceans and seas']):
+        return ['Life Below Water']
+    elif any(x in tokenized_word for x in ['biodiversity', 'land ', 'inland', 'species']):
+        return ['Life on Land']
+    elif 'institutions' in tokenized_word and any(x in tokenized_word for x in ['peace', 'justice', 'strong']):
+        return ['Peace, Justice and Strong Institutions']
+    elif any(x in tokenized_word for x in ['partner', 'partners', 'partnership', 'partnerships']):
+        return ['Partnerships for the Goals']
+    return []
+
+
+def rule_words(rules):
+    words = set()
+    for rule in rules:
+        for key in ['tokens', 'phrases', 'required_tokens', 'excluded_phrases']:
+            for phrase in rule[key]:
+                words.update(phrase.split())
+    return sorted(words)
+
+
+def random_paragraphs(rules, count, seed=0):
+    """``(tokens, text)`` of paragraphs made of rule words, whole phrases and filler words."""
+    rng = random.Random(seed)
+    words = rule_words(rules)
+    phrases = sorted(set(phrase for rule in rules for key in ['phrases', 'excluded_phrases'] for phrase in rule[key]))
+    for _ in range(count):
+        tokens = []
+        for _ in range(rng.randint(1, 12)):
+            choice = rng.random()
+            if choice < 0.15:
+                tokens.extend(rng.choice(phrases).split())
+            elif choice < 0.3:
+                tokens.append(rng.choice(words))
+            else:
+                tokens.append(rng.choice(FILLER))
+        yield tokens, ' '.join(tokens)
+
+
+def test_rules_file_matches_the_original_chain():
+    rules = load_sdg_keyword_rules(os.path.join(DATA_DIR, SDG_KEYWORD_RULES_FILE))
+    engine = SDGKeywordRules(rules, mode='first')
+    matched = 0
+    for tokens, text in random_paragraphs(rules, 20000):
+        expected = original_keyword_sdg(tokens, text)
+        assert engine.match(frozenset(tokens), text) == expected, text
+        matched += bool(expected)
+    assert matched > 5000
+
+
+def test_phrases_match_inside_words():
+    # The original chain searched the phrases anywhere in the text, inside longer words too.
+    engine = SDGKeywordRules(load_sdg_keyword_rules(os.path.join(DATA_DIR, SDG_KEYWORD_RULES_FILE)))
+    text = 'the malnutritional status of children'
+    assert engine.match(frozenset(text.split()), text) == original_keyword_sdg(text.split(), text) == ['Zero Hunger']
+
+
+def test_all_mode_starts_with_the_first_rule():
+    rules = load_sdg_keyword_rules(os.path.join(DATA_DIR, SDG_KEYWORD_RULES_FILE))
+    first = SDGKeywordRules(rules, mode='first')
+    every = SDGKeywordRules(rules, mode='all')
+    for tokens, text in random_paragraphs(rules, 2000, seed=1):
+        token_set = frozenset(tokens)
+        assert every.match(token_set, text)[:1] == first.match(token_set, text)
+
+
+def test_high_frequency_rules():
+    rules = rules_from_high_frequency_words({'Quality Education': [('education', 12), ('learning', 1)], 'Other': []},
+                                            min_count=2)
+    assert [(rule['sdg'], rule['tokens']) for rule in rules] == [('Quality Education', ['education'])]
@@ -0,0 +1,181 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""``SDGSimilarityEngine`` against the ``Common_Substring`` target and indicator loop of the original script."""
+
+import difflib
+import os
+import random
+
+import numpy as np
+import pytest
+
+from un_knowledge_extraction.benchmark import StandInWord2Vec
+from un_knowledge_extraction.reference_data import read_sdg_targets_indicators
+from un_knowledge_extraction.sdg_similarity import SDGSimilarityEngine
+
+spatial = pytest.importorskip('scipy.spatial')
+nltk_tokenize = pytest.importorskip('nltk.tokenize')
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Data')
+
+STOP_WORDS = ['the', 'of', 'and', 'a', 'to', 'in', 'for', 'on', 'by', 'with', 'all', 'its', 'at', 'as', 'or']
+
+FILLER = ['the', 'general', 'assembly', 'recalls', 'its', 'resolution', 'report', 'of', 'and', 'on', 'member',
+          'states', 'secretary-general', 'decides', 'to', 'include', 'item', 'provisional', 'agenda']
+
+# The target texts have periods and dollar signs, which nltk.word_tokenize sends to the punkt sentence
+# splitter; both sides use the word tokenizer alone so the test runs without the punkt data.
+tokenize = nltk_tokenize.NLTKWordTokenizer().tokenize
+
+
+class Word2Vec(StandInWord2Vec):
+    """Stand-in vectors with the ``vocab`` of gensim < 4, as read by the engine."""
+
+    def __init__(self):
+        StandInWord2Vec.__init__(self, vector_size=50)
+        self.vocab = self.key_to_index
+
+
+def Common_Substring(string1, string2):
+    substrings = []
+    matches = difflib.SequenceMatcher(None, string1, string2).get_matching_blocks()
+    for match in sorted(matches, key=lambda x: x[2], reverse=True):
+        substrings.append(string1[match.a:match.a + match.size])
+    return substrings
+
+
+def isalpha(text):
+    tokenized_word = tokenize(text.lower().replace('\t', ' '))
+    tokenized_word = [word for word in tokenized_word if len(word) > 1]
+    return [word for word in tokenized_word if word.isalpha()]
+
+
+def original_scores(paragraph, contents, w2v_google):
+    """Similarity of ``paragraph`` with every target (or indicator) of ``contents``, as in the original loop."""
+    tokenized_word = isalpha(paragraph)
+    paragraph_isalpha = ' '.join(tokenized_word)
+    similarity_with_common_substring = []
+    for content in contents:
+        content_isalpha = ' '.join(isalpha(content))
+        words_in_vocab = [word for word in content_isalpha.split() if word in w2v_google.vocab]
+        w2v_content = np.sum(w2v_google[words_in_vocab], axis=0)
+        common_substring = Common_Substring(paragraph_isalpha, content_isalpha)
+        if len(common_substring) == 0:
+            similarity_with_common_substring.append(0.0)
+        else:
+            words_common_substring = ' '.join(common_substring[:3]).split()
+            words_common_substring = [word for word in words_common_substring if word in tokenized_word]
+            words_common_substring_in_vocab = [word for word in words_common_substring if word in w2v_google.vocab]
+            if len(words_common_substring_in_vocab) >= 1:
+                w2v_common_substring = np.sum(w2v_google[words_common_substring_in_vocab], axis=0)
+                similarity_with_common_substring.append(1 - spatial.distance.cosine(w2v_content, w2v_common_substring))
+            else:
+                similarity_with_common_substring.append(len(words_common_substring) / len(content_isalpha.split()))
+    return similarity_with_common_substring
+
+
+def original_decision(target_scores, indicator_scores, Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict,
+                      similarity_threshold_target=0.9, similarity_threshold_indicator=0.9):
+    """``(Closest_Target, Closest_Indicator, SDG)`` of the original loop."""
+    similar_target_index = [i for i, similarity in enumerate(target_scores) if similarity >= similarity_threshold_target]
+    similar_indicator_index = [i for i, similarity in enumerate(indicator_scores) if similarity >= similarity_threshold_indicator]
+    if (len(similar_target_index) >= 1) and (max(target_scores) >= max(indicator_scores)):
+        most_similar_target = Targets[target_scores.index(max(target_scores))]
+        return most_similar_target, None, Targets_SDG_dict[most_similar_target]
+    elif (len(similar_indicator_index) >= 1) and (max(target_scores) <= max(indicator_scores)):
+        most_similar_indicator = Indicators[indicator_scores.index(max(indicator_scores))]
+        return None, most_similar_indicator, Indicators_SDG_dict[most_similar_indicator]
+    return None, None, None
+
+
+def sdg_catalog():
+    SDG_Targets_Indicators = read_sdg_targets_indicators(DATA_DIR)
+    targets = SDG_Targets_Indicators.loc[SDG_Targets_Indicators.Type == 'Targets']
+    indicators = SDG_Targets_Indicators.loc[SDG_Targets_Indicators.Type == 'Indicators']
+    return (list(targets['Content'].drop_duplicates()), list(indicators['Content'].drop_duplicates()),
+            dict(zip(targets['Content'], targets['SDG'])), dict(zip(indicators['Content'], indicators['SDG'])))
+
+
+def random_paragraphs(contents, count, seed=0):
+    """Paragraphs of filler words, parts of targets and indicators and, now and then, a whole one."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            choice = rng.random()
+            content = rng.choice(contents)
+            if choice < 0.25:
+                parts.append(content)
+            elif choice < 0.6:
+                words = content.split()
+                start = rng.randrange(len(words))
+                parts.append(' '.join(words[start:start + rng.randint(1, 6)]))
+            else:
+                parts.append(' '.join(rng.choice(FILLER) for _ in range(rng.randint(1, 8))))
+        yield rng.choice(['Recalls ', 'Decides that ', '']) + ', '.join(parts) + rng.choice(['', '.', ';'])
+
+
+def test_unpruned_engine_matches_the_original_loop():
+    Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict = sdg_catalog()
+    w2v = Word2Vec()
+    engine = SDGSimilarityEngine(Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict, w2v, prune=False,
+                                 stop_words=STOP_WORDS, tokenize=tokenize)
+    paragraphs = list(random_paragraphs(Targets + Indicators, 40))
+    matched = 0
+    for paragraph, match in zip(paragraphs, engine.match(paragraphs, batch_size=16)):
+        target_scores = original_scores(paragraph, Targets, w2v)
+        indicator_scores = original_scores(paragraph, Indicators, w2v)
+        assert match.target_score == pytest.approx(max(target_scores), abs=1e-6), paragraph
+        assert match.indicator_score == pytest.approx(max(indicator_scores), abs=1e-6), paragraph
+        decision = original_decision(target_scores, indicator_scores, Targets, Indicators, Targets_SDG_dict,
+                                     Indicators_SDG_dict)
+        best = max(target_scores + indicator_scores)
+        closest = ([Targets[i] for i, score in enumerate(target_scores) if score > best - 1e-6]
+                   + [Indicators[i] for i, score in enumerate(indicator_scores) if score > best - 1e-6])
+        if len(closest) > 1 and decision[2] is not None:
+            # Targets or indicators quoted in full all score 1 up to the float32 rounding of the word vectors,
+            # which alone decides between them; any of them is the closest.
+            assert (match.closest_target or match.closest_indicator) in closest, paragraph
+        else:
+            assert (match.closest_target, match.closest_indicator, match.sdg) == decision, paragraph
+        matched += decision[2] is not None
+    assert matched > 5
+
+
+def test_pruned_scores_are_the_unpruned_scores_of_the_candidates():
+    Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict = sdg_catalog()
+    w2v = Word2Vec()
+    engines = [SDGSimilarityEngine(Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict, w2v, prune=prune,
+                                   stop_words=STOP_WORDS, tokenize=tokenize) for prune in [True, False]]
+    batch = [isalpha(paragraph) for paragraph in random_paragraphs(Targets + Indicators, 20, seed=1)]
+    for catalog in ['targets', 'indicators']:
+        pruned, full = [engine._score_catalog(getattr(engine, catalog), batch) for engine in engines]
+        for tokens, pruned_scores, full_scores in zip(batch, pruned, full):
+            candidates = getattr(engines[0], catalog).candidates(tokens)
+            assert len(candidates) < len(full_scores)
+            expected = np.zeros(len(full_scores))
+            expected[candidates] = full_scores[candidates]
+            np.testing.assert_allclose(pruned_scores, expected, atol=1e-9)
+
+
+def test_ties_go_to_the_target_and_the_first_entry():
+    # The same words as a target, an indicator and a second target.
+    text = 'By 2030, achieve universal and equitable access to safe and affordable drinking water for all'
+    Targets = [text, 'Strengthen the means of implementation', text + '.']
+    Indicators = ['Proportion of population using safely managed drinking water services', text]
+    Targets_SDG_dict = {Targets[0]: 'Clean Water and Sanitation', Targets[1]: 'Partnerships for the Goals',
+                        Targets[2]: 'No Poverty'}
+    Indicators_SDG_dict = {Indicators[0]: 'Clean Water and Sanitation', Indicators[1]: 'Zero Hunger'}
+    w2v = Word2Vec()
+    for prune in [True, False]:
+        engine = SDGSimilarityEngine(Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict, w2v, prune=prune,
+                                     stop_words=STOP_WORDS, tokenize=tokenize)
+        match, = engine.match([text])
+        target_scores = original_scores(text, Targets, w2v)
+        indicator_scores = original_scores(text, Indicators, w2v)
+        assert max(target_scores) == pytest.approx(max(indicator_scores))
+        assert (match.closest_target, match.closest_indicator, match.sdg) == original_decision(
+                target_scores, indicator_scores, Targets, Indicators, Targets_SDG_dict, Indicators_SDG_dict)
+        assert match.closest_target == text and match.sdg == 'Clean Water and Sanitation'
@@ -0,0 +1,4 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Reusable building blocks for the UN resolution knowledge extraction scripts."""
@@ -0,0 +1,318 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Offline benchmark of the resolution and paragraph level scripts.
+
+For every scale (number of paragraphs) the benchmark writes a data directory
+with a synthetic corpus (see ``synthetic_corpus``), a word2vec cache of
+``StandInWord2Vec`` vectors and the compiled reference data, then runs each
+script in a new process, so the peak memory of one run does not carry over to
+the next, with ``StandInOrgPipeline`` in place of the spaCy model::
+
+    python -m un_knowledge_extraction.benchmark --scales 1000 10000 100000
+
+Nothing is downloaded: the stand-in models derive their output from hashes
+of the words and from capitalization, so the same corpus always gives the
+same vectors and entities. The NLTK tokenizer and stop word data have to be
+installed as for the scripts.
+
+The stage totals of the metrics files of the runs (see ``instrumentation``)
+plus one ``run`` record per script with its wall time and peak memory are
+written to ``benchmark_results.json``. Given a baseline (``--save-baseline``
+stores the results as one), every stage whose time or RSS growth, and every
+run whose peak memory, grew by more than ``--tolerance`` is flagged as a
+regression and the command exits with status 1.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import shutil
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from .instrumentation import peak_rss_mb
+from .reference_bundle import source_hashes
+from .synthetic_corpus import DEFAULT_SOURCE_DIR, write_data_dir
+
+
+DEFAULT_SCALES = [1000, 10000, 100000]
+DEFAULT_WORK_DIR = './benchmark/'
+RESULTS_FILE = 'benchmark_results.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+SCRIPTS = ['resolutions', 'paragraphs']
+STAND_IN_MODEL = 'stand-in'
+
+_DATA_STAMP_FILE = 'benchmark_data.json'
+
+
+class _StandInVocab:
+
+    def __init__(self, missing):
+        self.missing = missing
+
+    def __contains__(self, word):
+        return word not in self.missing
+
+
+class StandInWord2Vec:
+    """Deterministic word vectors in place of the GoogleNews model.
+
+    The vector of a word is drawn from a random generator seeded with the
+    CRC-32 of the word. Like the GoogleNews model, it has no vectors for
+    ``a``, ``and``, ``of`` and ``to``.
+    """
+
+    def __init__(self, vector_size=300, missing=('a', 'and', 'of', 'to')):
+        self.vector_size = vector_size
+        self.key_to_index = _StandInVocab(frozenset(missing))
+
+    def _vector(self, word):
+        if word not in self.key_to_index:
+            raise KeyError("word '%s' not in vocabulary" % word)
+        rng = np.random.RandomState(zlib.crc32(word.encode('utf-8')))
+        return rng.standard_normal(self.vector_size).astype(np.float32)
+
+    def __getitem__(self, words):
+        if isinstance(words, str):
+            return self._vector(words)
+        return np.vstack([self._vector(word) for word in words]).reshape(len(words), self.vector_size)
+
+
+# Runs of capitalized words, possibly joined by lowercase function words, as in
+# "Office of the United Nations High Commissioner for Refugees".
+_ORG_SPAN = re.compile(r"[A-Z][\w'-]*(?:(?: (?:of|for|and|on|in|the))* [A-Z][\w'-]*)+")
+
+
+class _StandInSpan:
+
+    label_ = 'ORG'
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+
+class _StandInDoc:
+
+    def __init__(self, text):
+        self.ents = [_StandInSpan(match.group(0)) for match in _ORG_SPAN.finditer(text)]
+
+
+class StandInOrgPipeline:
+    """Stand-in for the spaCy pipeline: every run of two or more capitalized words is an ``ORG``."""
+
+    meta = {'name': 'stand_in_org', 'version': '1'}
+    pipe_names = ['ner']
+
+    def pipe(self, texts, batch_size=32, n_process=1):
+        for text in texts:
+            yield _StandInDoc(text)
+
+
+def prepare_data_dir(data_dir, paragraphs, source_dir=DEFAULT_SOURCE_DIR, seed=0, vector_size=300):
+    """Write the synthetic corpus, stand-in word2vec cache and reference data bundle of one scale.
+
+    A data directory prepared before with the same options and reference
+    files is reused.
+    """
+    from .embeddings import build_embedding_cache, corpus_vocabulary
+    from .reference_bundle import compile_reference_data
+    from .reference_data import REFERENCE_FILES
+    from .sdg_keywords import SDG_KEYWORD_RULES_FILE
+
+    stamp = {
+            'paragraphs': paragraphs,
+            'seed': seed,
+            'vector_size': vector_size,
+            'sources': source_hashes({name: os.path.join(source_dir, name)
+                                      for name in REFERENCE_FILES + [SDG_KEYWORD_RULES_FILE]}),
+            }
+    stamp_path = os.path.join(data_dir, _DATA_STAMP_FILE)
+    if os.path.exists(stamp_path):
+        with open(stamp_path, encoding='utf-8') as f:
+            if json.load(f) == stamp:
+                return data_dir
+        shutil.rmtree(data_dir)
+
+    write_data_dir(data_dir, paragraphs, source_dir, seed)
+    build_embedding_cache(StandInWord2Vec(vector_size), corpus_vocabulary(data_dir), os.path.join(data_dir, 'w2v_cache'),
+                          source='%s-%d' % (STAND_IN_MODEL, vector_size))
+    compile_reference_data(data_dir=data_dir)
+    with open(stamp_path, 'w', encoding='utf-8') as f:
+        json.dump(stamp, f, indent=2)
+    return data_dir
+
+
+def _run_script(script, data_dir, output_dir, output_format, workers, result_path):
+    from .pipeline import run_paragraph_level, run_resolution_level
+
+    metrics_path = os.path.join(output_dir, '%s_metrics.jsonl' % script)
+    start = time.perf_counter()
+    if script == 'resolutions':
+        run_resolution_level(data_dir, output_dir, output_format, metrics_path=metrics_path)
+    else:
+        run_paragraph_level(data_dir, output_dir, output_format, workers=workers, metrics_path=metrics_path,
+                            spacy_model=STAND_IN_MODEL, ner_pipeline=StandInOrgPipeline())
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump({'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}, f)
+
+
+def run_script(script, data_dir, output_dir, output_format='parquet', workers=1):
+    """Run ``script`` on ``data_dir`` in a new process; its stage records and one ``run`` record."""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    result_path = os.path.join(output_dir, 'benchmark_run.json')
+    process = multiprocessing.get_context('spawn').Process(
+            target=_run_script, args=(script, data_dir, output_dir, output_format, workers, result_path))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError('benchmark run of the %s script on %s failed with exit code %s'
+                           % (script, data_dir, process.exitcode))
+    with open(result_path, encoding='utf-8') as f:
+        run = json.load(f)
+
+    records = dict()
+    with open(os.path.join(output_dir, '%s_metrics.jsonl' % script), encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.pop('chunk') == 'total':
+                records[record['stage']] = record
+    rows = records['output']['rows'] if 'output' in records else 0
+    # The run record of the metrics file has the peak of the worker processes as well.
+    peaks = [peak for peak in [run['peak_rss_mb'], records.get('run', dict()).get('peak_rss_mb')] if peak is not None]
+    records['run'] = {'stage': 'run', 'seconds': run['seconds'], 'rows': rows,
+                      'rows_per_sec': rows / run['seconds'] if run['seconds'] > 0 else None,
+                      'peak_rss_mb': max(peaks) if peaks else None}
+    return records
+
+
+def run_benchmark(scales=DEFAULT_SCALES, work_dir=DEFAULT_WORK_DIR, source_dir=DEFAULT_SOURCE_DIR, seed=0,
+                  vector_size=300, output_format='parquet', workers=1, repeat=1, scripts=SCRIPTS):
+    """Stage records of every script at every scale, each the fastest of ``repeat`` runs."""
+    results = []
+    for scale in scales:
+        data_dir = prepare_data_dir(os.path.join(work_dir, 'data_%d' % scale), scale, source_dir, seed, vector_size)
+        for script in scripts:
+            fastest = dict()
+            for _ in range(repeat):
+                records = run_script(script, data_dir, os.path.join(work_dir, 'output_%d' % scale), output_format, workers)
+                for stage, record in records.items():
+                    if stage not in fastest or record['seconds'] < fastest[stage]['seconds']:
+                        fastest[stage] = record
+            for record in fastest.values():
+                results.append(dict(record, scale=scale, script=script))
+            print('%d paragraphs, %s: %.1f s' % (scale, script, fastest['run']['seconds']))
+    return results
+
+
+def _environment():
+    import pandas as pd
+
+    return {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            }
+
+
+def find_regressions(records, baseline_records, tolerance=0.25, min_seconds=0.05, min_mb=16.0):
+    """Stages of ``records`` slower or using more memory than in ``baseline_records`` by more than ``tolerance``.
+
+    The memory of a stage is its RSS growth, the one of a ``run`` its peak
+    RSS. Differences below ``min_seconds`` or ``min_mb`` are ignored as noise.
+    """
+    baseline = {(record['scale'], record['script'], record['stage']): record for record in baseline_records}
+    regressions = []
+    for record in records:
+        base = baseline.get((record['scale'], record['script'], record['stage']))
+        if base is None:
+            continue
+        for metric, noise in [('seconds', min_seconds), ('rss_growth_mb', min_mb), ('peak_rss_mb', 0.0)]:
+            current, previous = record.get(metric), base.get(metric)
+            if current is None or previous is None:
+                continue
+            if current > previous * (1 + tolerance) and current - previous > noise:
+                regressions.append({'scale': record['scale'], 'script': record['script'], 'stage': record['stage'],
+                                    'metric': metric, 'baseline': previous, 'current': current})
+    return regressions
+
+
+def format_results(records, regressions=()):
+    flagged = {(r['scale'], r['script'], r['stage']) for r in regressions}
+    lines = ['%9s  %-11s  %-24s  %10s  %12s  %9s  %9s' % ('scale', 'script', 'stage', 'seconds', 'rows/s', 'RSS +MB',
+                                                          'peak MB')]
+    for record in records:
+        lines.append('%9d  %-11s  %-24s  %10.3f  %12s  %9s  %9s%s' % (
+                record['scale'], record['script'], record['stage'], record['seconds'],
+                '%.0f' % record['rows_per_sec'] if record.get('rows_per_sec') is not None else '',
+                '%+.0f' % record['rss_growth_mb'] if record.get('rss_growth_mb') is not None else '',
+                '%.0f' % record['peak_rss_mb'] if record.get('peak_rss_mb') is not None else '',
+                '  REGRESSION' if (record['scale'], record['script'], record['stage']) in flagged else ''))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the extraction scripts on synthetic corpora.')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='paragraphs of the synthetic corpora (default: %s)' % ' '.join(map(str, DEFAULT_SCALES)))
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR,
+                        help='directory of the data, outputs and results (default: %s)' % DEFAULT_WORK_DIR)
+    parser.add_argument('--source-dir', default=DEFAULT_SOURCE_DIR,
+                        help='directory of the reference files (default: the Data directory of the repository)')
+    parser.add_argument('--scripts', nargs='+', choices=SCRIPTS, default=SCRIPTS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vector-size', type=int, default=300, help='size of the stand-in word vectors (default: 300)')
+    parser.add_argument('--output-format', default='parquet')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes of the paragraph level script')
+    parser.add_argument('--repeat', type=int, default=1, help='runs of every script, the fastest is kept (default: 1)')
+    parser.add_argument('--results', default=None, help='results file (default: <work-dir>/%s)' % RESULTS_FILE)
+    parser.add_argument('--baseline', default=None, help='baseline results (default: <work-dir>/%s)' % BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative growth of a time or peak memory flagged as regression (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    results_path = args.results or os.path.join(args.work_dir, RESULTS_FILE)
+    baseline_path = args.baseline or os.path.join(args.work_dir, BASELINE_FILE)
+    options = {'seed': args.seed, 'vector_size': args.vector_size, 'output_format': args.output_format,
+               'workers': args.workers, 'repeat': args.repeat}
+
+    records = run_benchmark(args.scales, args.work_dir, args.source_dir, args.seed, args.vector_size,
+                            args.output_format, args.workers, args.repeat, args.scripts)
+    regressions = []
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['options'] != options:
+            print('baseline %s was run with other options: %s' % (baseline_path, baseline['options']))
+        regressions = find_regressions(records, baseline['records'], args.tolerance)
+
+    results = {'environment': _environment(), 'options': options, 'records': records, 'regressions': regressions}
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        shutil.copyfile(results_path, baseline_path)
+
+    print(format_results(records, regressions))
+    for regression in regressions:
+        print('regression: %(scale)d paragraphs, %(script)s, %(stage)s: %(metric)s %(baseline).3f -> %(current).3f'
+              % regression)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Referenced resolutions of the paragraphs and the citation graph they form.
+
+``extract_citations`` finds the resolutions a paragraph refers to with
+patterns compiled once at import, turns month names into numbers in a single
+substitution and reads the number and the date of every reference with one
+match.
+
+``CitationGraph`` indexes the references of the whole corpus both ways,
+resolution -> referenced resolutions and resolution -> citing resolutions,
+as dictionaries, so ``references('70/1')`` and ``cited_by('70/1')`` are
+single lookups. It is saved as JSON next to the paragraph level output and
+can be queried from the command line::
+
+    python -m un_knowledge_extraction.citations ./UN_Knowledge_Extraction/output/citation_graph.json --cited-by 70/1
+"""
+
+import argparse
+import json
+import re
+
+from .resolution_level import extract_resolution_metadata
+
+
+CITATION_GRAPH_FILE = 'citation_graph.json'
+
+_NUMBER = r'\w*-*\d+[/]*[.]*\d+\s*\(*\w*-*\w*\)*'
+_DATE = r'[0-9]{1,2} [A-Za-z]{3,9} [0-9]{4}'
+
+REFERENCED_RESOLUTIONS = re.compile('|'.join([
+    r'resolutions {n} .* and all subsequent related resolutions',
+    r'resolutions {n} of {d}.* and {n} of {d}',
+    r'resolutions {n} and {n} of {d}',
+    r'resolution {n} of {d}',
+    r'resolutions {n}.* and \w*-*\d+[/]*\d+\s*\(*\w*-*\w*\)* of {d}',
+    r'resolutions {n}.* and \w*-*\d+[/]*\d+\s*\(*\w*-*\w*\)*',
+    r'resolution \w*-*\d+[/]*[.]*\d+ \(\w*-*\w*\)',
+    r'resolution \w*-*\d+[/]*[.]*\d+',
+]).replace('{n}', _NUMBER).replace('{d}', _DATE))
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+_MONTH = re.compile(' (%s) ' % '|'.join(MONTHS))
+_MONTH_NUMBERS = {month: '/%02d/' % (i + 1) for i, month in enumerate(MONTHS)}
+
+_SEPARATOR = re.compile(',|and')
+
+# Tried in order on every part of a reference; group 1 is the resolution
+# number, group 2 the date (empty when the part has none).
+_NUMBER_DATE = [
+    re.compile(r'resolution\w* (.*) of ([0-9]{1,2}/[0-9]{2}/[0-9]{4})'),
+    re.compile(r'\s*(.*) of ([0-9]{1,2}/[0-9]{2}/[0-9]{4})'),
+    re.compile(r'resolution\w* (.*)()'),
+    re.compile(r'(%s)()' % _NUMBER),
+]
+
+
+def extract_citations(text):
+    """``(references, {resolution number: date or 'NA'})`` of the resolutions ``text`` refers to."""
+    references = REFERENCED_RESOLUTIONS.findall(text)
+    dates = dict()
+    for reference in references:
+        reference = _MONTH.sub(lambda match: _MONTH_NUMBERS[match.group(1)], reference)
+        for part in _SEPARATOR.split(reference):
+            for pattern in _NUMBER_DATE:
+                match = pattern.search(part)
+                if match:
+                    dates[match.group(1).strip()] = match.group(2) or 'NA'
+                    break
+    return references, dates
+
+
+def resolution_id(number):
+    """Key of a resolution number in the citation graph: ``number`` with collapsed whitespace."""
+    return ' '.join(str(number).split())
+
+
+class CitationGraph:
+    """Citing resolution -> cited resolution -> date, indexed in both directions."""
+
+    def __init__(self, references=None):
+        self._references = dict()
+        self._cited_by = dict()
+        for citing, cited in (references or dict()).items():
+            self.set_references(citing, cited)
+
+    def __len__(self):
+        return len(self._references)
+
+    def set_references(self, citing, cited):
+        """Replace the references of ``citing`` by ``cited`` (``{resolution number: date or None}``)."""
+        citing = resolution_id(citing)
+        for previous in self._references.pop(citing, dict()):
+            self._cited_by[previous].pop(citing, None)
+            if not self._cited_by[previous]:
+                del self._cited_by[previous]
+        cited = {resolution_id(number): date for number, date in cited.items() if resolution_id(number)}
+        self._references[citing] = cited
+        for number, date in cited.items():
+            self._cited_by.setdefault(number, dict())[citing] = date
+
+    def references(self, number):
+        """``{resolution number: date}`` of the resolutions ``number`` refers to."""
+        return dict(self._references.get(resolution_id(number), dict()))
+
+    def cited_by(self, number):
+        """``{resolution number: date}`` of the resolutions referring to ``number``, with the date they give it."""
+        return dict(self._cited_by.get(resolution_id(number), dict()))
+
+    def add_paragraphs(self, UN_DOCS_Paragraphs):
+        """Add the ``Referenced_Resolutions_Dates`` of whole resolutions, keyed by their resolution number.
+
+        Resolutions without a number found in their header are keyed by ``SourceFile``.
+        """
+        numbers = extract_resolution_metadata(UN_DOCS_Paragraphs)
+        numbers = dict(zip(numbers['SourceFile'], numbers['Resolutuion_Number']))
+        cited = dict()
+        for SourceFile, dates in zip(UN_DOCS_Paragraphs['SourceFile'].tolist(),
+                                     UN_DOCS_Paragraphs['Referenced_Resolutions_Dates'].tolist()):
+            references = cited.setdefault(SourceFile, dict())
+            for number, date in (dates or dict()).items():
+                references[number] = None if date == 'NA' else date
+        for SourceFile, references in cited.items():
+            self.set_references(numbers.get(SourceFile) or SourceFile, references)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'references': self._references}, f, ensure_ascii=False, sort_keys=True)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['references'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the citation graph written by the paragraph level extraction.')
+    parser.add_argument('graph', help='path of ' + CITATION_GRAPH_FILE)
+    parser.add_argument('--cited-by', metavar='NUMBER', help='resolutions referring to NUMBER')
+    parser.add_argument('--references', metavar='NUMBER', help='resolutions NUMBER refers to')
+    args = parser.parse_args()
+
+    graph = CitationGraph.load(args.graph)
+    if args.cited_by:
+        result = graph.cited_by(args.cited_by)
+    elif args.references:
+        result = graph.references(args.references)
+    else:
+        parser.error('one of --cited-by or --references is required')
+    for number, date in sorted(result.items()):
+        print(number, date or '')
+
+
+if __name__ == '__main__':
+    main()
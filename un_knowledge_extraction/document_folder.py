@@ -0,0 +1,281 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Streaming ingestion of the per-document output of the document parser.
+
+In local storage mode ``tools/document-processor`` writes one file per parsed
+document to its output folder: ``<name>.csv`` with ``OutputFileFormat``
+``csv`` (``ExtractAsCsvFormat``, one ``SourceFile,Index,Content,Type`` line
+per part of the document) or ``<name>.pdf.json`` with ``json``
+(``ExtractAsJsonFormat``, the ``paragraphs``, ``headers`` and ``sections``
+of the document keyed by their character offset, and its ``clauses``).
+
+``DocumentFolderSource`` reads such a folder straight into the rows of the
+corpus file (``SourceFile``, ``Index``, ``Type``, ``Content``), so parsed
+documents can be extracted without merging them into
+``UN_RES_DOCS_2009_2018.csv`` first. Only the ``Paragraph``, ``Header``,
+``Section`` and ``Clause`` parts are kept by default; the metadata rows, the
+full ``Text`` and the header clauses are dropped. The document parser has no
+``Session`` or ``AgendaItem`` type, so parts reading ``Sixty-fourth session``
+or ``Agenda item 12`` are given those types for the resolution level script.
+
+The order of the CSV output is authoritative, as the CSV has no offsets to
+restore the document order from: the paragraphs of a document come first,
+then its headers, sections, clauses and header clauses, each in the order of
+the parser, numbered by ``Index`` after the five metadata lines. Parts of a
+JSON document are put in that order, given the ``Index`` the CSV writer would
+give them and cleaned like it does (``CleanTextFromNonAsciiChar``), so both
+formats give the same rows.
+
+Files are read by a bounded pool of threads, in file name order, and yielded
+in frames of about ``chunksize`` rows holding whole documents, like
+``iter_resolution_chunks``. With ``watch=True`` the folder is polled for new
+files until interrupted (or ``idle_timeout`` seconds without a new file); a
+file is only read once it has not changed for ``settle_seconds``, as the
+parser does not write its files atomically. Every file and every
+``SourceFile`` is read once, as the rows already written cannot be replaced:
+a file rewritten after it was read is not read again, and a file of a
+``SourceFile`` already read is skipped with a warning. Restart the run to
+extract them again.
+"""
+
+import json
+import os
+import re
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import pandas as pd
+
+from .ingestion import DEFAULT_CHUNKSIZE, compact_dtypes
+
+
+DOCUMENT_TYPES = ['Paragraph', 'Header', 'Section', 'Clause']
+DOCUMENT_EXTENSIONS = ('.csv', '.json')
+DEFAULT_READER_THREADS = 4
+
+# Keys of the JSON output and the ``Type`` of their parts in the CSV output, in the order of the CSV output.
+_JSON_PARTS = [('paragraphs', 'Paragraph'), ('headers', 'Header'), ('sections', 'Section')]
+_JSON_CLAUSES = [('clauses', 'Clause'), ('headerClauses', 'HeaderClause')]
+# ``Index`` of the first part in the CSV output, after the blob URI, agreement number, file type, time stamp and text.
+_FIRST_PART_INDEX = 5
+
+_ESCAPE_SEQUENCES = re.compile('[\a\b\t\r\v\f\x1b\x01\x15]')
+_NON_ASCII = re.compile('[^\x00-\x7f]+')
+_WHITE_SPACE = re.compile(r'\s+')
+
+SESSION = re.compile(r'^[A-Z][a-z]+(?:-[a-z]+)? (?:special |emergency special )?session$')
+AGENDA_ITEM = re.compile(r'^Agenda items? \d')
+
+
+def clean_parser_text(text):
+    """``text`` as cleaned by the ``CleanTextFromNonAsciiChar`` of the document parser."""
+    if not text:
+        return ''
+    text = _NON_ASCII.sub('', _ESCAPE_SEQUENCES.sub('', text))
+    return _WHITE_SPACE.sub(' ', text).strip()
+
+
+def row_type(Type, Content):
+    """``Type`` of a part, ``Session`` or ``AgendaItem`` for the parts that name them."""
+    if Type in ('Header', 'Paragraph'):
+        if SESSION.match(Content):
+            return 'Session'
+        if AGENDA_ITEM.match(Content):
+            return 'AgendaItem'
+    return Type
+
+
+def read_csv_document(path, types=DOCUMENT_TYPES):
+    """``(SourceFile, Index, Type, Content)`` rows of a CSV file of the document parser.
+
+    The parser quotes ``Content`` without escaping the quotes inside it, so
+    the lines are split on their first two and last comma instead of being
+    read as CSV.
+    """
+    rows = []
+    with open(path, encoding='utf-8-sig') as f:
+        next(f, None)
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            SourceFile, Index, rest = line.split(',', 2)
+            Content, Type = rest.rsplit(',', 1)
+            if Type not in types:
+                continue
+            if len(Content) >= 2 and Content[0] == '"' and Content[-1] == '"':
+                Content = Content[1:-1]
+            if Content:
+                rows.append((SourceFile, int(Index), row_type(Type, Content), Content))
+    return rows
+
+
+def read_json_document(path, types=DOCUMENT_TYPES):
+    """``(SourceFile, Index, Type, Content)`` rows of a JSON file of the document parser, as in its CSV output."""
+    with open(path, encoding='utf-8-sig') as f:
+        document = json.load(f)
+    SourceFile = document.get('fileName') or os.path.basename(path)[:-len('.json')]
+    # The parts of each kind keep the order of the file, the insertion order of the parser's dictionaries.
+    parts = []
+    for key, Type in _JSON_PARTS:
+        parts.extend((Type, text) for text in (document.get(key) or dict()).values())
+    for key, Type in _JSON_CLAUSES:
+        parts.extend((Type, clause.get('Content')) for clause in document.get(key) or [])
+    rows = []
+    Index = _FIRST_PART_INDEX
+    for Type, text in parts:
+        Content = clean_parser_text(text)
+        if not Content:
+            # The CSV writer skips empty parts without numbering them.
+            continue
+        if Type in types:
+            rows.append((SourceFile, Index, row_type(Type, Content), Content))
+        Index += 1
+    return rows
+
+
+def read_document(path, types=DOCUMENT_TYPES):
+    if path.endswith('.json'):
+        return read_json_document(path, types)
+    return read_csv_document(path, types)
+
+
+def list_documents(folder):
+    """Paths of the CSV and JSON files of ``folder``, sorted by name."""
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.endswith(DOCUMENT_EXTENSIONS) and os.path.isfile(os.path.join(folder, name))]
+
+
+def _frame(rows, start):
+    frame = pd.DataFrame(rows, columns=['SourceFile', 'Index', 'Type', 'Content'],
+                         index=pd.RangeIndex(start, start + len(rows)))
+    frame['Index'] = frame['Index'].astype('int32')
+    return compact_dtypes(frame)
+
+
+class DocumentFolderSource:
+    """The documents of a document parser output folder, read in chunks of whole documents."""
+
+    def __init__(self, folder, chunksize=DEFAULT_CHUNKSIZE, threads=DEFAULT_READER_THREADS, types=DOCUMENT_TYPES,
+                 usecols=None, watch=False, poll_interval=5.0, settle_seconds=2.0, idle_timeout=None):
+        if not os.path.isdir(folder):
+            raise ValueError('%s is not a directory' % folder)
+        self.folder = folder
+        self.chunksize = chunksize
+        self.threads = threads
+        self.types = list(types)
+        self.usecols = usecols
+        self.watch = watch
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.idle_timeout = idle_timeout
+        self.documents_read = 0
+        self.documents_listed = 0
+        self.documents_skipped = 0
+        self._seen = set()
+        self._source_files = set()
+        self._next_row = 0
+        self._chunks = None
+
+    @property
+    def fraction(self):
+        """Fraction of the listed documents read; ``None`` in watch mode."""
+        if self.watch:
+            return None
+        return self.documents_read / self.documents_listed if self.documents_listed else 1.0
+
+    def _new_documents(self):
+        """Paths of the files not read yet that have settled."""
+        now = time.time()
+        paths = []
+        for path in list_documents(self.folder):
+            if path in self._seen:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if self.watch and now - stat.st_mtime < self.settle_seconds:
+                continue
+            self._seen.add(path)
+            paths.append(path)
+        return paths
+
+    def _document_rows(self, path, rows):
+        """``rows`` of the document ``path``, or none if its ``SourceFile`` was already read."""
+        source_files = set(row[0] for row in rows)
+        repeated = source_files & self._source_files
+        if repeated:
+            self.documents_skipped += 1
+            warnings.warn('skipping %s, %s was already extracted' % (path, ', '.join(sorted(repeated))))
+            return []
+        self._source_files |= source_files
+        return rows
+
+    def _read(self, executor, paths):
+        """Frames of about ``chunksize`` rows of the documents of ``paths``.
+
+        At most twice as many files as there are threads are read ahead of the
+        document being yielded.
+        """
+        rows = []
+        paths = iter(paths)
+        pending = deque((path, executor.submit(read_document, path, self.types))
+                        for path in islice(paths, 2 * self.threads))
+        while pending:
+            path, future = pending.popleft()
+            rows.extend(self._document_rows(path, future.result()))
+            self.documents_read += 1
+            path = next(paths, None)
+            if path is not None:
+                pending.append((path, executor.submit(read_document, path, self.types)))
+            if len(rows) >= self.chunksize:
+                yield self._emit(rows)
+                rows = []
+        if rows:
+            yield self._emit(rows)
+
+    def _emit(self, rows):
+        frame = _frame(rows, self._next_row)
+        self._next_row += len(rows)
+        if self.usecols is not None:
+            frame = frame[[column for column in frame.columns if column in self.usecols]]
+        return frame
+
+    def chunks(self):
+        self._chunks = self._iter_chunks()
+        return self._chunks
+
+    def _iter_chunks(self):
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            paths = self._new_documents()
+            self.documents_listed += len(paths)
+            for frame in self._read(executor, paths):
+                yield frame
+            if not self.watch:
+                return
+            idle_since = time.time()
+            try:
+                while self.idle_timeout is None or time.time() - idle_since < self.idle_timeout:
+                    time.sleep(self.poll_interval)
+                    paths = self._new_documents()
+                    if not paths:
+                        continue
+                    self.documents_listed += len(paths)
+                    for frame in self._read(executor, paths):
+                        yield frame
+                    idle_since = time.time()
+            except KeyboardInterrupt:
+                # Stopping the watch while waiting for files ends the run normally; the runs catch an
+                # interrupt raised while they process a chunk themselves.
+                return
+
+    def close(self):
+        """Stop reading; the reader threads are shut down once their pending reads are done."""
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
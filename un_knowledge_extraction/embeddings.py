@@ -0,0 +1,226 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Vocabulary-restricted, memory-mapped word2vec store.
+
+Loading ``GoogleNews-vectors-negative300.bin.gz`` takes minutes and several GB
+of RAM although the extraction only looks up words of the UN corpus, the SDG
+targets/indicators and the organization lists. ``build_embedding_cache``
+writes the vectors of those words once to a cache directory::
+
+    vectors.npy   float32 (or float16) matrix, one row per cached word
+    vocab.json    cached words, in row order
+    missing.json  words that were looked up at build time but are not in the model
+    meta.json     dtype, vector size and source model
+
+``EmbeddingStore`` opens the matrix with ``mmap_mode='r'`` and offers the part
+of the gensim ``KeyedVectors`` interface used by the scripts (``store.vocab``
+membership, ``store[word]``, ``store[words]`` and ``vector_size``). Words
+never seen at build time are out of vocabulary: they are counted in
+``misses`` and the first one is reported with a warning. Only with a
+``fallback_path`` (``--w2v-model``) are they looked up in the full model,
+loaded (several GB) when the first such word is requested.
+
+The cache holds the words of the corpus file, or of the document parser
+output folder given with ``--documents-dir``, at the time it was built.
+Rebuild it when the corpus changes or new documents are extracted, or the
+new words are out of vocabulary::
+
+    python -m un_knowledge_extraction.embeddings --data-dir ./UN_Knowledge_Extraction/data/
+    python -m un_knowledge_extraction.embeddings --data-dir ./UN_Knowledge_Extraction/data/ --documents-dir ./parser_output/
+"""
+
+import argparse
+import json
+import os
+import warnings
+
+import numpy as np
+
+
+VECTORS_FILE = 'vectors.npy'
+VOCAB_FILE = 'vocab.json'
+MISSING_FILE = 'missing.json'
+META_FILE = 'meta.json'
+
+
+def load_word2vec_model(model_path):
+    """Load the full word2vec model with gensim."""
+    import gensim
+    return gensim.models.KeyedVectors.load_word2vec_format(model_path, binary=True)
+
+
+def _model_vocab(model):
+    # gensim < 4 exposes ``vocab``, gensim >= 4 ``key_to_index``
+    vocab = getattr(model, 'key_to_index', None)
+    return vocab if vocab is not None else model.vocab
+
+
+def vocabulary_from_texts(texts, tokenize=None):
+    """Set of lowercased tokens of ``texts``, the form in which words are looked up."""
+    if tokenize is None:
+        from .normalization import word_tokenize as tokenize
+    vocabulary = set()
+    for text in texts:
+        if isinstance(text, str) and text:
+            vocabulary.update(tokenize(text.lower().replace('\t', ' ')))
+    return vocabulary
+
+
+def build_embedding_cache(model, vocabulary, cache_dir, float16=False, source=''):
+    """Write the vectors of ``vocabulary`` found in ``model`` to ``cache_dir``."""
+    os.makedirs(cache_dir, exist_ok=True)
+    model_vocab = _model_vocab(model)
+    words = sorted(word for word in vocabulary if word in model_vocab)
+    missing = sorted(word for word in vocabulary if word not in model_vocab)
+    dtype = np.float16 if float16 else np.float32
+    vectors = np.zeros((len(words), model.vector_size), dtype=dtype)
+    for i, word in enumerate(words):
+        vectors[i] = model[word]
+    np.save(os.path.join(cache_dir, VECTORS_FILE), vectors)
+    with open(os.path.join(cache_dir, VOCAB_FILE), 'w', encoding='utf-8') as f:
+        json.dump(words, f)
+    with open(os.path.join(cache_dir, MISSING_FILE), 'w', encoding='utf-8') as f:
+        json.dump(missing, f)
+    with open(os.path.join(cache_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'dtype': np.dtype(dtype).name,
+            'vector_size': int(model.vector_size),
+            'words': len(words),
+            'missing': len(missing),
+            'source': source,
+            }, f, indent=2)
+    return len(words), len(missing)
+
+
+class _StoreVocab:
+    """``word in store.vocab`` membership test mirroring ``KeyedVectors.vocab``."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __contains__(self, word):
+        return self._store.contains(word)
+
+    def __len__(self):
+        return len(self._store.index)
+
+
+class EmbeddingStore:
+    """Read-only word vectors backed by a cache built with ``build_embedding_cache``."""
+
+    def __init__(self, cache_dir, fallback_path=None, mmap=True):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(os.path.join(cache_dir, VOCAB_FILE), encoding='utf-8') as f:
+            words = json.load(f)
+        with open(os.path.join(cache_dir, MISSING_FILE), encoding='utf-8') as f:
+            self.missing = set(json.load(f))
+        self.index = {word: i for i, word in enumerate(words)}
+        self.vectors = np.load(os.path.join(cache_dir, VECTORS_FILE), mmap_mode='r' if mmap else None)
+        self.vector_size = self.meta['vector_size']
+        self.vocab = _StoreVocab(self)
+        self.fallback_path = fallback_path
+        self._fallback = None
+        self.fallback_lookups = 0
+        self.misses = 0
+        self.missed_words = set()
+
+    @property
+    def fallback(self):
+        """The full word2vec model, loaded on first use."""
+        if self._fallback is None and self.fallback_path is not None:
+            self._fallback = load_word2vec_model(self.fallback_path)
+        return self._fallback
+
+    def contains(self, word):
+        if word in self.index:
+            return True
+        if word in self.missing:
+            return False
+        if self.fallback_path is None:
+            self._miss(word)
+            return False
+        self.fallback_lookups += 1
+        return word in _model_vocab(self.fallback)
+
+    def _miss(self, word):
+        self.misses += 1
+        if not self.missed_words:
+            warnings.warn("'%s' and possibly other words are not in the word2vec cache %s, which was built for "
+                          "another corpus; rebuild it with python -m un_knowledge_extraction.embeddings"
+                          % (word, self.cache_dir))
+        self.missed_words.add(word)
+
+    def _vector(self, word):
+        i = self.index.get(word)
+        if i is not None:
+            return np.asarray(self.vectors[i], dtype=np.float32)
+        if word in self.missing or self.fallback is None:
+            raise KeyError("word '%s' not in vocabulary" % word)
+        return np.asarray(self.fallback[word], dtype=np.float32)
+
+    def __getitem__(self, words):
+        if isinstance(words, str):
+            return self._vector(words)
+        rows = [self.index.get(word) for word in words]
+        if all(i is not None for i in rows):
+            return np.asarray(self.vectors[rows], dtype=np.float32).reshape(len(rows), self.vector_size)
+        return np.vstack([self._vector(word) for word in words]).reshape(len(rows), self.vector_size)
+
+
+def corpus_vocabulary(data_dir, tokenize=None, documents_dir=None):
+    """Words the extraction scripts can look up, read from the files in ``data_dir``.
+
+    The corpus is the corpus file of ``data_dir`` or, with ``documents_dir``,
+    the documents of that document parser output folder.
+    """
+    import pandas as pd
+
+    from .ingestion import CORPUS_FILE
+    from .reference_data import ReferenceData
+
+    # The organization names as cleaned for matching, which is how the organization linker looks them up.
+    texts = list(ReferenceData(data_dir, use_bundle=False).known_un_org_list)
+    if documents_dir is None:
+        corpus = pd.read_csv(os.path.join(data_dir, CORPUS_FILE), usecols=['Content'])
+        texts.extend(corpus['Content'].fillna('').tolist())
+    else:
+        from .document_folder import list_documents, read_document
+        for path in list_documents(documents_dir):
+            texts.extend(Content for _, _, _, Content in read_document(path))
+    sdg = pd.read_csv(os.path.join(data_dir, 'SDG_Targets_Indicators.csv'), encoding='cp1252')
+    texts.extend(sdg['Content'].fillna('').tolist())
+    for file_name, column in [
+            ('agencies.xlsx', 'Title'),
+            ('un_entities_20191017.xlsx', 'Entity'),
+            ('names_A60-72.xlsx', 'Name'),
+            ]:
+        path = os.path.join(data_dir, file_name)
+        if os.path.exists(path):
+            texts.extend(str(x) for x in pd.read_excel(path)[column].fillna('').tolist())
+    return vocabulary_from_texts(texts, tokenize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the vocabulary-restricted word2vec cache.')
+    parser.add_argument('--data-dir', default='./UN_Knowledge_Extraction/data/')
+    parser.add_argument('--model', default=None,
+                        help='word2vec model (default: <data-dir>/GoogleNews-vectors-negative300.bin.gz)')
+    parser.add_argument('--documents-dir', default=None,
+                        help='read the corpus from this document parser output folder instead of the corpus file')
+    parser.add_argument('--cache-dir', default=None, help='output directory (default: <data-dir>/w2v_cache/)')
+    parser.add_argument('--float16', action='store_true', help='store vectors as float16')
+    args = parser.parse_args(argv)
+
+    model_path = args.model or os.path.join(args.data_dir, 'GoogleNews-vectors-negative300.bin.gz')
+    cache_dir = args.cache_dir or os.path.join(args.data_dir, 'w2v_cache')
+    vocabulary = corpus_vocabulary(args.data_dir, documents_dir=args.documents_dir)
+    words, missing = build_embedding_cache(load_word2vec_model(model_path), vocabulary, cache_dir,
+                                           float16=args.float16, source=os.path.basename(model_path))
+    print('cached %d words (%d not in the model) in %s' % (words, missing, cache_dir))
+
+
+if __name__ == '__main__':
+    main()
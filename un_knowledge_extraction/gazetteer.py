@@ -0,0 +1,156 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Aho-Corasick gazetteer used to find many fixed terms in one scan of a text.
+
+The extraction scripts used to test every term with ``term in text``, which is
+one substring search per term and per paragraph. A ``Gazetteer`` compiles the
+term list once and reports every term occurring in a text in a single linear
+pass, with the same results as the brute-force comprehension it replaces.
+"""
+
+from collections import deque
+
+
+class Gazetteer:
+    """Multi-pattern matcher over a fixed list of terms.
+
+    ``lowercase=True`` compares ``term.lower()`` against ``text.lower()``.
+    ``word_boundary=True`` only accepts occurrences delimited by a space or by
+    the ends of the text, i.e. ``" " + term + " " in " " + text + " "``.
+    """
+
+    def __init__(self, terms, lowercase=False, word_boundary=False):
+        self.terms = list(terms)
+        self.lowercase = lowercase
+        self.word_boundary = word_boundary
+
+        self._goto = [dict()]
+        self._fail = [0]
+        self._output = [[]]
+        self._always = []
+        self._lengths = []
+        for term_index, term in enumerate(self.terms):
+            pattern = self._normalize(term)
+            self._lengths.append(len(pattern))
+            if self.word_boundary:
+                pattern = ' ' + pattern + ' '
+            if pattern == '':
+                self._always.append(term_index)
+                continue
+            self._add(pattern, term_index)
+        self._build_failure_links()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # Most nodes report no term; they are restored sharing one empty tuple.
+        state['_output'] = {node: terms for node, terms in enumerate(self._output) if terms}
+        state['_node_count'] = len(self._output)
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        outputs = state.pop('_output')
+        self.__dict__.update(state)
+        self._output = [()] * state.pop('_node_count')
+        for node, terms in outputs.items():
+            self._output[node] = terms
+        del self._node_count
+
+    def _normalize(self, text):
+        return text.lower() if self.lowercase else text
+
+    def _add(self, pattern, term_index):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append(dict())
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(term_index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def finditer(self, text):
+        """Yield ``(start, end, term_index)`` for every occurrence, overlaps included.
+
+        Offsets refer to ``text`` as given (the padding added in word-boundary
+        mode is not counted).
+        """
+        text = self._normalize(text)
+        # In word-boundary mode the padded text and pattern both carry one
+        # leading space, so the term ends one character before the match.
+        shift = 0
+        if self.word_boundary:
+            text = ' ' + text + ' '
+            shift = 2
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term_index in output[node]:
+                end = position + 1 - shift
+                yield end - self._lengths[term_index], end, term_index
+
+    def match_indices(self, text):
+        """Return the sorted indices of all terms occurring in ``text``."""
+        text = self._normalize(text)
+        if self.word_boundary:
+            text = ' ' + text + ' '
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set(self._always)
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return sorted(found)
+
+    def matches(self, text):
+        """Return the terms occurring in ``text`` in term-list order.
+
+        Equivalent to ``[term for term in terms if term in text]`` under the
+        configured case and boundary rules, duplicates in ``terms`` included.
+        """
+        return [self.terms[i] for i in self.match_indices(text)]
+
+    def __len__(self):
+        return len(self.terms)
+
+
+def longest_first_key_terms(candidates, content):
+    """Apply the ``Key_Terms`` selection rule to a list of candidate terms.
+
+    Candidates are tried longest first; a candidate is kept only if it still
+    occurs in ``content`` and is then removed from it, so shorter terms nested
+    inside an accepted longer term are not reported twice.
+    """
+    matching_terms = sorted(set(candidates), key=lambda term: (-len(term), term))
+    key_terms = []
+    for term in matching_terms:
+        if term in content:
+            key_terms.append(term)
+            content = content.replace(term, '')
+    return key_terms
@@ -0,0 +1,136 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Chunked, memory-lean reading of ``UN_RES_DOCS_2009_2018.csv``.
+
+The corpus is read with explicit dtypes: ``SourceFile`` and ``Type`` are
+categorical (a few thousand resolutions and a handful of paragraph types over
+millions of rows), ``Index`` is a 32 bit integer and missing values are read
+as empty strings, like the previous ``fillna('')``.
+
+``iter_resolution_chunks`` yields the corpus in chunks of whole resolutions,
+so every chunk can go through the extraction on its own and its results can
+be written before the next chunk is read. The rows of a ``SourceFile`` must be
+contiguous in the file, as written by the document parser. Rows keep their
+position in the file as index.
+"""
+
+import os
+
+import pandas as pd
+
+
+CORPUS_FILE = 'UN_RES_DOCS_2009_2018.csv'
+
+CORPUS_DTYPES = {'SourceFile': str, 'Index': 'int32', 'Type': str, 'Content': str}
+
+CATEGORICAL_COLUMNS = ['SourceFile', 'Type']
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def compact_dtypes(UN_DOCS):
+    """Fill missing text with ``''`` and make ``SourceFile`` and ``Type`` categorical."""
+    for column in UN_DOCS.columns:
+        if UN_DOCS[column].dtype == object:
+            UN_DOCS[column] = UN_DOCS[column].fillna('')
+    for column in CATEGORICAL_COLUMNS:
+        if column in UN_DOCS.columns:
+            UN_DOCS[column] = UN_DOCS[column].astype('category')
+    return UN_DOCS
+
+
+def _dtypes(usecols):
+    if usecols is None:
+        return CORPUS_DTYPES
+    return {column: dtype for column, dtype in CORPUS_DTYPES.items() if column in usecols}
+
+
+def read_corpus(path, usecols=None):
+    """The whole corpus as one frame with compact dtypes."""
+    return compact_dtypes(pd.read_csv(path, usecols=usecols, dtype=_dtypes(usecols)))
+
+
+def _source_file_runs(source_files):
+    """Start positions and values of the runs of equal ``SourceFile``s."""
+    if len(source_files) == 0:
+        return [], []
+    starts = [0] + [i for i in range(1, len(source_files)) if source_files[i] != source_files[i - 1]]
+    return starts, [source_files[i] for i in starts]
+
+
+def iter_whole_resolutions(frames):
+    """Regroup consecutive ``frames`` into frames holding whole ``SourceFile``s.
+
+    The rows of the last resolution of every frame are held back until the
+    resolution is complete. Raises ``ValueError`` if the rows of a
+    ``SourceFile`` are not contiguous.
+    """
+    finished = set()
+    carry = None
+    for chunk in frames:
+        chunk = chunk.fillna({'SourceFile': ''})
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        source_files = chunk['SourceFile'].tolist()
+        if not source_files:
+            continue
+        starts, runs = _source_file_runs(source_files)
+        complete, carry = chunk.iloc[:starts[-1]], chunk.iloc[starts[-1]:]
+        if len(complete.index) > 0:
+            _check_contiguous(runs[:-1], finished)
+            yield complete.copy()
+    if carry is not None and len(carry.index) > 0:
+        _check_contiguous(_source_file_runs(carry['SourceFile'].tolist())[1], finished)
+        yield carry.copy()
+
+
+def iter_resolution_chunks(path, chunksize=DEFAULT_CHUNKSIZE, usecols=None):
+    """Yield the corpus in frames of about ``chunksize`` rows holding whole ``SourceFile``s.
+
+    ``path`` is the corpus file or an open binary file object, whose position
+    then tells how much of the corpus has been read. Raises ``ValueError`` if
+    the rows of a ``SourceFile`` are not contiguous.
+    """
+    reader = pd.read_csv(path, usecols=usecols, dtype=_dtypes(usecols), chunksize=chunksize)
+    for chunk in iter_whole_resolutions(reader):
+        yield compact_dtypes(chunk)
+
+
+class CorpusFileSource:
+    """The corpus file read with ``iter_resolution_chunks``, with the fraction read so far."""
+
+    def __init__(self, path, chunksize=DEFAULT_CHUNKSIZE, usecols=None):
+        self.chunksize = chunksize
+        self.usecols = usecols
+        self._file = open(path, 'rb')
+        self._size = os.fstat(self._file.fileno()).st_size
+
+    @property
+    def fraction(self):
+        return self._file.tell() / self._size if self._size else 1.0
+
+    def chunks(self):
+        return iter_resolution_chunks(self._file, chunksize=self.chunksize, usecols=self.usecols)
+
+    def close(self):
+        self._file.close()
+
+
+def _check_contiguous(runs, finished):
+    for SourceFile in runs:
+        if SourceFile in finished:
+            raise ValueError('the rows of SourceFile %r are not contiguous in the corpus file' % SourceFile)
+        finished.add(SourceFile)
+
+
+def corpus_order(UN_DOCS_Paragraphs):
+    """Rows ordered by the position of their resolution in the corpus file, then by ``Index``.
+
+    Makes the output of a chunked run independent of the chunk size.
+    """
+    first_row = pd.Series(UN_DOCS_Paragraphs.index, index=UN_DOCS_Paragraphs.index).groupby(
+            UN_DOCS_Paragraphs['SourceFile'].astype(object).to_numpy()).transform('min')
+    order = pd.DataFrame({'first_row': first_row.to_numpy(), 'Index': UN_DOCS_Paragraphs['Index'].to_numpy()})
+    positions = order.sort_values(by=['first_row', 'Index'], kind='mergesort').index
+    return UN_DOCS_Paragraphs.iloc[positions]
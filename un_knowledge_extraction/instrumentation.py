@@ -0,0 +1,237 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Per-stage metrics of the extraction runs.
+
+Every stage of a run records into a ``StageMetrics`` its wall time, the rows
+it processed, how much the resident set size of the process grew while it
+ran (``rss_growth_mb``, negative when it released memory) and stage specific
+counts (``difflib`` comparisons of the SDG similarity, spaCy
+documents of the NER, ...). The stages of the paragraph level extraction
+are::
+
+    normalize, paragraph_features (verb_type, key_terms, references,
+    keyword_sdg), target_similarity, content_clean, resolution_organizations
+    (ner, org_cleaning, org_linking), propagation, output
+
+``MetricsReporter`` writes one JSON line per stage and chunk, and one per
+stage with the totals of the run (``"chunk": "total"``), and draws a
+progress bar on stderr. The totals end with a ``run`` line holding the wall
+time of the run and the peak resident set size of its processes
+(``peak_rss_mb``). With ``--workers`` the times and RSS growths of the stages
+run in the worker processes are summed over the workers, and ``peak_rss_mb``
+is the peak of the largest process.
+
+``StageMetrics(profile_stage=...)`` runs ``cProfile`` or ``tracemalloc``
+around one stage (one with its own ``stage`` block, not one of the
+sub-stages in parentheses above) in the process running it, and writes the
+profile next to the metrics.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then not reported.
+    resource = None
+
+
+PROFILERS = ['cprofile', 'tracemalloc']
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or ``None`` if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def rss_mb():
+    """Current resident set size of this process in MB, or ``None`` if unknown."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        # Only Linux has /proc; the growth of the stages is then not reported.
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def _max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+class StageMetrics:
+    """Time, rows, RSS growth and counts of the stages run since the last ``pop``."""
+
+    def __init__(self, profile_stage=None, profiler='cprofile', profile_dir='.'):
+        if profiler not in PROFILERS:
+            raise ValueError('unknown profiler %r, expected one of %s' % (profiler, PROFILERS))
+        self.stages = dict()
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self._profiles = 0
+        # Largest peak RSS of the worker processes whose stages were merged, kept across ``pop``.
+        self.worker_peak_rss_mb = None
+
+    def add(self, stage, seconds, rows=0, **counts):
+        """Add ``seconds`` and ``rows`` (and ``counts``) to ``stage``."""
+        record = self.stages.setdefault(stage, {'seconds': 0.0, 'rows': 0})
+        record['seconds'] += seconds
+        record['rows'] += rows
+        for name, count in counts.items():
+            record[name] = record.get(name, 0) + count
+
+    @contextmanager
+    def stage(self, stage, rows=0, counters=None):
+        """Time the ``with`` block as ``stage``.
+
+        ``counters`` maps count names to functions returning running totals
+        (such as ``lambda: engine.difflib_calls``); the stage records how much
+        they grew during the block. The RSS growth is sampled at the start and
+        the end of the block.
+        """
+        counters = counters or dict()
+        before = {name: counter() for name, counter in counters.items()}
+        rss_before = rss_mb()
+        profile = self._start_profile() if stage == self.profile_stage else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            counts = dict()
+            if profile is not None:
+                counts.update(self._stop_profile(stage, profile))
+            counts.update({name: counter() - before[name] for name, counter in counters.items()})
+            rss_after = rss_mb()
+            if rss_before is not None and rss_after is not None:
+                counts['rss_growth_mb'] = rss_after - rss_before
+            self.add(stage, seconds, rows, **counts)
+
+    def _start_profile(self):
+        if self.profiler == 'cprofile':
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+            return profile
+        import tracemalloc
+        tracemalloc.start()
+        return tracemalloc
+
+    def _stop_profile(self, stage, profile):
+        self._profiles += 1
+        path = os.path.join(self.profile_dir, '%s.%d.%d' % (stage, os.getpid(), self._profiles))
+        if self.profiler == 'cprofile':
+            profile.disable()
+            profile.dump_stats(path + '.prof')
+            return dict()
+        snapshot = profile.take_snapshot()
+        traced_peak = profile.get_traced_memory()[1]
+        profile.stop()
+        with open(path + '.tracemalloc.txt', 'w', encoding='utf-8') as f:
+            for statistic in snapshot.statistics('lineno')[:50]:
+                f.write('%s\n' % statistic)
+        return {'traced_peak_mb': traced_peak / (1024 * 1024)}
+
+    def merge(self, stages, peak_rss_mb=None):
+        """Add the ``stages`` of another ``StageMetrics``, e.g. of a worker process with its ``peak_rss_mb``."""
+        for stage, record in stages.items():
+            record = dict(record)
+            self.add(stage, record.pop('seconds'), record.pop('rows'), **record)
+        self.worker_peak_rss_mb = _max(self.worker_peak_rss_mb, peak_rss_mb)
+
+    def pop(self):
+        """The stages recorded so far, starting a new recording."""
+        stages, self.stages = self.stages, dict()
+        return stages
+
+
+def _json_record(chunk, stage, record):
+    record = dict(record)
+    seconds = record['seconds']
+    record.update(chunk=chunk, stage=stage)
+    record['rows_per_sec'] = record['rows'] / seconds if seconds > 0 else None
+    return record
+
+
+class ProgressBar:
+    """One line progress bar on a terminal: done fraction, rows, throughput and peak RSS."""
+
+    def __init__(self, stream=sys.stderr, width=30):
+        self.stream = stream
+        self.width = width
+        self.start = time.perf_counter()
+        self.interactive = hasattr(stream, 'isatty') and stream.isatty()
+
+    def update(self, fraction, rows):
+        elapsed = time.perf_counter() - self.start
+        filled = int(round(self.width * min(max(fraction, 0.0), 1.0)))
+        peak = peak_rss_mb()
+        line = '[%s%s] %3d%%  %d rows  %.0f rows/s  %s' % (
+                '#' * filled, '-' * (self.width - filled), round(100 * fraction), rows,
+                rows / elapsed if elapsed > 0 else 0.0,
+                'peak %.0f MB' % peak if peak is not None else '')
+        if self.interactive:
+            self.stream.write('\r' + line)
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def close(self):
+        if self.interactive:
+            self.stream.write('\n')
+            self.stream.flush()
+
+
+class MetricsReporter:
+    """Writes the ``StageMetrics`` of every chunk as JSON lines and shows the progress of the run."""
+
+    def __init__(self, path=None, progress=True):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8') if path is not None else None
+        self.progress = ProgressBar() if progress else None
+        self.totals = StageMetrics()
+        self.chunks = 0
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def _write(self, record):
+        if self._file is not None:
+            self._file.write(json.dumps(record, sort_keys=True) + '\n')
+            self._file.flush()
+
+    def report_chunk(self, stages, rows, fraction=None):
+        """Record the ``stages`` of the chunk of ``rows`` rows just finished; ``fraction`` of the corpus is done."""
+        for stage, record in stages.items():
+            self._write(_json_record(self.chunks, stage, record))
+        self.totals.merge(stages)
+        self.chunks += 1
+        self.rows += rows
+        if self.progress is not None:
+            self.progress.update(fraction if fraction is not None else 0.0, self.rows)
+
+    def close(self, worker_peak_rss_mb=None):
+        """Write the totals of the run; ``worker_peak_rss_mb`` is the largest peak RSS of its worker processes."""
+        for stage, record in self.totals.stages.items():
+            self._write(_json_record('total', stage, record))
+        run = {'seconds': time.perf_counter() - self.start, 'rows': self.rows,
+               'peak_rss_mb': _max(peak_rss_mb(), worker_peak_rss_mb)}
+        self._write(_json_record('total', 'run', run))
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.progress is not None:
+            self.progress.close()
@@ -0,0 +1,135 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Batched spaCy extraction of ORG entities with a persistent result cache.
+
+Only the entities labelled ``ORG`` are used by the extraction, so the spaCy
+pipeline is loaded with every component that does not feed the entity
+recognizer disabled and documents are processed with ``nlp.pipe``. The ORG
+spans of every text are stored in a SQLite cache keyed by a hash of the text
+and of the model name and version; texts already in the cache never reach the
+model, which is only loaded when at least one text is missing.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+
+NER_COMPONENTS = {'tok2vec', 'transformer', 'ner', 'entity_ruler'}
+
+# spaCy 3 has no ``en`` shortcut any more, models are loaded by package name.
+DEFAULT_SPACY_MODEL = 'en_core_web_sm'
+
+
+def load_ner_pipeline(model_name):
+    """Load ``model_name`` with the components that do not feed NER disabled."""
+    import spacy
+    try:
+        nlp = spacy.load(model_name)
+    except OSError as e:
+        raise OSError('cannot load the spaCy model %r of the ORG extraction; install it with '
+                      'python -m spacy download %s or pass an installed model with --spacy-model (%s)'
+                      % (model_name, model_name, e)) from e
+    disabled = [name for name in nlp.pipe_names if name not in NER_COMPONENTS]
+    if disabled:
+        nlp.select_pipes(disable=disabled)
+    return nlp
+
+
+def _model_version(model_name):
+    try:
+        import spacy
+        version = spacy.util.get_package_version(model_name)
+    except Exception:
+        version = None
+    return version
+
+
+class OrgEntityExtractor:
+    """Extract the ``ORG`` entities of many texts with ``nlp.pipe`` and a cache."""
+
+    def __init__(self, model_name=DEFAULT_SPACY_MODEL, nlp=None, batch_size=32, n_process=1, cache_path=None):
+        self.model_name = model_name
+        self._nlp = nlp
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.cache_path = cache_path
+        self._model_key = None
+        self.docs_processed = 0
+        self.cache_hits = 0
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self._nlp = load_ner_pipeline(self.model_name)
+        return self._nlp
+
+    @property
+    def model_key(self):
+        """``name==version`` of the spaCy model, part of every cache key."""
+        if self._model_key is None:
+            version = None
+            if self._nlp is None:
+                version = _model_version(self.model_name)
+            if version is None:
+                meta = self.nlp.meta
+                version = '%s-%s' % (meta.get('name', ''), meta.get('version', ''))
+            self._model_key = '%s==%s' % (self.model_name, version)
+        return self._model_key
+
+    def cache_key(self, text):
+        return hashlib.sha1((self.model_key + '\0' + text).encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.cache_path)
+        connection.execute('CREATE TABLE IF NOT EXISTS org_entities (key TEXT PRIMARY KEY, orgs TEXT NOT NULL)')
+        return connection
+
+    def _read_cache(self, connection, keys):
+        cached = dict()
+        unique_keys = list(set(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            query = 'SELECT key, orgs FROM org_entities WHERE key IN (%s)' % ','.join('?' * len(chunk))
+            for key, orgs in connection.execute(query, chunk):
+                cached[key] = json.loads(orgs)
+        return cached
+
+    def _run_model(self, texts):
+        results = []
+        for doc in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process):
+            orgs = []
+            for element in doc.ents:
+                if element.label_ == 'ORG' and str(element) not in orgs:
+                    orgs.append(str(element))
+            results.append(orgs)
+        self.docs_processed += len(texts)
+        return results
+
+    def extract(self, texts):
+        """Return, for every text, the distinct ``ORG`` spans in order of appearance."""
+        texts = list(texts)
+        if self.cache_path is None:
+            return self._run_model(texts)
+
+        keys = [self.cache_key(text) for text in texts]
+        connection = self._connect()
+        try:
+            cached = self._read_cache(connection, keys)
+            missing = dict()
+            for key, text in zip(keys, texts):
+                if key not in cached and key not in missing:
+                    missing[key] = text
+            self.cache_hits += len(texts) - len(missing)
+            if missing:
+                extracted = self._run_model(list(missing.values()))
+                new_entries = dict(zip(missing.keys(), extracted))
+                with connection:
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO org_entities (key, orgs) VALUES (?, ?)',
+                        [(key, json.dumps(orgs)) for key, orgs in new_entries.items()])
+                cached.update(new_entries)
+        finally:
+            connection.close()
+        return [cached[key] for key in keys]
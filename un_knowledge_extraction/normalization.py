@@ -0,0 +1,115 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Tokenize-once normalization of the paragraphs.
+
+``normalize_paragraphs`` computes, once per row, every representation of the
+paragraph text the extraction stages read:
+
+* ``text``: ``Content`` with tabs, non printable characters, the punctuation
+  ``(),:;?@{|}~.`` and digits removed (key terms, referenced resolutions),
+* ``lowered``, ``tokens``, ``token_set`` and ``token_text``: ``text``
+  lowercased and tokenized (first action verb, key terms, SDG keywords),
+* ``alpha_tokens``: the lowercased alphabetic tokens of the raw ``Content``
+  (SDG target/indicator similarity),
+* ``clean_text``: ``Content_clean`` (organizations and countries).
+
+The token representations are only computed for ``Paragraph`` rows, the only
+ones the stages tokenize.
+
+``word_tokenize`` gives the tokens of ``nltk.word_tokenize``. Texts made of
+letters, digits, whitespace, ``,:;/+=_-``, brackets and at most a final
+period are a single sentence for the punkt sentence splitter and only meet a
+handful of the NLTK word tokenizer rules; they are tokenized with those rules,
+precompiled. Any other text goes through NLTK.
+"""
+
+import re
+import string
+from collections import namedtuple
+
+from nltk import word_tokenize as nltk_word_tokenize
+from nltk.tokenize.destructive import MacIntyreContractions
+
+
+NormalizedParagraph = namedtuple('NormalizedParagraph', [
+    'text',
+    'lowered',
+    'tokens',
+    'token_set',
+    'token_text',
+    'alpha_tokens',
+    'clean_text',
+])
+
+
+_SIMPLE_TEXT = re.compile(r'[A-Za-z0-9\s,:;/+=_\-\[\](){}<>]*(?:(?<=[^.])\.[\]\)}>]*\s*)?\Z')
+
+_SIMPLE_TEXT_RULES = [
+    (re.compile(r'([^\.])(\.)([\]\)}>]*)\s*$'), r'\1 \2 \3 '),
+    (re.compile(r'([:,])([^\d])'), r' \1 \2'),
+    (re.compile(r'([:,])$'), r' \1 '),
+    (re.compile(r';'), r' ; '),
+    (re.compile(r'[\]\[\(\)\{\}\<\>]'), r' \g<0> '),
+    (re.compile(r'--'), r' -- '),
+]
+
+# ``cannot``, ``gonna``, ``wanna``, ...; the other contractions of NLTK need an apostrophe.
+_CONTRACTIONS = [re.compile(pattern) for pattern in MacIntyreContractions.CONTRACTIONS2]
+
+
+def word_tokenize(text):
+    """``nltk.word_tokenize(text)``, with a precompiled fast path for plain text."""
+    if _SIMPLE_TEXT.match(text):
+        for regexp, substitution in _SIMPLE_TEXT_RULES:
+            text = regexp.sub(substitution, text)
+        # As NLTK, pad the text so that the contractions ending with \s match at its end.
+        text = ' ' + text + ' '
+        for regexp in _CONTRACTIONS:
+            text = regexp.sub(r' \1 \2 ', text)
+        return text.split()
+    return nltk_word_tokenize(text)
+
+
+_PRINTABLE = frozenset(string.printable)
+_STRIPPED_CHARACTERS = str.maketrans('', '', '(),:;?@{|}~.' + string.digits)
+_NUMBERING = re.compile(r'[0-9]{1,2}.')
+
+
+def stripped_text(Content):
+    """``Content`` without tabs, non printable characters, ``(),:;?@{|}~.`` and digits."""
+    Content = Content.replace('\t', ' ')
+    Content = ''.join(filter(_PRINTABLE.__contains__, Content))
+    return Content.translate(_STRIPPED_CHARACTERS)
+
+
+def clean_text(Content):
+    """``Content_clean``: ``Content`` without numbering, non printable characters and words with digits."""
+    Content = Content.replace('\t', ' ')
+    Content = Content.replace(',', ', ')
+    Content = Content.replace(';', '; ')
+    Content = Content.replace('.', '. ')
+    Content = _NUMBERING.sub(' ', Content)
+    Content = ''.join(filter(_PRINTABLE.__contains__, Content))
+    return ' '.join(w for w in Content.split() if not any(x.isdigit() for x in w))
+
+
+def alpha_tokens(Content, tokenize=word_tokenize):
+    """Lowercased alphabetic tokens longer than one character, as used for SDG similarity."""
+    return [word for word in tokenize(Content.lower().replace('\t', ' ')) if len(word) > 1 and word.isalpha()]
+
+
+def normalize(Content, Type='Paragraph', tokenize=word_tokenize):
+    text = stripped_text(Content)
+    if Type != 'Paragraph':
+        return NormalizedParagraph(text, None, None, None, None, None, clean_text(Content))
+    lowered = text.lower()
+    tokens = tokenize(lowered)
+    return NormalizedParagraph(text, lowered, tokens, frozenset(tokens), ' '.join(tokens),
+                               alpha_tokens(Content, tokenize), clean_text(Content))
+
+
+def normalize_paragraphs(UN_DOCS_Paragraphs, tokenize=word_tokenize):
+    """A ``NormalizedParagraph`` per row of ``UN_DOCS_Paragraphs``, in row order."""
+    return [normalize(Content, Type, tokenize)
+            for Content, Type in zip(UN_DOCS_Paragraphs['Content'].tolist(), UN_DOCS_Paragraphs['Type'].tolist())]
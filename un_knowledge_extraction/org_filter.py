@@ -0,0 +1,92 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Screen of the spaCy ORG candidates that are not in the known organization lists.
+
+``OrganizationFilter`` is built once from the reference lists and applies the
+``Organization_Names_not_from_known_orginal`` rules to a candidate with set
+lookups, a keyword gazetteer and a trigram index of the known organizations,
+instead of scanning every list for every candidate.
+"""
+
+from .gazetteer import Gazetteer
+
+
+class SubstringIndex:
+    """Answers "is ``pattern`` a substring of any of ``texts``" through a trigram index.
+
+    The texts holding every trigram of the pattern are intersected, rarest
+    trigram first, and only the few texts left are searched.
+    """
+
+    def __init__(self, texts, n=3):
+        self.texts = list(texts)
+        self.n = n
+        postings = dict()
+        for i, text in enumerate(self.texts):
+            for start in range(len(text) - n + 1):
+                postings.setdefault(text[start:start + n], set()).add(i)
+        self._postings = {gram: frozenset(ids) for gram, ids in postings.items()}
+        # Patterns shorter than n are searched in all texts at once.
+        self._joined = '\x00'.join(self.texts)
+
+    def __contains__(self, pattern):
+        n = self.n
+        if len(pattern) < n:
+            return pattern in self._joined
+        grams = set(pattern[start:start + n] for start in range(len(pattern) - n + 1))
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return False
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                return False
+        return any(pattern in self.texts[i] for i in candidates)
+
+
+class OrganizationFilter:
+    """The rules for keeping an ORG candidate as an organization outside the known lists."""
+
+    def __init__(self, known_un_org_list, stop_words, key_words_un_org_list, key_words_not_un_org_list,
+                 operative_verb_list, preambular_verb_list):
+        self.known_orgs = frozenset(known_un_org_list)
+        self.known_orgs_lower = SubstringIndex(org.lower() for org in known_un_org_list)
+        self.stop_words = frozenset(stop_words)
+        self.un_key_words = Gazetteer(key_words_un_org_list, lowercase=True)
+        self.not_un_key_words = Gazetteer(key_words_not_un_org_list, lowercase=True)
+        self.operative_verbs_s = frozenset(word for word in operative_verb_list if word.endswith('s'))
+        self.preambular_verbs = frozenset(preambular_verb_list)
+
+    def _candidate(self, org):
+        if len(org.split()) <= 1 or org in self.known_orgs:
+            return False
+        org_lower = org.lower()
+        words = org_lower.split()
+        return (
+                words[-1] not in self.stop_words
+                and (not self.not_un_key_words.match_indices(org) or self.un_key_words.match_indices(org))
+                and org_lower not in self.known_orgs_lower
+                and words[0] not in self.operative_verbs_s
+                and not any(word in self.preambular_verbs for word in words)
+                )
+
+    def screen(self, org):
+        """The names ``org`` contributes to ``Organization_Names_not_from_known_orginal`` (none or one)."""
+        if not self._candidate(org):
+            return []
+        if ' of the ' not in org:
+            return [org]
+        org_split = org.split(' of the ')
+        if (org_split[0] not in self.known_orgs) and (len(org_split[0].split()) > 1) and (org_split[1] in self.known_orgs):
+            return [org_split[0]]
+        elif (org_split[0] in self.known_orgs) and (org_split[1] not in self.known_orgs) and (len(org_split[1].split()) > 1):
+            return [org_split[1]]
+        elif (org_split[0] not in self.known_orgs) and (org_split[1] not in self.known_orgs):
+            return [org]
+        return []
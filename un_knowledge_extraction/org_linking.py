@@ -0,0 +1,150 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Linking of the organizations outside the known lists to a known organization.
+
+An unknown organization of a resolution is linked to the known organization
+of the same resolution it shares the most capitalized words with; ties are
+broken by the cosine similarity of their summed word2vec vectors. If it
+shares no capitalized word with any of them it is linked to itself.
+
+``OrganizationLinker`` tokenizes the names of ``known_un_org_list`` and
+indexes their capitalized tokens once, and computes the normalized summed
+vector of each (stored as float32) the first time it is needed, so the vectors
+of a resolution's known organizations are gathered into a matrix without
+tokenizing them again. The tokens and vectors of the other names are kept for
+the last ``memo_size`` names only, as most of them occur in a single
+resolution. All unknown organizations of a resolution are scored against all
+its known organizations with one matrix product.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from .normalization import word_tokenize
+
+
+DEFAULT_MEMO_SIZE = 4096
+
+
+class OrganizationLinker:
+    """Scores unknown organizations against known ones, as ``Organization_Names_not_from_known_inferred``."""
+
+    def __init__(self, known_un_org_list, w2v, tokenize=word_tokenize, memo_size=DEFAULT_MEMO_SIZE):
+        self.w2v = w2v
+        self.tokenize = tokenize
+        self.memo_size = memo_size
+        self._ids = dict()
+        self._tokens = []
+        self._vectors = []
+        self._capitalized_index = dict()
+        self._memo = OrderedDict()
+        for org in known_un_org_list:
+            if org not in self._ids:
+                i = len(self._tokens)
+                self._ids[org] = i
+                tokens = self.tokenize(org)
+                self._tokens.append(tokens)
+                for token in set(tokens):
+                    if token[0].isupper():
+                        self._capitalized_index.setdefault(token, []).append(i)
+                self._vectors.append(False)
+
+    def _summed_vector(self, org):
+        """Normalized summed float32 vector of ``org``, or ``None``."""
+        words_in_vocab = [word for word in self.tokenize(org.lower()) if word in self.w2v.vocab]
+        if len(words_in_vocab) == 0:
+            return None
+        vector = np.sum(np.asarray(self.w2v[words_in_vocab], dtype=np.float64), axis=0)
+        norm = np.linalg.norm(vector)
+        return (vector / norm).astype(np.float32) if norm > 0 else None
+
+    def _name(self, org):
+        """``(tokens, vector)`` of a name outside the known list, from the memo of the last ``memo_size`` names."""
+        entry = self._memo.get(org)
+        if entry is None:
+            entry = (self.tokenize(org), self._summed_vector(org))
+            self._memo[org] = entry
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        else:
+            self._memo.move_to_end(org)
+        return entry
+
+    def _tokens_and_vector(self, org):
+        i = self._ids.get(org)
+        if i is None:
+            return self._name(org)
+        if self._vectors[i] is False:
+            self._vectors[i] = self._summed_vector(org)
+        return self._tokens[i], self._vectors[i]
+
+    def precompute(self):
+        """Compute the vectors of every known organization, e.g. before the linker is saved."""
+        for org in self._ids:
+            self._tokens_and_vector(org)
+
+    def _matrix(self, vectors):
+        """Matrix of ``vectors`` (zero rows for ``None``) and which rows have one."""
+        matrix = np.zeros((len(vectors), self.w2v.vector_size))
+        has_vector = np.zeros(len(vectors), dtype=bool)
+        for row, vector in enumerate(vectors):
+            if vector is not None:
+                matrix[row] = vector
+                has_vector[row] = True
+        return matrix, has_vector
+
+    def common_capitalized_words(self, org_tokens, known_orgs, known_tokens):
+        """``counts[u, k]``: tokens of org ``u`` that start with a capital and occur in known org ``k``."""
+        # Columns of the known orgs of the resolution, by row of the known list; the first column of a
+        # duplicate is counted. Names outside the known list are indexed for this call only.
+        column = dict()
+        index = dict()
+        for k, (org, tokens) in enumerate(zip(known_orgs, known_tokens)):
+            i = self._ids.get(org)
+            if i is None:
+                for token in set(tokens):
+                    if token[0].isupper():
+                        index.setdefault(token, set()).add(k)
+            elif i not in column:
+                column[i] = k
+        counts = np.zeros((len(org_tokens), len(known_orgs)), dtype=np.int64)
+        for u, tokens in enumerate(org_tokens):
+            for token in tokens:
+                if token[0].isupper():
+                    for j in self._capitalized_index.get(token, ()):
+                        if j in column:
+                            counts[u, column[j]] += 1
+                    for k in index.get(token, ()):
+                        counts[u, k] += 1
+        first = [column[self._ids[org]] if org in self._ids else k for k, org in enumerate(known_orgs)]
+        return counts[:, first]
+
+    def link(self, orgs, known_orgs):
+        """``[(org, known_org, similarity)]`` for ``orgs``, or ``(org, org)`` if no known org shares a capitalized word."""
+        if len(orgs) == 0 or len(known_orgs) == 0:
+            return []
+        org_tokens, org_vectors = zip(*[self._tokens_and_vector(org) for org in orgs])
+        known_tokens, known_vectors = zip(*[self._tokens_and_vector(org) for org in known_orgs])
+        counts = self.common_capitalized_words(org_tokens, known_orgs, known_tokens)
+        org_matrix, org_has_vector = self._matrix(org_vectors)
+        known_matrix, known_has_vector = self._matrix(known_vectors)
+        similarities = org_matrix @ known_matrix.T
+        similarities[~org_has_vector, :] = 0.0
+        similarities[:, ~known_has_vector] = 0.0
+
+        inferred = []
+        for u, org in enumerate(orgs):
+            max_count = counts[u].max()
+            if max_count == 0:
+                inferred.append((org, org))
+                continue
+            tied = np.flatnonzero(counts[u] == max_count)
+            if len(tied) == 1:
+                k = int(tied[0])
+            else:
+                max_similarity = similarities[u, tied].max()
+                k = int(np.flatnonzero(similarities[u] == max_similarity)[0])
+            inferred.append((org, known_orgs[k], float(similarities[u, k])))
+        return inferred
@@ -0,0 +1,242 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Output writers for the extraction results.
+
+Results are written in batches as they are produced:
+
+* ``parquet`` (default) writes one row group per batch with native list and
+  struct columns (``Key_Terms``, ``SDG``, ``Referenced_Resolutions_Dates``,
+  ``Organization_Names_not_from_known_inferred``, ...). With ``partition_by``
+  the output is a Hive-partitioned directory (``<column>=<value>/``, rows
+  without a value in ``<column>=__HIVE_DEFAULT_PARTITION__/``), so readers
+  can load single columns or a range of partitions only::
+
+      pyarrow.parquet.read_table(path, columns=['SourceFile', 'SDG'],
+                                 filters=[('Resolutuion_Adoption_Year', '>=', 2015)])
+
+  The years are discovered as integers and the rows without a year as null.
+
+* ``jsonl`` writes one JSON object per row.
+* ``excel`` keeps the previous ``to_excel`` output. It is written when the
+  writer is closed and is limited to Excel's ~1M rows.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .ragged import CompactFrame
+
+
+OUTPUT_FORMATS = ['parquet', 'jsonl', 'excel']
+
+OUTPUT_EXTENSIONS = {'parquet': '.parquet', 'jsonl': '.jsonl', 'excel': '.xlsx'}
+
+STRING_LIST_COLUMNS = [
+    'Key_Terms',
+    'Referenced_Resolutions',
+    'SDG',
+    'Closest_Target',
+    'Closest_Indicator',
+    'Country',
+    'Organization_Names_known',
+    'Organization_Names_not_from_known_orginal',
+]
+
+LIST_COLUMNS = STRING_LIST_COLUMNS + ['Organization_Names_not_from_known_inferred']
+
+# Partition of the rows without a value, which Hive partitioning discovery reads as null.
+HIVE_DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def _plain(value):
+    """``value`` with tuples, NumPy scalars and arrays turned into JSON/Arrow friendly types."""
+    if isinstance(value, (list, tuple)):
+        return [_plain(x) for x in value]
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _referenced_resolutions_dates(value):
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, (list, tuple)):
+        items = [tuple(x) for x in value if isinstance(x, (list, tuple)) and len(x) == 2]
+    else:
+        items = []
+    return [{'resolution': str(resolution), 'date': str(date)} for resolution, date in items]
+
+
+def _inferred_organizations(value):
+    inferred = []
+    for entry in value if isinstance(value, (list, tuple)) else []:
+        entry = list(entry)
+        similarity = entry[2] if len(entry) > 2 else None
+        inferred.append({
+            'org': str(entry[0]),
+            'known_org': str(entry[1]) if len(entry) > 1 else None,
+            'similarity': float(similarity) if similarity is not None else None,
+        })
+    return inferred
+
+
+def _arrow_types():
+    import pyarrow as pa
+    return {
+        'Referenced_Resolutions_Dates': pa.list_(pa.struct([('resolution', pa.string()), ('date', pa.string())])),
+        'Organization_Names_not_from_known_inferred': pa.list_(pa.struct([
+            ('org', pa.string()), ('known_org', pa.string()), ('similarity', pa.float64())])),
+    }
+
+
+def to_arrow_table(frame, schema=None):
+    """Convert a result frame to an Arrow table with native list/struct columns."""
+    import pyarrow as pa
+
+    nested_types = _arrow_types()
+    arrays = []
+    fields = []
+    for column in frame.columns:
+        values = frame[column].tolist()
+        if column in STRING_LIST_COLUMNS:
+            arrow_type = pa.list_(pa.string())
+            values = [[str(x) for x in v] if isinstance(v, (list, tuple)) else [] for v in values]
+        elif column == 'Referenced_Resolutions_Dates':
+            arrow_type = nested_types[column]
+            values = [_referenced_resolutions_dates(v) for v in values]
+        elif column == 'Organization_Names_not_from_known_inferred':
+            arrow_type = nested_types[column]
+            values = [_inferred_organizations(v) for v in values]
+        else:
+            arrow_type = schema.field(str(column)).type if schema is not None else None
+            values = [_plain(v) for v in values]
+        array = pa.array(values, type=arrow_type)
+        arrays.append(array)
+        fields.append(pa.field(str(column), array.type))
+    table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+    return table.cast(schema) if schema is not None else table
+
+
+def _partition_value(value):
+    """Directory name of a partition value; missing values get the default Hive partition, read back as null."""
+    if value is None or value == '' or (isinstance(value, float) and np.isnan(value)):
+        return HIVE_DEFAULT_PARTITION
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        # Years of a column holding missing values are floats.
+        return str(int(value))
+    return str(value)
+
+
+class ParquetOutput:
+    """Parquet file (or Hive-partitioned directory) written one row group per batch."""
+
+    def __init__(self, path, partition_by=None):
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ImportError('Parquet output requires pyarrow: pip install pyarrow')
+        self.path = path
+        self.partition_by = partition_by
+        self.schema = None
+        self._writers = dict()
+
+    def _writer(self, partition_value, schema):
+        import pyarrow.parquet as pq
+        if partition_value not in self._writers:
+            if self.partition_by is None:
+                path = self.path
+            else:
+                directory = os.path.join(self.path, '%s=%s' % (self.partition_by, partition_value))
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, 'part-0.parquet')
+            self._writers[partition_value] = pq.ParquetWriter(path, schema)
+        return self._writers[partition_value]
+
+    def write(self, frame):
+        if len(frame.index) == 0:
+            return
+        if self.partition_by is None:
+            table = to_arrow_table(frame, self.schema)
+            self.schema = table.schema
+            self._writer(None, table.schema).write_table(table)
+            return
+        partition_values = frame[self.partition_by].map(_partition_value)
+        for partition_value, part in frame.drop(columns=[self.partition_by]).groupby(partition_values, sort=True):
+            table = to_arrow_table(part, self.schema)
+            self.schema = table.schema
+            self._writer(partition_value, table.schema).write_table(table)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = dict()
+
+
+class JsonLinesOutput:
+    """One JSON object per row, appended batch by batch."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, frame):
+        for record in frame.to_dict('records'):
+            self._file.write(json.dumps(_plain(record), ensure_ascii=False))
+            self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ExcelOutput:
+    """The previous ``DataFrame.to_excel`` output, written on ``close``.
+
+    Batches are kept with their list columns compacted until then.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._frames = CompactFrame(LIST_COLUMNS)
+
+    def write(self, frame):
+        self._frames.append(frame)
+
+    def close(self):
+        if len(self._frames) > 0:
+            self._frames.to_frame().to_excel(self.path)
+        self._frames = CompactFrame(LIST_COLUMNS)
+
+
+def open_output(output_format, path, partition_by=None):
+    """Open a writer for ``output_format`` (one of ``OUTPUT_FORMATS``)."""
+    if output_format == 'parquet':
+        return ParquetOutput(path, partition_by=partition_by)
+    if output_format == 'jsonl':
+        return JsonLinesOutput(path)
+    if output_format == 'excel':
+        return ExcelOutput(path)
+    raise ValueError('unknown output format %r, expected one of %s' % (output_format, ', '.join(OUTPUT_FORMATS)))
+
+
+def output_path(output_dir, name, output_format, partition_by=None):
+    """``<output_dir>/<name>`` with the extension of ``output_format`` (a directory when partitioned)."""
+    if output_format == 'parquet' and partition_by is not None:
+        return os.path.join(output_dir, name)
+    return os.path.join(output_dir, name + OUTPUT_EXTENSIONS[output_format])
+
+
+def write_frame(frame, output_format, path, partition_by=None, row_group_size=50000):
+    """Write ``frame`` in batches of ``row_group_size`` rows."""
+    output = open_output(output_format, path, partition_by=partition_by)
+    try:
+        for start in range(0, max(len(frame.index), 1), row_group_size):
+            output.write(frame.iloc[start:start + row_group_size])
+    finally:
+        output.close()
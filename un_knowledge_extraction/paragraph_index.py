@@ -0,0 +1,574 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Semantic search over the extracted paragraphs.
+
+A paragraph is represented like the SDG targets and indicators of
+``w2v_Targets``: the sum of the word2vec vectors of its lowercased alphabetic
+tokens (``sdg_similarity.summed_vector``). ``ParagraphIndexWriter`` writes
+these vectors, normalized, for every ``Paragraph`` row of the paragraph level
+output to an index directory::
+
+    meta.json             vector size, number of paragraphs, SDG names and paragraph types
+    vectors.f32           float32 matrix, one contiguous row per paragraph
+    ids.json              ``SourceFile#Index`` of every row
+    contents.json         ``Content`` of every row
+    filters.npz           SDG bit mask, ``Paragraph_Type`` code and adoption year of every row
+    catalog.json          ``Type``, ``Index``, ``SDG`` and ``Content`` of the SDG targets and indicators
+    catalog_vectors.npy   their normalized summed vectors
+
+``ParagraphIndex`` opens the matrix memory-mapped and returns the ``k``
+paragraphs closest by cosine to an SDG target (``'6.1'``), an indicator
+(``'6.1.1'``), a free text or another paragraph (``'A_RES_70_1.pdf#12'``),
+optionally only among the paragraphs of some SDGs, of one ``Paragraph_Type``
+or adopted in a range of years. The scores are computed with one matrix
+product over the vectors (block by block over the gathered rows of small
+selections), keeping a running top ``k``. Free text queries look up their
+words in the word2vec cache the index was built with.
+
+A query reads the whole matrix unless its filters select few rows, so its
+time grows with the index: for 300,000 paragraphs (350 MB of vectors) it is
+about 35-45 ms on one core, almost all of it the matrix product itself.
+
+The index is written next to the output by ``python -m un_knowledge_extraction
+paragraphs --paragraph-index`` or built afterwards from the output file, then
+queried or served over HTTP::
+
+    python -m un_knowledge_extraction.paragraph_index build ./UN_Knowledge_Extraction/output/output_UN_DOCS_paragraph_level.parquet
+    python -m un_knowledge_extraction.paragraph_index query --target 6.1 --k 20 --type operative
+    python -m un_knowledge_extraction.paragraph_index serve --port 8765
+
+    curl 'http://127.0.0.1:8765/search?text=access+to+safe+drinking+water&sdg=6&year=2015-2018'
+"""
+
+import argparse
+import ast
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from .normalization import alpha_tokens
+from .sdg_similarity import summed_vector
+
+
+PARAGRAPH_INDEX_DIR = 'paragraph_index'
+FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+VECTORS_FILE = 'vectors.f32'
+IDS_FILE = 'ids.json'
+CONTENTS_FILE = 'contents.json'
+FILTERS_FILE = 'filters.npz'
+CATALOG_FILE = 'catalog.json'
+CATALOG_VECTORS_FILE = 'catalog_vectors.npy'
+
+DEFAULT_OUTPUT_DIR = './UN_Knowledge_Extraction/output/'
+DEFAULT_DATA_DIR = './UN_Knowledge_Extraction/data/'
+DEFAULT_BLOCK_ROWS = 16384
+# Below this fraction of selected rows the filtered rows are gathered instead of scoring the whole matrix.
+GATHER_FRACTION = 0.2
+DEFAULT_PORT = 8765
+
+INDEX_COLUMNS = ['SourceFile', 'Index', 'Type', 'Content', 'Paragraph_Type', 'SDG']
+
+
+def paragraph_id(SourceFile, Index):
+    return '%s#%d' % (SourceFile, Index)
+
+
+def _list_value(value):
+    """A list column value as read from parquet (array), JSON lines (list) or Excel (its ``str``)."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        if value.startswith('['):
+            return list(ast.literal_eval(value))
+        return [value] if value else []
+    if isinstance(value, float):
+        # missing value
+        return []
+    return list(value)
+
+
+def _unit_vector(vector, vector_size):
+    if vector is None:
+        return np.zeros(vector_size, dtype=np.float32)
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def _sdg_catalog(data_dir, w2v):
+    """Entries and normalized summed vectors of the SDG targets and indicators, and the SDG names by goal number."""
+    from .reference_data import read_sdg_targets_indicators
+
+    SDG_Targets_Indicators = read_sdg_targets_indicators(data_dir)
+    entries = []
+    vectors = []
+    sdg_names = dict()
+    for SDG, Type, Index, Content in SDG_Targets_Indicators[['SDG', 'Type', 'Index', 'Content']].itertuples(index=False):
+        Index = str(Index).strip()
+        sdg_names.setdefault(int(Index.split('.')[0]), SDG)
+        entries.append({'Type': Type, 'Index': Index, 'SDG': SDG, 'Content': Content})
+        vectors.append(_unit_vector(summed_vector(alpha_tokens(Content), w2v), w2v.vector_size))
+    return entries, np.vstack(vectors), [sdg_names[goal] for goal in sorted(sdg_names)]
+
+
+def resolution_adoption_years(UN_DOCS_Paragraphs):
+    """``{SourceFile: Resolutuion_Adoption_Year}`` of the resolutions of a frame of whole resolutions."""
+    from .resolution_level import extract_resolution_metadata
+
+    UN_DOCS_resolution_level = extract_resolution_metadata(UN_DOCS_Paragraphs)
+    return dict(zip(UN_DOCS_resolution_level['SourceFile'], UN_DOCS_resolution_level['Resolutuion_Adoption_Year']))
+
+
+class ParagraphIndexWriter:
+    """Write the index of the paragraphs of the paragraph level output, chunk by chunk.
+
+    The index is written to ``<path>.tmp`` and moved to ``path`` by ``close``.
+    """
+
+    def __init__(self, path, w2v, data_dir=DEFAULT_DATA_DIR):
+        self.path = path
+        self.w2v = w2v
+        self.vector_size = w2v.vector_size
+        self._tmp_path = path.rstrip('/\\') + '.tmp'
+        if os.path.exists(self._tmp_path):
+            shutil.rmtree(self._tmp_path)
+        os.makedirs(self._tmp_path)
+        self.catalog, self.catalog_vectors, self.sdg_names = _sdg_catalog(data_dir, w2v)
+        self._sdg_bits = {name: 1 << i for i, name in enumerate(self.sdg_names)}
+        self.paragraph_types = ['']
+        self._vectors = open(os.path.join(self._tmp_path, VECTORS_FILE), 'wb')
+        self.ids = []
+        self.contents = []
+        self._sdg = []
+        self._paragraph_type = []
+        self._year = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _type_code(self, Paragraph_Type):
+        if Paragraph_Type not in self.paragraph_types:
+            self.paragraph_types.append(Paragraph_Type)
+        return self.paragraph_types.index(Paragraph_Type)
+
+    def add(self, UN_DOCS_Paragraphs, adoption_years=None):
+        """Add the ``Paragraph`` rows of a frame of whole resolutions of the paragraph level output.
+
+        ``adoption_years`` is the ``{SourceFile: Resolutuion_Adoption_Year}``
+        of the frame when already known, otherwise it is extracted from the
+        frame's rows.
+        """
+        if adoption_years is None:
+            adoption_years = resolution_adoption_years(UN_DOCS_Paragraphs)
+        paragraphs = UN_DOCS_Paragraphs.loc[(UN_DOCS_Paragraphs['Type'] == 'Paragraph').to_numpy()]
+        if len(paragraphs.index) == 0:
+            return
+        vectors = np.zeros((len(paragraphs.index), self.vector_size), dtype=np.float32)
+        rows = zip(paragraphs['SourceFile'].tolist(), paragraphs['Index'].tolist(), paragraphs['Content'].tolist(),
+                   paragraphs['Paragraph_Type'].tolist(), paragraphs['SDG'].tolist())
+        for i, (SourceFile, Index, Content, Paragraph_Type, SDG) in enumerate(rows):
+            Content = Content if isinstance(Content, str) else ''
+            vectors[i] = _unit_vector(summed_vector(alpha_tokens(Content), self.w2v), self.vector_size)
+            self.ids.append(paragraph_id(SourceFile, int(Index)))
+            self.contents.append(Content)
+            self._sdg.append(sum(self._sdg_bits.get(name, 0) for name in set(_list_value(SDG))))
+            self._paragraph_type.append(self._type_code(Paragraph_Type if isinstance(Paragraph_Type, str) else ''))
+            year = adoption_years.get(SourceFile, '')
+            self._year.append(int(year) if year else 0)
+        self._vectors.write(vectors.tobytes())
+
+    def close(self, w2v_cache_dir=None):
+        """Finish the index; ``w2v_cache_dir`` is the word2vec cache used for free text queries."""
+        self._vectors.close()
+        np.savez(os.path.join(self._tmp_path, FILTERS_FILE),
+                 sdg=np.asarray(self._sdg, dtype=np.uint32),
+                 paragraph_type=np.asarray(self._paragraph_type, dtype=np.int8),
+                 year=np.asarray(self._year, dtype=np.int16))
+        with open(os.path.join(self._tmp_path, IDS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.ids, f)
+        with open(os.path.join(self._tmp_path, CONTENTS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.contents, f)
+        with open(os.path.join(self._tmp_path, CATALOG_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.catalog, f)
+        np.save(os.path.join(self._tmp_path, CATALOG_VECTORS_FILE), self.catalog_vectors)
+        if w2v_cache_dir is None:
+            w2v_cache_dir = getattr(self.w2v, 'cache_dir', None)
+        with open(os.path.join(self._tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format_version': FORMAT_VERSION,
+                'vector_size': self.vector_size,
+                'paragraphs': len(self.ids),
+                'w2v_cache_dir': os.path.abspath(w2v_cache_dir) if w2v_cache_dir else None,
+                'sdg_names': self.sdg_names,
+                'paragraph_types': self.paragraph_types,
+                }, f, indent=2)
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.rename(self._tmp_path, self.path)
+
+
+def iter_output_frames(path, batch_size=100000):
+    """Frames of whole resolutions of a paragraph level output file (parquet, JSON lines or Excel)."""
+    import pandas as pd
+
+    from .ingestion import iter_whole_resolutions
+
+    if path.endswith('.jsonl'):
+        frames = (chunk.reindex(columns=INDEX_COLUMNS) for chunk in pd.read_json(path, lines=True, chunksize=batch_size))
+    elif path.endswith('.xlsx'):
+        frames = [pd.read_excel(path).reindex(columns=INDEX_COLUMNS)]
+    else:
+        # a parquet file or a directory partitioned by year
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+        frames = (batch.to_pandas() for batch in dataset.to_batches(columns=INDEX_COLUMNS, batch_size=batch_size))
+    return iter_whole_resolutions(frames)
+
+
+def build_paragraph_index(output_path, path, w2v_cache_dir, data_dir=DEFAULT_DATA_DIR, batch_size=100000):
+    """Write the index of the paragraph level output ``output_path`` to ``path``; returns its number of paragraphs."""
+    from .embeddings import EmbeddingStore
+
+    writer = ParagraphIndexWriter(path, EmbeddingStore(w2v_cache_dir), data_dir)
+    for frame in iter_output_frames(output_path, batch_size):
+        writer.add(frame)
+    writer.close(w2v_cache_dir)
+    return len(writer)
+
+
+class ParagraphIndex:
+    """Read-only paragraph index written by ``ParagraphIndexWriter``."""
+
+    def __init__(self, path, block_rows=DEFAULT_BLOCK_ROWS):
+        self.path = path
+        self.block_rows = block_rows
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['format_version'] != FORMAT_VERSION:
+            raise ValueError('%s has index format %s, expected %d' % (path, self.meta['format_version'], FORMAT_VERSION))
+        self.vector_size = self.meta['vector_size']
+        self.sdg_names = self.meta['sdg_names']
+        self.paragraph_types = self.meta['paragraph_types']
+        rows = self.meta['paragraphs']
+        if rows:
+            self.vectors = np.memmap(os.path.join(path, VECTORS_FILE), dtype=np.float32, mode='r',
+                                     shape=(rows, self.vector_size))
+        else:
+            self.vectors = np.zeros((0, self.vector_size), dtype=np.float32)
+        with np.load(os.path.join(path, FILTERS_FILE)) as filters:
+            self.sdg = filters['sdg']
+            self.paragraph_type = filters['paragraph_type']
+            self.year = filters['year']
+        with open(os.path.join(path, IDS_FILE), encoding='utf-8') as f:
+            self.ids = json.load(f)
+        with open(os.path.join(path, CATALOG_FILE), encoding='utf-8') as f:
+            self.catalog = json.load(f)
+        self.catalog_vectors = np.load(os.path.join(path, CATALOG_VECTORS_FILE))
+        self._catalog_rows = dict()
+        for i, entry in enumerate(self.catalog):
+            self._catalog_rows.setdefault((entry['Type'], entry['Index']), i)
+            self._catalog_rows.setdefault((entry['Type'], entry['Content']), i)
+        self._rows = None
+        self._contents = None
+        self._w2v = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def rows(self):
+        """Row of every paragraph id."""
+        if self._rows is None:
+            self._rows = {id: row for row, id in enumerate(self.ids)}
+        return self._rows
+
+    @property
+    def contents(self):
+        if self._contents is None:
+            with open(os.path.join(self.path, CONTENTS_FILE), encoding='utf-8') as f:
+                self._contents = json.load(f)
+        return self._contents
+
+    @property
+    def w2v(self):
+        if self._w2v is None:
+            from .embeddings import EmbeddingStore
+            if not self.meta['w2v_cache_dir']:
+                raise ValueError('the index was built without a word2vec cache, free text cannot be searched')
+            self._w2v = EmbeddingStore(self.meta['w2v_cache_dir'])
+        return self._w2v
+
+    def _catalog_vector(self, Type, key):
+        row = self._catalog_rows.get((Type, str(key).strip()))
+        if row is None:
+            raise ValueError('unknown SDG %s %r' % (Type[:-1].lower(), key))
+        return self.catalog_vectors[row]
+
+    def target_vector(self, target):
+        """Vector of an SDG target, by its number (``'6.1'``) or its text."""
+        return self._catalog_vector('Targets', target)
+
+    def indicator_vector(self, indicator):
+        """Vector of an SDG indicator, by its number (``'6.1.1'``) or its text."""
+        return self._catalog_vector('Indicators', indicator)
+
+    def text_vector(self, text):
+        return _unit_vector(summed_vector(alpha_tokens(text), self.w2v), self.vector_size)
+
+    def paragraph_row(self, id):
+        row = self.rows.get(id)
+        if row is None:
+            raise ValueError('unknown paragraph %r' % id)
+        return row
+
+    def _sdg_mask(self, sdg):
+        mask = 0
+        for value in sdg:
+            value = str(value).strip()
+            if value.isdigit() and 1 <= int(value) <= len(self.sdg_names):
+                mask |= 1 << (int(value) - 1)
+            elif value in self.sdg_names:
+                mask |= 1 << self.sdg_names.index(value)
+            else:
+                raise ValueError('unknown SDG %r' % value)
+        return mask
+
+    def candidate_mask(self, sdg=None, paragraph_type=None, years=None):
+        """Boolean mask of the rows passing the filters, or ``None`` for all rows.
+
+        ``sdg`` is a list of SDG numbers or names (any of them), ``years`` a
+        ``(first, last)`` range of adoption years.
+        """
+        selected = None
+        if sdg:
+            selected = (self.sdg & np.uint32(self._sdg_mask(sdg))) != 0
+        if paragraph_type is not None:
+            if paragraph_type not in self.paragraph_types:
+                raise ValueError('unknown paragraph type %r' % paragraph_type)
+            is_type = self.paragraph_type == self.paragraph_types.index(paragraph_type)
+            selected = is_type if selected is None else selected & is_type
+        if years is not None:
+            in_years = (self.year >= years[0]) & (self.year <= years[1])
+            selected = in_years if selected is None else selected & in_years
+        return selected
+
+    def _blocks(self, vector, selected):
+        """``(rows, scores)`` of the selected rows.
+
+        Sparse selections are gathered block by block, larger ones are scored
+        with one matrix product over the whole matrix (the scores take 4 bytes
+        per row) and the other rows are dropped from the scores.
+        """
+        if selected is not None and selected.sum() < GATHER_FRACTION * len(selected):
+            candidates = np.flatnonzero(selected)
+            for start in range(0, len(candidates), self.block_rows):
+                rows = candidates[start:start + self.block_rows]
+                yield rows, self.vectors[rows] @ vector
+            return
+        scores = self.vectors @ vector
+        if selected is None:
+            yield np.arange(len(scores)), scores
+        else:
+            yield np.flatnonzero(selected), scores[selected]
+
+    def search(self, vector, k=10, sdg=None, paragraph_type=None, years=None, exclude=()):
+        """``(rows, scores)`` of the ``k`` paragraphs closest to ``vector``, best first."""
+        vector = np.asarray(vector, dtype=np.float32)
+        selected = self.candidate_mask(sdg, paragraph_type, years)
+        wanted = k + len(exclude)
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for rows, scores in self._blocks(vector, selected):
+            if len(scores) > wanted:
+                top = np.argpartition(-scores, wanted - 1)[:wanted]
+                rows, scores = rows[top], scores[top]
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > wanted:
+                top = np.argpartition(-best_scores, wanted - 1)[:wanted]
+                best_rows, best_scores = best_rows[top], best_scores[top]
+        order = np.lexsort((best_rows, -best_scores))
+        best_rows, best_scores = best_rows[order], best_scores[order]
+        if len(exclude):
+            keep = ~np.isin(best_rows, list(exclude))
+            best_rows, best_scores = best_rows[keep], best_scores[keep]
+        return best_rows[:k], best_scores[:k]
+
+    def result(self, row, score):
+        id = self.ids[row]
+        SourceFile, Index = id.rsplit('#', 1)
+        sdg = int(self.sdg[row])
+        return {
+            'id': id,
+            'SourceFile': SourceFile,
+            'Index': int(Index),
+            'score': float(score),
+            'Paragraph_Type': self.paragraph_types[self.paragraph_type[row]],
+            'year': int(self.year[row]) or None,
+            'SDG': [name for i, name in enumerate(self.sdg_names) if sdg & (1 << i)],
+            'Content': self.contents[row],
+            }
+
+    def query(self, target=None, indicator=None, text=None, paragraph=None, k=10, sdg=None, paragraph_type=None,
+              years=None):
+        """The ``k`` paragraphs closest to one of ``target``, ``indicator``, ``text`` or ``paragraph`` (an id)."""
+        given = [name for name, value in [('target', target), ('indicator', indicator), ('text', text),
+                                          ('paragraph', paragraph)] if value is not None]
+        if len(given) != 1:
+            raise ValueError('give one of target, indicator, text or paragraph')
+        if k < 1:
+            raise ValueError('k should be at least 1')
+        exclude = ()
+        if target is not None:
+            vector = self.target_vector(target)
+        elif indicator is not None:
+            vector = self.indicator_vector(indicator)
+        elif text is not None:
+            vector = self.text_vector(text)
+        else:
+            row = self.paragraph_row(paragraph)
+            vector = self.vectors[row]
+            exclude = (row,)
+        rows, scores = self.search(vector, k, sdg, paragraph_type, years, exclude)
+        return [self.result(row, score) for row, score in zip(rows, scores)]
+
+
+def parse_years(value):
+    """``(first, last)`` of ``'2015'`` or ``'2010-2015'``."""
+    first, _, last = value.partition('-')
+    try:
+        return int(first), int(last or first)
+    except ValueError:
+        raise ValueError('years should read 2015 or 2010-2015, not %r' % value)
+
+
+def query_arguments(parameters):
+    """``ParagraphIndex.query`` arguments of the parameters of a ``/search`` request, lists of strings by name."""
+    def single(name):
+        values = parameters.get(name)
+        return values[-1] if values else None
+
+    sdg = [value for values in parameters.get('sdg', []) for value in values.split(',') if value.strip()]
+    k = single('k')
+    if k is not None and not k.isdigit():
+        raise ValueError('k should be a number of paragraphs, not %r' % k)
+    years = single('year')
+    return dict(
+            target=single('target'),
+            indicator=single('indicator'),
+            text=single('text'),
+            paragraph=single('paragraph'),
+            k=int(k) if k else 10,
+            sdg=sdg or None,
+            paragraph_type=single('type'),
+            years=parse_years(years) if years else None,
+            )
+
+
+def serve(index, host='127.0.0.1', port=DEFAULT_PORT):
+    """Answer ``GET /search?target=6.1&k=10&sdg=6&type=operative&year=2010-2015`` with JSON until interrupted."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    class SearchHandler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != '/search':
+                self._send(404, {'error': 'not found, use /search'})
+                return
+            start = time.perf_counter()
+            try:
+                arguments = query_arguments(parse_qs(url.query))
+                results = index.query(**arguments)
+            except ValueError as error:
+                self._send(400, {'error': str(error)})
+                return
+            self._send(200, {
+                'query': arguments,
+                'results': results,
+                'milliseconds': round((time.perf_counter() - start) * 1000, 3),
+                })
+
+    server = ThreadingHTTPServer((host, port), SearchHandler)
+    # Read the contents and the id map before the first request instead of during it.
+    index.contents
+    index.rows
+    print('searching %d paragraphs on http://%s:%d/search' % (len(index), host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m un_knowledge_extraction.paragraph_index',
+                                     description='Build, query or serve the semantic index of the extracted paragraphs.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    default_index = os.path.join(DEFAULT_OUTPUT_DIR, PARAGRAPH_INDEX_DIR)
+
+    build = subparsers.add_parser('build', help='index a paragraph level output file')
+    build.add_argument('output', help='paragraph level output (.parquet file or directory, .jsonl or .xlsx)')
+    build.add_argument('--index', default=None, help='index directory (default: paragraph_index/ next to the output)')
+    build.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    build.add_argument('--w2v-cache-dir', default=None, help='word2vec cache (default: <data-dir>/w2v_cache/)')
+
+    query = subparsers.add_parser('query', help='print the paragraphs closest to a target, indicator, text or paragraph')
+    serve_parser = subparsers.add_parser('serve', help='answer /search requests over HTTP')
+    for subparser in (query, serve_parser):
+        subparser.add_argument('--index', default=default_index, help='index directory (default: %s)' % default_index)
+    query.add_argument('--target', default=None, help="SDG target number, such as '6.1'")
+    query.add_argument('--indicator', default=None, help="SDG indicator number, such as '6.1.1'")
+    query.add_argument('--text', default=None)
+    query.add_argument('--paragraph', default=None, help="paragraph id, such as 'A_RES_70_1.pdf#12'")
+    query.add_argument('--k', type=int, default=10)
+    query.add_argument('--sdg', action='append', default=None, help='SDG number or name (repeatable)')
+    query.add_argument('--type', default=None, dest='paragraph_type', help="Paragraph_Type, such as 'operative'")
+    query.add_argument('--year', default=None, help="adoption year or range, such as '2015' or '2010-2015'")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        path = args.index or os.path.join(os.path.dirname(os.path.abspath(args.output.rstrip('/\\'))), PARAGRAPH_INDEX_DIR)
+        w2v_cache_dir = args.w2v_cache_dir or os.path.join(args.data_dir, 'w2v_cache')
+        start = time.perf_counter()
+        paragraphs = build_paragraph_index(args.output, path, w2v_cache_dir, args.data_dir)
+        print('indexed %d paragraphs in %s (%.1f s)' % (paragraphs, path, time.perf_counter() - start))
+        return
+    index = ParagraphIndex(args.index)
+    if args.command == 'serve':
+        serve(index, args.host, args.port)
+        return
+    start = time.perf_counter()
+    try:
+        results = index.query(args.target, args.indicator, args.text, args.paragraph, args.k, args.sdg,
+                              args.paragraph_type, parse_years(args.year) if args.year else None)
+    except ValueError as error:
+        parser.error(str(error))
+    milliseconds = (time.perf_counter() - start) * 1000
+    for result in results:
+        print('%.4f  %s  %s %s  %s' % (result['score'], result['id'], result['Paragraph_Type'] or '-',
+                                       result['year'] or '-', result['Content'][:100]))
+    print('%d results in %.1f ms' % (len(results), milliseconds))
+
+
+if __name__ == '__main__':
+    main()
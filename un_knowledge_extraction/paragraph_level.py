@@ -0,0 +1,301 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Paragraph level extraction stages.
+
+Every stage takes the paragraph frame (the rows of one or more whole
+``SourceFile``s) and a ``ReferenceData`` and adds its columns to the frame.
+``extract_paragraph_level`` chains them, ``iter_paragraph_level`` runs them
+chunk by chunk on a stream of resolutions; ``parallel.run_sharded`` runs them
+on shards of the corpus in worker processes.
+"""
+
+import string
+from collections import Counter
+from contextlib import nullcontext
+from time import perf_counter
+
+import pandas as pd
+
+from .citations import extract_citations
+from .gazetteer import Gazetteer, longest_first_key_terms
+from .instrumentation import StageMetrics
+from .normalization import normalize_paragraphs
+from .sdg_similarity import SDGMatch
+
+
+def empty_lists(frame):
+    return [list() for x in range(len(frame.index))]
+
+
+def extract_paragraph_features(UN_DOCS_Paragraphs, ref, normalized=None, metrics=None):
+    """First action verb, paragraph type, key terms, referenced resolutions and keyword SDGs.
+
+    The first action verb and paragraph type of every document are set by the
+    ``ParagraphTypeClassifier`` of ``ref`` (see ``paragraph_structure``).
+
+    With a ``StageMetrics``, the time of each of the four parts is recorded.
+    """
+    if normalized is None:
+        normalized = normalize_paragraphs(UN_DOCS_Paragraphs)
+    start = perf_counter()
+    First_Action_Verb, Paragraph_Type = ref.paragraph_type_classifier.classify(UN_DOCS_Paragraphs, normalized)
+    UN_DOCS_Paragraphs['First_Action_Verb'] = First_Action_Verb
+    UN_DOCS_Paragraphs['Paragraph_Type'] = Paragraph_Type
+    verb_type_seconds = perf_counter() - start
+    UN_DOCS_Paragraphs['Key_Terms'] = empty_lists(UN_DOCS_Paragraphs)
+    UN_DOCS_Paragraphs['Referenced_Resolutions'] = empty_lists(UN_DOCS_Paragraphs)
+    UN_DOCS_Paragraphs['Referenced_Resolutions_Dates'] = [dict() for x in range(len(UN_DOCS_Paragraphs.index))]
+    UN_DOCS_Paragraphs['SDG'] = empty_lists(UN_DOCS_Paragraphs)
+
+    sdg_keyword_engine = ref.sdg_keyword_engine
+
+    seconds = [verb_type_seconds, 0.0, 0.0, 0.0]
+    rows = 0
+    for position, (index, row) in enumerate(UN_DOCS_Paragraphs.iterrows()):
+        paragraph = normalized[position]
+
+        if row['Type'] == 'Paragraph' and len(paragraph.tokens) >= 10:
+            rows += 1
+            start = perf_counter()
+            Content = paragraph.text
+
+            matching_terms = ref.UNBIS_terms_gazetteer.matches(paragraph.token_text)
+            key_terms = longest_first_key_terms(matching_terms, Content)
+            for key_term in key_terms:
+                Content = Content.replace(key_term, '')
+            UN_DOCS_Paragraphs.at[index, 'Key_Terms'] = key_terms
+            key_terms_end = perf_counter()
+
+            # References are read from the text with digits; ``Content`` has them stripped.
+            Referenced_Resolutions, Referenced_Resolutions_Dates = extract_citations(row['Content'].replace('\t', ' '))
+            UN_DOCS_Paragraphs.at[index, 'Referenced_Resolutions'] = Referenced_Resolutions
+            UN_DOCS_Paragraphs.at[index, 'Referenced_Resolutions_Dates'] = Referenced_Resolutions_Dates
+            references_end = perf_counter()
+
+            content_lower = Content.lower() if key_terms else paragraph.lowered
+            UN_DOCS_Paragraphs.at[index, 'SDG'].extend(sdg_keyword_engine.match(paragraph.token_set, content_lower))
+
+            seconds[1] += key_terms_end - start
+            seconds[2] += references_end - key_terms_end
+            seconds[3] += perf_counter() - references_end
+    if metrics is not None:
+        for stage, stage_seconds in zip(['verb_type', 'key_terms', 'references', 'keyword_sdg'], seconds):
+            metrics.add(stage, stage_seconds, rows)
+    return UN_DOCS_Paragraphs
+
+
+def extract_sdg_similarity(UN_DOCS_Paragraphs, ref, store=None, normalized=None):
+    """Closest SDG target or indicator of every paragraph, by word2vec similarity.
+
+    With a ``ResultStore``, paragraphs whose content was already scored under
+    the same reference data are read from the store instead of being scored.
+    """
+    UN_DOCS_Paragraphs['Closest_Target'] = empty_lists(UN_DOCS_Paragraphs)
+    UN_DOCS_Paragraphs['Closest_Indicator'] = empty_lists(UN_DOCS_Paragraphs)
+    UN_DOCS_Paragraphs['Closest_Target_Similarity_Score'] = 0.0
+    UN_DOCS_Paragraphs['Closest_Indicator_Similarity_Score'] = 0.0
+
+    if normalized is None:
+        normalized = normalize_paragraphs(UN_DOCS_Paragraphs)
+    is_paragraph = (UN_DOCS_Paragraphs.Type == 'Paragraph').to_numpy()
+    paragraph_row_indexes = UN_DOCS_Paragraphs.index[is_paragraph]
+    contents = UN_DOCS_Paragraphs.loc[paragraph_row_indexes, 'Content'].tolist()
+    paragraphs_tokens = [paragraph.alpha_tokens for paragraph, selected in zip(normalized, is_paragraph) if selected]
+    if store is None:
+        sdg_matches = ref.sdg_similarity_engine.match_tokens(paragraphs_tokens)
+    else:
+        keys = [store.paragraph_key('Paragraph', Content) for Content in contents]
+        cached = store.get_paragraph_results('sdg_similarity', keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        computed = dict()
+        for i, sdg_match in zip(missing, ref.sdg_similarity_engine.match_tokens([paragraphs_tokens[i] for i in missing])):
+            computed[keys[i]] = list(sdg_match)
+        store.put_paragraph_results('sdg_similarity', computed)
+        cached.update(computed)
+        sdg_matches = [SDGMatch(*cached[key]) for key in keys]
+
+    for row_index, sdg_match in zip(paragraph_row_indexes, sdg_matches):
+        UN_DOCS_Paragraphs.loc[row_index, 'Closest_Target_Similarity_Score'] = sdg_match.target_score
+        UN_DOCS_Paragraphs.loc[row_index, 'Closest_Indicator_Similarity_Score'] = sdg_match.indicator_score
+        if sdg_match.closest_target is not None:
+            UN_DOCS_Paragraphs.at[row_index, 'Closest_Target'].append(sdg_match.closest_target)
+        elif sdg_match.closest_indicator is not None:
+            UN_DOCS_Paragraphs.at[row_index, 'Closest_Indicator'].append(sdg_match.closest_indicator)
+        if sdg_match.sdg is not None and sdg_match.sdg not in UN_DOCS_Paragraphs.at[row_index, 'SDG']:
+            UN_DOCS_Paragraphs.at[row_index, 'SDG'].append(sdg_match.sdg)
+    return UN_DOCS_Paragraphs
+
+
+def clean_paragraph_content(UN_DOCS_Paragraphs, normalized=None):
+    """``Content_clean`` (digits, numbering and non printable characters removed) and ``word_cnt``."""
+    if normalized is None:
+        normalized = normalize_paragraphs(UN_DOCS_Paragraphs)
+    UN_DOCS_Paragraphs['word_cnt'] = 0
+    UN_DOCS_Paragraphs['Content_clean'] = ''
+
+    for position, index in enumerate(UN_DOCS_Paragraphs.index):
+        Content = normalized[position].clean_text
+        UN_DOCS_Paragraphs.at[index, 'word_cnt'] = len(Content.split())
+        UN_DOCS_Paragraphs.at[index, 'Content_clean'] = Content
+    return UN_DOCS_Paragraphs
+
+
+def extract_resolution_organizations(UN_DOCS_Paragraphs, ref, metrics=None):
+    """Known, newly found and inferred organization names of every resolution.
+
+    With a ``StageMetrics``, the NER, the cleaning of its ORG entities and
+    their linking to known organizations are timed separately.
+    """
+    organization_filter = ref.organization_filter
+    organization_linker = ref.organization_linker
+
+    UN_DOCS_Resolutions_Content = UN_DOCS_Paragraphs.loc[(UN_DOCS_Paragraphs.Type == 'Paragraph')].groupby(['SourceFile'], observed=True)['Content'].apply(' '.join).reset_index()
+    UN_DOCS_Resolutions_Content_clean = UN_DOCS_Paragraphs.loc[(UN_DOCS_Paragraphs.Type == 'Paragraph')].groupby(['SourceFile'], observed=True)['Content_clean'].apply(' '.join).reset_index()
+    UN_DOCS_Resolutions = pd.merge(UN_DOCS_Resolutions_Content, UN_DOCS_Resolutions_Content_clean, on='SourceFile')
+
+    UN_DOCS_Resolutions['Organization_Names_known'] = empty_lists(UN_DOCS_Resolutions)
+    UN_DOCS_Resolutions['Organization_Names_not_from_known_orginal'] = empty_lists(UN_DOCS_Resolutions)
+    UN_DOCS_Resolutions['Organization_Names_not_from_known_inferred'] = empty_lists(UN_DOCS_Resolutions)
+
+    org_entity_extractor = ref.org_entity_extractor
+    with metrics.stage('ner', len(UN_DOCS_Resolutions.index), counters={
+            'ner_docs': lambda: org_entity_extractor.docs_processed,
+            'ner_cache_hits': lambda: org_entity_extractor.cache_hits,
+            }) if metrics is not None else nullcontext():
+        Resolution_ORG_entities = org_entity_extractor.extract(UN_DOCS_Resolutions['Content_clean'].tolist())
+
+    cleaning_seconds = 0.0
+    linking_seconds = 0.0
+    linked = 0
+    for index, row in UN_DOCS_Resolutions.iterrows():
+        start = perf_counter()
+        Content_clean = row['Content_clean']
+        known_orgs = ref.known_un_org_gazetteer.matches(Content_clean)
+        UN_DOCS_Resolutions.at[index, 'Organization_Names_known'] = known_orgs
+
+        extracted_orgs = list(Resolution_ORG_entities[index])
+        extracted_orgs = [org for org in extracted_orgs if all(char not in org for char in ['_', '/', '.'])]
+        for i in range(len(extracted_orgs)):
+            extracted_org = extracted_orgs[i].translate(str.maketrans('', '', string.digits))
+            extracted_org = extracted_org.translate(str.maketrans('', '', ',;:.()'))
+            if extracted_org.lower().startswith('the '):
+                extracted_orgs[i] = extracted_org[4:]
+        extracted_orgs = sorted(set(extracted_orgs))
+
+        Organization_Names_not_from_known_orginal = []
+        for org in extracted_orgs:
+            Organization_Names_not_from_known_orginal.extend(organization_filter.screen(org))
+
+        UN_DOCS_Resolutions.at[index, 'Organization_Names_not_from_known_orginal'] = Organization_Names_not_from_known_orginal
+        cleaning_end = perf_counter()
+        cleaning_seconds += cleaning_end - start
+
+        if (len(known_orgs) > 0):
+            UN_DOCS_Resolutions.at[index, 'Organization_Names_not_from_known_inferred'] = organization_linker.link(
+                    Organization_Names_not_from_known_orginal, known_orgs)
+            linked += len(Organization_Names_not_from_known_orginal)
+        linking_seconds += perf_counter() - cleaning_end
+    if metrics is not None:
+        metrics.add('org_cleaning', cleaning_seconds, len(UN_DOCS_Resolutions.index))
+        metrics.add('org_linking', linking_seconds, len(UN_DOCS_Resolutions.index), linked_organizations=linked)
+    return UN_DOCS_Resolutions
+
+
+class ResolutionOrganizationMatcher:
+    """The organization lists of one resolution, compiled to find them in its paragraphs.
+
+    Known organizations are matched case-insensitively, the organizations
+    outside the known lists (original and inferred) case-sensitively, as
+    substrings of ``Content_clean``.
+    """
+
+    def __init__(self, known, original, inferred):
+        self.known_gazetteer = Gazetteer(known, lowercase=True)
+        self.inferred = list(inferred)
+        self.unknown_gazetteer = Gazetteer(list(original) + [org[0] for org in self.inferred])
+        self.original_count = len(original)
+
+    def match(self, Content_clean):
+        """``(known, original, inferred)`` organizations of the resolution occurring in ``Content_clean``."""
+        original = []
+        inferred = []
+        for i in self.unknown_gazetteer.match_indices(Content_clean):
+            if i < self.original_count:
+                original.append(self.unknown_gazetteer.terms[i])
+            else:
+                inferred.append(self.inferred[i - self.original_count])
+        return self.known_gazetteer.matches(Content_clean), original, inferred
+
+
+def propagate_resolution_organizations(UN_DOCS_Paragraphs, UN_DOCS_Resolutions, ref):
+    """Countries and the resolution's organizations mentioned in each paragraph."""
+    matchers = dict()
+    for SourceFile, known, original, inferred in zip(
+            UN_DOCS_Resolutions['SourceFile'].tolist(),
+            UN_DOCS_Resolutions['Organization_Names_known'].tolist(),
+            UN_DOCS_Resolutions['Organization_Names_not_from_known_orginal'].tolist(),
+            UN_DOCS_Resolutions['Organization_Names_not_from_known_inferred'].tolist()):
+        matchers.setdefault(SourceFile, ResolutionOrganizationMatcher(known, original, inferred))
+    no_organizations = ResolutionOrganizationMatcher([], [], [])
+
+    Country = []
+    Organization_Names_known = []
+    Organization_Names_not_from_known_orginal = []
+    Organization_Names_not_from_known_inferred = []
+    for SourceFile, Content_clean in zip(UN_DOCS_Paragraphs['SourceFile'].tolist(), UN_DOCS_Paragraphs['Content_clean'].tolist()):
+        known, original, inferred = matchers.get(SourceFile, no_organizations).match(Content_clean)
+        Country.append(ref.country_names_gazetteer.matches(Content_clean))
+        Organization_Names_known.append(known)
+        Organization_Names_not_from_known_orginal.append(original)
+        Organization_Names_not_from_known_inferred.append(inferred)
+    UN_DOCS_Paragraphs['Country'] = Country
+    UN_DOCS_Paragraphs['Organization_Names_known'] = Organization_Names_known
+    UN_DOCS_Paragraphs['Organization_Names_not_from_known_orginal'] = Organization_Names_not_from_known_orginal
+    UN_DOCS_Paragraphs['Organization_Names_not_from_known_inferred'] = Organization_Names_not_from_known_inferred
+    return UN_DOCS_Paragraphs
+
+
+def unknown_organization_counts(UN_DOCS_Resolutions):
+    """How often each organization name outside the known lists was found."""
+    Organization_Names_not_from_known = UN_DOCS_Resolutions['Organization_Names_not_from_known_orginal'].tolist()
+    Organization_Names_not_from_known = [x for sublist in Organization_Names_not_from_known for x in sublist]
+    Organization_Names_not_from_known_cnt = Counter(Organization_Names_not_from_known)
+    Organization_Names_not_from_known_cnt = pd.DataFrame.from_dict(Organization_Names_not_from_known_cnt, orient='index').reset_index()
+    return Organization_Names_not_from_known_cnt.rename(columns={'index':'org_names', 0:'count'}).sort_values(by='count', ascending=False).reset_index(drop=True)
+
+
+def extract_paragraph_level(UN_DOCS_Paragraphs, ref, store=None, metrics=None):
+    """Run every paragraph level stage on whole resolutions.
+
+    Returns the paragraph frame, sorted by ``SourceFile`` and ``Index``, and the
+    resolution level organization frame. ``store`` is an optional
+    ``ResultStore`` for paragraph-level results, ``metrics`` an optional
+    ``StageMetrics`` the stages record into.
+    """
+    if metrics is None:
+        metrics = StageMetrics()
+    rows = len(UN_DOCS_Paragraphs.index)
+    UN_DOCS_Paragraphs = UN_DOCS_Paragraphs.copy()
+    with metrics.stage('normalize', rows):
+        normalized = normalize_paragraphs(UN_DOCS_Paragraphs)
+    with metrics.stage('paragraph_features', rows):
+        UN_DOCS_Paragraphs = extract_paragraph_features(UN_DOCS_Paragraphs, ref, normalized, metrics)
+    sdg_similarity_engine = ref.sdg_similarity_engine
+    with metrics.stage('target_similarity', rows, counters={'difflib_calls': lambda: sdg_similarity_engine.difflib_calls}):
+        UN_DOCS_Paragraphs = extract_sdg_similarity(UN_DOCS_Paragraphs, ref, store, normalized)
+    with metrics.stage('content_clean', rows):
+        UN_DOCS_Paragraphs = clean_paragraph_content(UN_DOCS_Paragraphs, normalized)
+    UN_DOCS_Paragraphs = UN_DOCS_Paragraphs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+    with metrics.stage('resolution_organizations', rows):
+        UN_DOCS_Resolutions = extract_resolution_organizations(UN_DOCS_Paragraphs, ref, metrics)
+    with metrics.stage('propagation', rows):
+        UN_DOCS_Paragraphs = propagate_resolution_organizations(UN_DOCS_Paragraphs, UN_DOCS_Resolutions, ref)
+    UN_DOCS_Paragraphs = UN_DOCS_Paragraphs.drop(columns=['word_cnt', 'Content_clean'])
+    return UN_DOCS_Paragraphs, UN_DOCS_Resolutions
+
+
+def iter_paragraph_level(chunks, ref, store=None, metrics=None):
+    """``extract_paragraph_level`` on every chunk of ``chunks`` (frames of whole resolutions), yielded as computed."""
+    for chunk in chunks:
+        yield extract_paragraph_level(chunk, ref, store=store, metrics=metrics)
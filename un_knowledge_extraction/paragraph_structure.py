@@ -0,0 +1,102 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""First action verb and preambular/operative type of the paragraphs.
+
+``ParagraphTypeClassifier`` walks the rows of one ``SourceFile`` in ``Index``
+order:
+
+* a paragraph of at least ten tokens not starting with a lowercase letter
+  gets the first verb of the verb lists among its first ten tokens as
+  ``First_Action_Verb``, and ``preambular`` or ``operative`` as
+  ``Paragraph_Type`` after the list of that verb;
+* a paragraph starting with a lowercase letter continues an earlier one and
+  takes the last type set among the four rows before the previous row.
+
+The verbs are looked up in a dictionary of verb phrases by their first word,
+so entries of the verb lists may have several words (``taking note``). The
+state of a document only depends on its own rows, so documents can be
+classified in any order or in different processes, and the columns are set
+once per frame.
+"""
+
+from collections import deque
+
+
+PREAMBULAR = 'preambular'
+OPERATIVE = 'operative'
+
+MIN_TOKENS = 10
+VERB_POSITIONS = 10
+# A continuation paragraph looks at the rows p-5 to p-2 before it.
+LOOK_BACK = 5
+
+
+class ParagraphTypeClassifier:
+    """Classify the paragraphs of documents with the preambular and operative verb lists."""
+
+    def __init__(self, preambular_verb_list, operative_verb_list):
+        self.verb_types = dict()
+        # Verbs of both lists are preambular, as the preambular list is checked first.
+        for Paragraph_Type, verb_list in [(OPERATIVE, operative_verb_list), (PREAMBULAR, preambular_verb_list)]:
+            for verb in verb_list:
+                phrase = tuple(verb.lower().split())
+                if phrase:
+                    self.verb_types[phrase] = Paragraph_Type
+        lengths = dict()
+        for phrase in self.verb_types:
+            lengths.setdefault(phrase[0], set()).add(len(phrase))
+        # Longest phrase first, so ``taking note`` wins over ``taking``.
+        self.phrase_lengths = {word: sorted(word_lengths, reverse=True) for word, word_lengths in lengths.items()}
+
+    def first_action_verb(self, tokens):
+        """``(First_Action_Verb, Paragraph_Type)`` of the first verb among the first ten ``tokens``, or ``('', '')``."""
+        phrase_lengths = self.phrase_lengths
+        for i, word in enumerate(tokens[:VERB_POSITIONS]):
+            for length in phrase_lengths.get(word, ()):
+                phrase = tuple(tokens[i:i + length])
+                Paragraph_Type = self.verb_types.get(phrase)
+                if Paragraph_Type is not None:
+                    return ' '.join(phrase), Paragraph_Type
+        return '', ''
+
+    def classify_document(self, rows):
+        """Yield ``(First_Action_Verb, Paragraph_Type)`` for the ``(Type, text, tokens)`` rows of one document.
+
+        ``rows`` are in ``Index`` order; ``text`` and ``tokens`` are the
+        stripped text and the lowercased tokens of ``normalization``.
+        """
+        previous_types = deque(maxlen=LOOK_BACK)
+        for Type, text, tokens in rows:
+            First_Action_Verb = Paragraph_Type = ''
+            if Type == 'Paragraph' and len(tokens) >= MIN_TOKENS:
+                if text[0].islower():
+                    for earlier_type in reversed(list(previous_types)[:-1]):
+                        if earlier_type:
+                            Paragraph_Type = earlier_type
+                            break
+                else:
+                    First_Action_Verb, Paragraph_Type = self.first_action_verb(tokens)
+            previous_types.append(Paragraph_Type)
+            yield First_Action_Verb, Paragraph_Type
+
+    def classify(self, UN_DOCS_Paragraphs, normalized):
+        """``First_Action_Verb`` and ``Paragraph_Type`` lists of the rows of ``UN_DOCS_Paragraphs``, in row order.
+
+        ``normalized`` holds the ``NormalizedParagraph`` of every row.
+        """
+        documents = dict()
+        for position, SourceFile in enumerate(UN_DOCS_Paragraphs['SourceFile'].tolist()):
+            documents.setdefault(SourceFile, []).append(position)
+        Types = UN_DOCS_Paragraphs['Type'].tolist()
+        Indexes = UN_DOCS_Paragraphs['Index'].tolist()
+
+        First_Action_Verb = [''] * len(Types)
+        Paragraph_Type = [''] * len(Types)
+        for positions in documents.values():
+            positions.sort(key=Indexes.__getitem__)
+            rows = ((Types[p], normalized[p].text, normalized[p].tokens) for p in positions)
+            for position, (verb, paragraph_type) in zip(positions, self.classify_document(rows)):
+                First_Action_Verb[position] = verb
+                Paragraph_Type[position] = paragraph_type
+        return First_Action_Verb, Paragraph_Type
@@ -0,0 +1,105 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Sharded execution of the paragraph level extraction on a process pool.
+
+Every stage of the paragraph level extraction only looks at the rows of one
+``SourceFile``, so the corpus is split into shards of whole resolutions that
+are processed independently. Each worker process builds its ``ReferenceData``
+once, in the pool initializer; the word2vec cache is memory-mapped, so its
+pages are shared between workers by the OS. Only the shard rows and results
+travel between processes, and the results are merged in ``SourceFile`` /
+``Index`` order, which makes the output independent of the number of workers.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .instrumentation import StageMetrics, peak_rss_mb
+from .paragraph_level import extract_paragraph_level
+from .reference_data import ReferenceData
+
+
+_worker_reference_data = None
+_worker_store = None
+
+
+def _init_worker(reference_data_kwargs, store_path):
+    global _worker_reference_data, _worker_store
+    _worker_reference_data = ReferenceData(**reference_data_kwargs)
+    if store_path is not None:
+        from .result_store import ResultStore
+        _worker_store = ResultStore(store_path, _worker_reference_data.fingerprint)
+
+
+def _process_shard(shard):
+    metrics = StageMetrics()
+    UN_DOCS_Paragraphs, UN_DOCS_Resolutions = extract_paragraph_level(shard, _worker_reference_data, store=_worker_store,
+                                                                      metrics=metrics)
+    return UN_DOCS_Paragraphs, UN_DOCS_Resolutions, metrics.pop(), peak_rss_mb()
+
+
+def shard_by_source_file(UN_DOCS_Paragraphs, shards):
+    """Split the corpus into at most ``shards`` frames of whole ``SourceFile``s.
+
+    Resolutions are assigned largest first to the currently smallest shard so
+    that shards have about the same number of rows. Rows keep their original
+    order and index inside a shard.
+    """
+    sizes = UN_DOCS_Paragraphs.groupby('SourceFile', sort=True, observed=True).size().sort_values(ascending=False, kind='mergesort')
+    shard_rows = [0] * shards
+    shard_of = dict()
+    for SourceFile, size in sizes.items():
+        shard = shard_rows.index(min(shard_rows))
+        shard_of[SourceFile] = shard
+        shard_rows[shard] += size
+    assignment = UN_DOCS_Paragraphs['SourceFile'].astype(object).map(shard_of)
+    return [UN_DOCS_Paragraphs.loc[assignment == shard] for shard in range(shards) if shard_rows[shard] > 0]
+
+
+def shard_pool(reference_data_kwargs, workers, store_path=None):
+    """Process pool whose workers load ``ReferenceData(**reference_data_kwargs)`` once."""
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_init_worker, initargs=(reference_data_kwargs, store_path))
+
+
+def run_sharded(UN_DOCS_Paragraphs, reference_data_kwargs, workers, shards_per_worker=4, store_path=None, executor=None,
+                metrics=None):
+    """Run ``extract_paragraph_level`` on shards of the corpus with ``workers`` processes.
+
+    ``reference_data_kwargs`` are the ``ReferenceData`` arguments every worker
+    loads its reference data with; ``store_path`` an optional ``ResultStore``
+    file the workers share. ``executor`` is a running ``shard_pool`` to reuse.
+    The stage metrics of the workers are added to ``metrics``, if given.
+    Returns the same frames as ``extract_paragraph_level`` on the whole corpus.
+    """
+    if executor is None:
+        with shard_pool(reference_data_kwargs, workers, store_path) as executor:
+            return run_sharded(UN_DOCS_Paragraphs, reference_data_kwargs, workers, shards_per_worker, store_path, executor,
+                               metrics)
+    shards = shard_by_source_file(UN_DOCS_Paragraphs, max(1, workers * shards_per_worker))
+    results = []
+    for UN_DOCS_Paragraphs_shard, UN_DOCS_Resolutions_shard, shard_metrics, worker_peak in executor.map(_process_shard, shards):
+        results.append((UN_DOCS_Paragraphs_shard, UN_DOCS_Resolutions_shard))
+        if metrics is not None:
+            metrics.merge(shard_metrics, worker_peak)
+    return merge_shard_results(results)
+
+
+def iter_sharded(chunks, reference_data_kwargs, workers, shards_per_worker=4, store_path=None, metrics=None):
+    """``run_sharded`` on every chunk of ``chunks``, with one pool for the whole stream."""
+    with shard_pool(reference_data_kwargs, workers, store_path) as executor:
+        for chunk in chunks:
+            yield run_sharded(chunk, reference_data_kwargs, workers, shards_per_worker, store_path, executor, metrics)
+
+
+def merge_shard_results(results):
+    """Concatenate per-shard results in ``SourceFile`` / ``Index`` order."""
+    UN_DOCS_Paragraphs = pd.concat([paragraphs for paragraphs, _ in results])
+    UN_DOCS_Paragraphs = UN_DOCS_Paragraphs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+    UN_DOCS_Resolutions = pd.concat([resolutions for _, resolutions in results])
+    UN_DOCS_Resolutions = UN_DOCS_Resolutions.sort_values(by=['SourceFile'], kind='mergesort').reset_index(drop=True)
+    return UN_DOCS_Paragraphs, UN_DOCS_Resolutions
@@ -0,0 +1,329 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Resolution and paragraph level extraction runs, and their command line.
+
+``run_resolution_level`` and ``run_paragraph_level`` read the corpus of a
+data directory in chunks of whole resolutions and write their results to an
+output directory, created if it does not exist. Only the modules and
+reference data a run needs are loaded: a resolution level run imports neither
+NLTK, spaCy nor the word2vec store, and a paragraph level run loads the word
+vectors and the spaCy model when the first chunk reaches the stages using
+them. Run them with::
+
+    python -m un_knowledge_extraction resolutions --data-dir ./UN_Knowledge_Extraction/data/
+    python -m un_knowledge_extraction paragraphs --data-dir ./UN_Knowledge_Extraction/data/ --workers 4
+
+The stages themselves (``paragraph_level.extract_paragraph_features``,
+``resolution_level.extract_resolution_metadata``, ...) can also be imported
+and called on a frame of whole resolutions.
+
+Instead of the corpus file, both runs can read the per-document files the
+document parser wrote to a folder (``--documents-dir``, see
+``document_folder``), and keep watching it for new documents (``--watch``).
+"""
+
+import argparse
+import os
+
+from .ingestion import CORPUS_FILE, DEFAULT_CHUNKSIZE, CorpusFileSource, corpus_order
+from .document_folder import DEFAULT_READER_THREADS
+from .instrumentation import PROFILERS, MetricsReporter, StageMetrics
+from .ner import DEFAULT_SPACY_MODEL
+from .output import OUTPUT_FORMATS, open_output, output_path
+from .sdg_keywords import SDG_KEYWORD_MODES
+
+
+DEFAULT_DATA_DIR = './UN_Knowledge_Extraction/data/'
+DEFAULT_OUTPUT_DIR = './UN_Knowledge_Extraction/output/'
+
+PARTITION_COLUMN = 'Resolutuion_Adoption_Year'
+
+
+def open_source(data_dir=DEFAULT_DATA_DIR, chunksize=DEFAULT_CHUNKSIZE, usecols=None, documents_dir=None, watch=False,
+                reader_threads=DEFAULT_READER_THREADS):
+    """The corpus file of ``data_dir`` or, with ``documents_dir``, the document parser output in that folder.
+
+    Both have a ``chunks()`` generator of frames of whole resolutions and the
+    ``fraction`` of the input read so far. ``watch`` keeps reading the new
+    files of ``documents_dir`` until interrupted, with ``reader_threads``
+    threads reading the files.
+    """
+    if documents_dir is None:
+        return CorpusFileSource(os.path.join(data_dir, CORPUS_FILE), chunksize, usecols)
+    from .document_folder import DocumentFolderSource
+    return DocumentFolderSource(documents_dir, chunksize, reader_threads, usecols=usecols, watch=watch)
+
+
+def _partition_by(partition_by_year, output_format):
+    if partition_by_year and output_format != 'parquet':
+        raise ValueError('partition_by_year needs the parquet output format, not %r' % output_format)
+    return PARTITION_COLUMN if partition_by_year else None
+
+
+def run_resolution_level(data_dir=DEFAULT_DATA_DIR, output_dir=DEFAULT_OUTPUT_DIR, output_format='parquet',
+                         partition_by_year=False, chunksize=DEFAULT_CHUNKSIZE, metrics_path=None, progress=False,
+                         documents_dir=None, watch=False, reader_threads=DEFAULT_READER_THREADS):
+    """Write ``output_UN_DOCS_resolution_level`` for the corpus of ``data_dir`` and return its path.
+
+    ``metrics_path`` is an optional JSON lines file for the stage metrics,
+    ``progress`` shows a progress bar on stderr. ``documents_dir``,
+    ``watch`` and ``reader_threads`` are passed to ``open_source``.
+    """
+    from .resolution_level import extract_resolution_metadata
+
+    partition_by = _partition_by(partition_by_year, output_format)
+    os.makedirs(output_dir, exist_ok=True)
+    path = output_path(output_dir, 'output_UN_DOCS_resolution_level', output_format, partition_by)
+    metrics = StageMetrics()
+    reporter = MetricsReporter(metrics_path, progress)
+    source = open_source(data_dir, chunksize, ['SourceFile', 'Index', 'Type', 'Content'], documents_dir, watch,
+                         reader_threads)
+    output = open_output(output_format, path, partition_by=partition_by)
+    try:
+        for UN_DOCS in source.chunks():
+            rows = len(UN_DOCS.index)
+            with metrics.stage('resolution_metadata', rows):
+                UN_DOCS_resolution_level = extract_resolution_metadata(UN_DOCS)
+            with metrics.stage('output', rows):
+                output.write(UN_DOCS_resolution_level)
+            reporter.report_chunk(metrics.pop(), rows, source.fraction)
+    except KeyboardInterrupt:
+        if not watch:
+            raise
+        # Ctrl-C ends a watching run, which then saves the results of the documents extracted so far.
+        print('interrupted, saving the results of the documents extracted so far')
+    finally:
+        output.close()
+        reporter.close()
+        source.close()
+    return path
+
+
+def reference_data_kwargs(data_dir=DEFAULT_DATA_DIR, output_dir=DEFAULT_OUTPUT_DIR, w2v_cache_dir=None,
+                          w2v_model_path=None, spacy_model=DEFAULT_SPACY_MODEL, sdg_keyword_mode='first',
+                          sdg_high_frequency_rules=False, ner_pipeline=None, bundle_path=None, sdg_prune=True):
+    """Arguments of the ``ReferenceData`` of a paragraph level run, as passed to worker processes."""
+    # The word2vec vectors are read from a vocabulary-restricted cache, built once with
+    # python -m un_knowledge_extraction.embeddings --data-dir ./UN_Knowledge_Extraction/data/
+    return dict(
+            data_dir=data_dir,
+            w2v_cache_dir=w2v_cache_dir or os.path.join(data_dir, 'w2v_cache'),
+            w2v_model_path=w2v_model_path,
+            ner_cache_path=os.path.join(output_dir, 'ner_org_cache.sqlite'),
+            spacy_model=spacy_model,
+            ner_pipeline=ner_pipeline,
+            sdg_keyword_mode=sdg_keyword_mode,
+            sdg_high_frequency_rules=sdg_high_frequency_rules,
+            sdg_prune=sdg_prune,
+            bundle_path=bundle_path,
+            )
+
+
+def run_paragraph_level(data_dir=DEFAULT_DATA_DIR, output_dir=DEFAULT_OUTPUT_DIR, output_format='parquet',
+                        partition_by_year=False, chunksize=DEFAULT_CHUNKSIZE, workers=1, incremental=False,
+                        metrics_path=None, progress=False, profile_stage=None, profiler='cprofile',
+                        documents_dir=None, watch=False, reader_threads=DEFAULT_READER_THREADS, paragraph_index=False,
+                        **kwargs):
+    """Write ``output_UN_DOCS_paragraph_level`` and the citation graph for the corpus of ``data_dir``.
+
+    ``metrics_path`` is an optional JSON lines file for the stage metrics,
+    ``progress`` shows a progress bar on stderr and ``profile_stage`` runs
+    ``profiler`` around that stage, writing the profiles to ``output_dir``
+    (only for the stages run in this process, i.e. with ``workers=1``).
+    ``documents_dir``, ``watch`` and ``reader_threads`` are passed to
+    ``open_source``. With ``paragraph_index`` the semantic search index of the
+    paragraphs is written to ``output_dir`` as well (see ``paragraph_index``).
+    ``kwargs`` are passed to ``reference_data_kwargs``. Returns how often each
+    organization name outside the known lists was found.
+    """
+    from .citations import CITATION_GRAPH_FILE, CitationGraph
+    from .paragraph_level import iter_paragraph_level, unknown_organization_counts
+    from .ragged import CompactFrame
+    from .resolution_level import extract_resolution_metadata
+
+    partition_by = _partition_by(partition_by_year, output_format)
+    os.makedirs(output_dir, exist_ok=True)
+    ref_kwargs = reference_data_kwargs(data_dir, output_dir, **kwargs)
+    metrics = StageMetrics(profile_stage, profiler, output_dir)
+    source = open_source(data_dir, chunksize, documents_dir=documents_dir, watch=watch, reader_threads=reader_threads)
+    chunks = source.chunks()
+
+    if incremental:
+        from .result_store import iter_incremental
+        results = iter_incremental(chunks, ref_kwargs, os.path.join(output_dir, 'paragraph_level_results.sqlite'), workers,
+                                   metrics=metrics)
+    elif workers > 1:
+        from .parallel import iter_sharded
+        results = iter_sharded(chunks, ref_kwargs, workers, metrics=metrics)
+    else:
+        from .reference_data import ReferenceData
+        ref = ReferenceData(**ref_kwargs)
+        results = iter_paragraph_level(chunks, ref, metrics=metrics)
+
+    organization_columns = ['SourceFile', 'Organization_Names_known', 'Organization_Names_not_from_known_orginal', 'Organization_Names_not_from_known_inferred']
+    UN_DOCS_Resolutions = CompactFrame(organization_columns[1:])
+    citation_graph = CitationGraph()
+    recomputed = 0
+    reporter = MetricsReporter(metrics_path, progress)
+    index_writer = None
+    if paragraph_index:
+        from .embeddings import EmbeddingStore
+        from .paragraph_index import PARAGRAPH_INDEX_DIR, ParagraphIndexWriter
+        index_writer = ParagraphIndexWriter(os.path.join(output_dir, PARAGRAPH_INDEX_DIR),
+                                            EmbeddingStore(ref_kwargs['w2v_cache_dir']), data_dir)
+    output = open_output(output_format,
+                         output_path(output_dir, 'output_UN_DOCS_paragraph_level', output_format, partition_by),
+                         partition_by=partition_by)
+    try:
+        for result in results:
+            rows = len(result[0].index)
+            with metrics.stage('output', rows):
+                UN_DOCS_Paragraphs, UN_DOCS_Resolutions_chunk = corpus_order(result[0]), result[1]
+                if incremental:
+                    recomputed += len(result[2])
+                adoption_years = None
+                if partition_by is not None or index_writer is not None:
+                    # Extracted once per chunk for the partitions and the paragraph index.
+                    UN_DOCS_resolution_level = extract_resolution_metadata(UN_DOCS_Paragraphs)
+                    adoption_years = dict(zip(UN_DOCS_resolution_level['SourceFile'], UN_DOCS_resolution_level[PARTITION_COLUMN]))
+                if partition_by is not None:
+                    UN_DOCS_Paragraphs[partition_by] = UN_DOCS_Paragraphs['SourceFile'].astype(object).map(adoption_years)
+                output.write(UN_DOCS_Paragraphs)
+                citation_graph.add_paragraphs(UN_DOCS_Paragraphs)
+                UN_DOCS_Resolutions.append(UN_DOCS_Resolutions_chunk.reindex(columns=organization_columns))
+            if index_writer is not None:
+                with metrics.stage('paragraph_index', rows):
+                    index_writer.add(UN_DOCS_Paragraphs, adoption_years)
+            reporter.report_chunk(metrics.pop(), rows, source.fraction)
+    except KeyboardInterrupt:
+        if not watch:
+            raise
+        # Ctrl-C ends a watching run, which then saves the results of the documents extracted so far.
+        print('interrupted, saving the results of the documents extracted so far')
+    finally:
+        output.close()
+        reporter.close(metrics.worker_peak_rss_mb)
+        source.close()
+    citation_graph.save(os.path.join(output_dir, CITATION_GRAPH_FILE))
+    if index_writer is not None:
+        index_writer.close()
+    if incremental:
+        print('recomputed %d resolutions' % recomputed)
+
+    return unknown_organization_counts(UN_DOCS_Resolutions.to_frame())
+
+
+def _add_common_arguments(parser):
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help='directory of the corpus and reference data (default: %s)' % DEFAULT_DATA_DIR)
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help='directory the results are written to (default: %s)' % DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='parquet',
+                        help='parquet (default), jsonl or excel')
+    parser.add_argument('--partition-by-year', action='store_true',
+                        help='partition the parquet output by resolution adoption year')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='rows of the corpus read and processed at a time (default: %d)' % DEFAULT_CHUNKSIZE)
+    parser.add_argument('--metrics', default=None,
+                        help='JSON lines file of the per-stage metrics (default: <output-dir>/<command>_metrics.jsonl)')
+    parser.add_argument('--no-progress', action='store_true', help='do not show the progress bar')
+    parser.add_argument('--documents-dir', default=None,
+                        help='read the per-document CSV or JSON files the document parser wrote to this folder '
+                             'instead of the corpus file of the data directory')
+    parser.add_argument('--watch', action='store_true',
+                        help='with --documents-dir, keep reading the files written to the folder until interrupted')
+    parser.add_argument('--reader-threads', type=int, default=DEFAULT_READER_THREADS,
+                        help='threads reading the files of --documents-dir (default: %d)' % DEFAULT_READER_THREADS)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m un_knowledge_extraction',
+                                     description='Extract knowledge from UN resolutions.')
+    commands = parser.add_subparsers(dest='command', metavar='{paragraphs,resolutions,compile-reference-data}')
+    commands.required = True
+
+    resolutions = commands.add_parser('resolutions', help='extract resolution level information')
+    _add_common_arguments(resolutions)
+
+    paragraphs = commands.add_parser('paragraphs', help='extract paragraph level information')
+    _add_common_arguments(paragraphs)
+    paragraphs.add_argument('--workers', type=int, default=1,
+                            help='number of worker processes; the corpus is sharded by SourceFile (default: 1)')
+    paragraphs.add_argument('--incremental', action='store_true',
+                            help='only recompute new or changed resolutions, reusing the results stored by previous runs')
+    paragraphs.add_argument('--sdg-keyword-mode', choices=SDG_KEYWORD_MODES, default='first',
+                            help='tag a paragraph with the first matching SDG keyword rule (default) or with all of them')
+    paragraphs.add_argument('--sdg-high-frequency-rules', action='store_true',
+                            help='add a keyword rule per SDG made of the high frequency words of its targets and indicators')
+    paragraphs.add_argument('--no-sdg-pruning', action='store_true',
+                            help='score every SDG target and indicator against every paragraph, as the original '
+                                 'extraction did, instead of those sharing a word with the paragraph')
+    paragraphs.add_argument('--w2v-cache-dir', default=None, help='word2vec cache (default: <data-dir>/w2v_cache/)')
+    paragraphs.add_argument('--w2v-model', default=None,
+                            help='full word2vec model, loaded (several GB) for words missing from the cache '
+                                 '(default: none, such words are out of vocabulary)')
+    paragraphs.add_argument('--bundle', default=None,
+                            help='compiled reference data (default: <data-dir>/reference_data.bundle if it exists)')
+    paragraphs.add_argument('--spacy-model', default=DEFAULT_SPACY_MODEL,
+                            help='installed spaCy model of the ORG extraction (default: %s)' % DEFAULT_SPACY_MODEL)
+    paragraphs.add_argument('--paragraph-index', action='store_true',
+                            help='also write the semantic search index of the paragraphs (see paragraph_index)')
+    paragraphs.add_argument('--verbose', action='store_true',
+                            help='print the ten most frequent words of the targets and indicators of every SDG '
+                                 'before the run, as the original script did')
+    paragraphs.add_argument('--profile-stage', default=None, metavar='STAGE',
+                            help='profile one stage (e.g. target_similarity or ner) and write the profile to the output directory')
+    paragraphs.add_argument('--profiler', choices=PROFILERS, default='cprofile',
+                            help='cprofile (default) or tracemalloc, for --profile-stage')
+
+    compile_reference = commands.add_parser('compile-reference-data',
+                                            help='compile the reference data of a data directory into one bundle file')
+    compile_reference.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                                   help='directory of the reference data (default: %s)' % DEFAULT_DATA_DIR)
+    compile_reference.add_argument('--bundle', default=None,
+                                   help='bundle file (default: <data-dir>/reference_data.bundle, loaded automatically; '
+                                        'load another path with paragraphs --bundle)')
+    compile_reference.add_argument('--w2v-cache-dir', default=None,
+                                   help='word2vec cache the embeddings are computed with (default: <data-dir>/w2v_cache/)')
+    compile_reference.add_argument('--sdg-keyword-mode', choices=SDG_KEYWORD_MODES, default='first')
+    compile_reference.add_argument('--sdg-high-frequency-rules', action='store_true')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'compile-reference-data':
+        from .reference_bundle import compile_reference_data
+        header = compile_reference_data(args.bundle, data_dir=args.data_dir, w2v_cache_dir=args.w2v_cache_dir,
+                                        sdg_keyword_mode=args.sdg_keyword_mode,
+                                        sdg_high_frequency_rules=args.sdg_high_frequency_rules)
+        print('compiled reference data %s (embeddings: %s)'
+              % (header['fingerprint'], 'yes' if header['w2v_meta'] is not None else 'no word2vec cache'))
+        return
+    if args.watch and args.documents_dir is None:
+        parser.error('--watch needs --documents-dir')
+    if args.partition_by_year and args.output_format != 'parquet':
+        parser.error('--partition-by-year needs --output-format parquet')
+    metrics_path = args.metrics or os.path.join(args.output_dir, '%s_metrics.jsonl' % args.command)
+    common = dict(data_dir=args.data_dir, output_dir=args.output_dir, output_format=args.output_format,
+                  partition_by_year=args.partition_by_year, chunksize=args.chunksize,
+                  metrics_path=metrics_path, progress=not args.no_progress, documents_dir=args.documents_dir,
+                  watch=args.watch, reader_threads=args.reader_threads)
+    if args.command == 'resolutions':
+        run_resolution_level(**common)
+    else:
+        if args.verbose:
+            from .reference_data import ReferenceData
+            ref = ReferenceData(**reference_data_kwargs(args.data_dir, args.output_dir, sdg_keyword_mode=args.sdg_keyword_mode,
+                                                        sdg_high_frequency_rules=args.sdg_high_frequency_rules,
+                                                        bundle_path=args.bundle))
+            for SDG in ref.SDG_Targets_Indicators_High_Frequency_Words.keys():
+                print(SDG, ref.SDG_Targets_Indicators_High_Frequency_Words[SDG])
+        run_paragraph_level(workers=args.workers, incremental=args.incremental,
+                            w2v_cache_dir=args.w2v_cache_dir, w2v_model_path=args.w2v_model,
+                            spacy_model=args.spacy_model, profile_stage=args.profile_stage, profiler=args.profiler,
+                            sdg_keyword_mode=args.sdg_keyword_mode,
+                            sdg_high_frequency_rules=args.sdg_high_frequency_rules, bundle_path=args.bundle,
+                            sdg_prune=not args.no_sdg_pruning, paragraph_index=args.paragraph_index, **common)
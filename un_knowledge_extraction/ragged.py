@@ -0,0 +1,82 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Compact storage of list columns.
+
+Most paragraphs have no key terms, SDGs, countries or organizations, yet a
+list column holds a separate (mostly empty) Python list for every row.
+``RaggedList`` keeps the lists of a column as one flat value list plus an
+``int64`` offsets array, so an empty row costs eight bytes. ``CompactFrame``
+accumulates result batches that way until the whole frame is needed.
+"""
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+
+class RaggedList:
+    """Sequence of lists stored as a shared value list and row offsets."""
+
+    def __init__(self, values, offsets):
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_lists(cls, lists):
+        lists = [x if isinstance(x, (list, tuple)) else [] for x in lists]
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in lists], out=offsets[1:])
+        return cls(list(chain.from_iterable(lists)), offsets)
+
+    @classmethod
+    def concat(cls, parts):
+        values = []
+        offsets = [np.zeros(1, dtype=np.int64)]
+        for part in parts:
+            offsets.append(part.offsets[1:] + len(values))
+            values.extend(part.values)
+        return cls(values, np.concatenate(offsets))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def tolist(self):
+        return list(self)
+
+
+class CompactFrame:
+    """Result batches with their ``list_columns`` kept as ``RaggedList``s."""
+
+    def __init__(self, list_columns):
+        self.list_columns = list_columns
+        self._frames = []
+        self._lists = []
+        self._columns = []
+
+    def __len__(self):
+        return sum(len(frame.index) for frame in self._frames)
+
+    def append(self, frame):
+        columns = [column for column in self.list_columns if column in frame.columns]
+        self._lists.append({column: RaggedList.from_lists(frame[column].tolist()) for column in columns})
+        self._frames.append(frame.drop(columns=columns))
+        self._columns = list(frame.columns)
+
+    def to_frame(self):
+        """The concatenated batches with list columns restored, in the column order of the last batch."""
+        if not self._frames:
+            return pd.DataFrame()
+        frame = pd.concat(self._frames)
+        for column in self.list_columns:
+            if all(column in lists for lists in self._lists):
+                frame[column] = RaggedList.concat([lists[column] for lists in self._lists]).tolist()
+        return frame[[column for column in self._columns if column in frame.columns]]
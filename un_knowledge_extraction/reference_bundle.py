@@ -0,0 +1,119 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Compiled reference data bundle.
+
+Building a ``ReferenceData`` parses four Excel files, two CSV files and the
+verb, keyword and rule files and cleans the lists read from them. The
+compile command does that once and writes the result, with the compiled
+gazetteers, the organization filter, the SDG keyword rules and, when the
+word2vec cache exists, the target/indicator and known organization
+embeddings, to one file::
+
+    python -m un_knowledge_extraction compile-reference-data --data-dir ./UN_Knowledge_Extraction/data/
+
+The file is ``MAGIC``, the length of a JSON header, the header and a pickle
+of the ``ReferenceData`` lists and dictionaries, with every matcher pickled
+separately inside it so it is only unpickled when a stage first uses it. The
+header holds the bundle format version,
+``EXTRACTION_VERSION``, the SHA-256 of every reference file the bundle was
+compiled from, the options it was compiled with, the metadata of the
+word2vec cache and the ``fingerprint`` of the reference data, so
+``read_bundle_header`` gives the cache key of a bundle without unpickling it.
+
+``ReferenceData`` loads ``<data_dir>/reference_data.bundle`` (or the
+``bundle_path`` it is given, ``--bundle`` of the ``paragraphs`` command) when
+it exists and was compiled from the current files with the same code and
+options; otherwise it warns and reads the files as before.
+"""
+
+import gc
+import hashlib
+import json
+import os
+import pickle
+import struct
+
+
+REFERENCE_BUNDLE_FILE = 'reference_data.bundle'
+BUNDLE_FORMAT_VERSION = 1
+MAGIC = b'UNKEREFDATA\n'
+
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_hashes(paths):
+    """``{name: SHA-256}`` of the files of ``paths`` (``{name: path}``); missing files hash to ``None``."""
+    return {name: file_sha256(path) if os.path.exists(path) else None for name, path in paths.items()}
+
+
+def write_bundle(path, header, state):
+    header = dict(header, format_version=BUNDLE_FORMAT_VERSION)
+    header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _read_header(f, path):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError('%s is not a reference data bundle' % path)
+    length, = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+    return json.loads(f.read(length).decode('utf-8'))
+
+
+def read_bundle_header(path):
+    """The JSON header of the bundle at ``path``."""
+    with open(path, 'rb') as f:
+        return _read_header(f, path)
+
+
+def read_bundle(path):
+    """``(header, state)`` of the bundle at ``path``."""
+    with open(path, 'rb') as f:
+        header = _read_header(f, path)
+        if header.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError('%s has bundle format %s, expected %s'
+                             % (path, header.get('format_version'), BUNDLE_FORMAT_VERSION))
+        return header, pickle.load(f)
+
+
+def dump_section(obj):
+    """``obj`` pickled on its own, to be loaded with ``load_section`` when first needed."""
+    return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_section(data):
+    # A matcher is hundreds of thousands of small containers; the cyclic
+    # garbage collector would otherwise run many times while they are created.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def compile_reference_data(bundle_path=None, **reference_data_kwargs):
+    """Build the ``ReferenceData`` of ``reference_data_kwargs`` from its files and write its bundle.
+
+    Returns the bundle header.
+    """
+    from .reference_data import ReferenceData
+
+    ref = ReferenceData(use_bundle=False, **reference_data_kwargs)
+    bundle_path = bundle_path or os.path.join(ref.data_dir, REFERENCE_BUNDLE_FILE)
+    return ref.save_bundle(bundle_path)
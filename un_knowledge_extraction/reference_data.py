@@ -0,0 +1,400 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Reference data of the paragraph level extraction.
+
+``ReferenceData`` reads the UNBIS terms, SDG targets/indicators, verb lists,
+country list and organization lists of a data directory and compiles the
+matchers built on them. The word2vec store, the SDG similarity engine and the
+spaCy ORG extractor are only created when first used. One instance is built
+per process and shared by every shard that process works on.
+
+When the data directory holds an up-to-date ``reference_data.bundle``
+(see ``reference_bundle``) the lists and matchers are loaded from it
+instead of being read and compiled again.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import string
+import warnings
+from collections import Counter
+
+import pandas as pd
+
+from .gazetteer import Gazetteer
+from .ner import DEFAULT_SPACY_MODEL
+from .reference_bundle import (BUNDLE_FORMAT_VERSION, REFERENCE_BUNDLE_FILE, dump_section, load_section, read_bundle,
+                               read_bundle_header, source_hashes, write_bundle)
+from .sdg_keywords import SDG_KEYWORD_RULES_FILE, SDGKeywordRules, load_sdg_keyword_rules, rules_from_high_frequency_words
+
+
+# Bumped whenever a change of the extraction code changes its results, so
+# results stored by incremental runs of older code are not reused.
+EXTRACTION_VERSION = 5
+
+additional_un_org_list = [
+        'Advisory Committee on Administrative and Budgetary Questions',
+        'African Union Mission in Somalia',
+        'European Union Rule of Law Mission in Kosovo',
+        'Special Political and Decolonization Committee (Fourth Committee)',
+        'United Nations Conference on Environment and Development',
+        'United Nations Entity for Gender Equality and the Empowerment of Women (UN-Women)',
+        'Bretton Woods Institutions',
+        'International Tribunal for the Former Yugoslavia',
+        'United Nations Assistance Mission in Afghanistan',
+        'United Nations Operation in Cte dIvoire',
+        'Consultative Group on International Agricultural Research',
+        ]
+
+# Files of the data directory the reference data is read from, besides the SDG keyword rules.
+REFERENCE_FILES = [
+        'UNBIS_terms.csv',
+        'SDG_Targets_Indicators.csv',
+        'preambular_verb_list.txt',
+        'operative_verb_list.txt',
+        'country_list.xlsx',
+        'agencies.xlsx',
+        'un_entities_20191017.xlsx',
+        'names_A60-72.xlsx',
+        'key_words_un_org_list.txt',
+        'key_words_not_un_org_list.txt',
+        ]
+
+# Settings of a run, not saved in a reference data bundle.
+_RUNTIME_ATTRIBUTES = [
+        'data_dir', 'w2v_cache_dir', 'w2v_model_path', 'ner_cache_path', 'spacy_model', 'ner_pipeline',
+        'ner_batch_size', 'ner_n_process', 'sdg_keyword_rules_path', 'sdg_keyword_mode', 'sdg_high_frequency_rules',
+        'sdg_prune',
+        ]
+
+# Matchers saved in a reference data bundle, each loaded from it on first use;
+# the embedding ones only when a word2vec cache exists.
+BUNDLED_MATCHERS = [
+        'UNBIS_terms_gazetteer',
+        'country_names_gazetteer',
+        'known_un_org_gazetteer',
+        'organization_filter',
+        'sdg_keyword_engine',
+        'sdg_similarity_engine',
+        'organization_linker',
+        ]
+EMBEDDING_MATCHERS = ['sdg_similarity_engine', 'organization_linker']
+
+similarity_threshold_target = 0.9
+similarity_threshold_indicator = 0.9
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def read_sdg_targets_indicators(data_dir):
+    """``SDG_Targets_Indicators.csv``: the ``SDG``, ``Type`` (``Targets`` or ``Indicators``), ``Index`` and ``Content`` of each."""
+    SDG_Targets_Indicators = pd.read_csv(os.path.join(data_dir, "SDG_Targets_Indicators.csv"), encoding='cp1252')
+    # The file of the repository starts with a UTF-8 byte order mark, read as part of the first column name.
+    return SDG_Targets_Indicators.rename(columns=lambda column: column.replace('\u00ef\u00bb\u00bf', ''))
+
+
+class ReferenceData:
+    """Term lists, dictionaries and matchers read from ``data_dir``."""
+
+    def __init__(self, data_dir, w2v_cache_dir=None, w2v_model_path=None,
+                 ner_cache_path=None, spacy_model=DEFAULT_SPACY_MODEL, ner_pipeline=None, ner_batch_size=32, ner_n_process=1,
+                 sdg_keyword_rules_path=None, sdg_keyword_mode='first', sdg_high_frequency_rules=False,
+                 sdg_prune=True, bundle_path=None, use_bundle=True):
+        self.data_dir = data_dir
+        self.w2v_cache_dir = w2v_cache_dir or os.path.join(data_dir, 'w2v_cache')
+        # The full model is only read for words missing from the cache when it is given.
+        self.w2v_model_path = w2v_model_path
+        self.ner_cache_path = ner_cache_path
+        self.spacy_model = spacy_model
+        # A loaded pipeline used instead of ``spacy_model``, such as the stand-in of the benchmarks.
+        self.ner_pipeline = ner_pipeline
+        self.ner_batch_size = ner_batch_size
+        self.ner_n_process = ner_n_process
+        self._w2v_google = None
+        self._sdg_similarity_engine = None
+        self._org_entity_extractor = None
+        self._organization_filter = None
+        self._organization_linker = None
+        self._sdg_keyword_engine = None
+        self._paragraph_type_classifier = None
+        self._UNBIS_terms_gazetteer = None
+        self._country_names_gazetteer = None
+        self._known_un_org_gazetteer = None
+        self._bundled_matchers = dict()
+        self._fingerprint = None
+        self.sdg_keyword_rules_path = sdg_keyword_rules_path or os.path.join(data_dir, SDG_KEYWORD_RULES_FILE)
+        self.sdg_keyword_mode = sdg_keyword_mode
+        self.sdg_high_frequency_rules = sdg_high_frequency_rules
+        # Score only the SDG targets/indicators sharing a word with the paragraph, see ``sdg_similarity``.
+        self.sdg_prune = sdg_prune
+
+        bundle_path = bundle_path or os.path.join(data_dir, REFERENCE_BUNDLE_FILE)
+        if not (use_bundle and os.path.exists(bundle_path) and self._load_bundle(bundle_path)):
+            self._read_files(data_dir)
+
+    def _read_files(self, data_dir):
+        from nltk.corpus import stopwords
+        from nltk.tokenize import RegexpTokenizer
+
+        self.stop_words = set(stopwords.words('english'))
+
+        UNBIS_terms = pd.read_csv(os.path.join(data_dir, "UNBIS_terms.csv"), encoding='cp1252')
+        self.UNBIS_terms = [term.lower() for term in UNBIS_terms['Term'].unique().tolist()]
+
+        SDG_Targets_Indicators = read_sdg_targets_indicators(data_dir)
+        targets = SDG_Targets_Indicators.loc[SDG_Targets_Indicators.Type == 'Targets']
+        indicators = SDG_Targets_Indicators.loc[SDG_Targets_Indicators.Type == 'Indicators']
+        self.SDG = list(SDG_Targets_Indicators['SDG'].drop_duplicates())
+        self.Targets_SDG_dict = pd.Series(targets.SDG.values, index=targets.Content).to_dict()
+        self.Indicators_SDG_dict = pd.Series(indicators.SDG.values, index=indicators.Content).to_dict()
+        self.Targets = list(targets['Content'].drop_duplicates())
+        self.Indicators = list(indicators['Content'].drop_duplicates())
+
+        self.SDG_Targets_Indicators_High_Frequency_Words = dict()
+        tokenizer = RegexpTokenizer(r'\w+')
+        for SDG in list(SDG_Targets_Indicators.SDG.unique()):
+            target = [key for key, value in self.Targets_SDG_dict.items() if value == SDG]
+            indicator = [key for key, value in self.Indicators_SDG_dict.items() if value == SDG]
+            all_words = [w for w in tokenizer.tokenize(' '.join(target + indicator).lower().replace('\t', ' ')) if w not in self.stop_words]
+            self.SDG_Targets_Indicators_High_Frequency_Words[SDG] = Counter(all_words).most_common(10)
+
+        # Rules derived from the high frequency words come after the rules of the file.
+        self.sdg_keyword_rules = load_sdg_keyword_rules(self.sdg_keyword_rules_path)
+        if self.sdg_high_frequency_rules:
+            self.sdg_keyword_rules += rules_from_high_frequency_words(self.SDG_Targets_Indicators_High_Frequency_Words)
+
+        self.preambular_verb_list = read_lines(os.path.join(data_dir, "preambular_verb_list.txt"))
+        self.operative_verb_list = read_lines(os.path.join(data_dir, "operative_verb_list.txt"))
+
+        country_list = pd.read_excel(os.path.join(data_dir, "country_list.xlsx")).fillna('')
+        self.country_names = [country.strip().replace('&', 'and') for country in country_list['Country'].tolist()]
+
+        UN_agencies = pd.read_excel(os.path.join(data_dir, "agencies.xlsx")).fillna('')
+        UN_known_orgs = pd.read_excel(os.path.join(data_dir, "un_entities_20191017.xlsx")).fillna('')
+        UN_corporate_names = pd.read_excel(os.path.join(data_dir, "names_A60-72.xlsx")).fillna('')
+        UN_corporate_names = [x for x in UN_corporate_names['Name'] if x not in self.country_names]
+        UN_corporate_names = [re.sub(r"[\(].*?[\)]", "", x).replace('UN', 'United Nations').replace('.', '').strip() for x in UN_corporate_names]
+
+        known_un_org_list = sorted(set(
+                UN_agencies['Title'].tolist()
+                + UN_known_orgs['Entity'].tolist()
+                + UN_corporate_names
+                + additional_un_org_list
+                ), key=str)
+        known_un_org_list = [x for x in known_un_org_list if x not in self.country_names]
+        known_un_org_list = [org.translate(str.maketrans('', '', ',;:."')) for org in known_un_org_list]
+        known_un_org_list = [''.join([x if x in string.printable else '' for x in org]) for org in known_un_org_list]
+        self.known_un_org_list = [' '.join(w for w in org.split()) for org in known_un_org_list]
+
+        self.key_words_un_org_list = read_lines(os.path.join(data_dir, "key_words_un_org_list.txt"))
+        self.key_words_not_un_org_list = read_lines(os.path.join(data_dir, "key_words_not_un_org_list.txt"))
+
+    def _source_paths(self):
+        paths = {name: os.path.join(self.data_dir, name) for name in REFERENCE_FILES}
+        paths[SDG_KEYWORD_RULES_FILE] = self.sdg_keyword_rules_path
+        return paths
+
+    def _bundle_options(self):
+        return {'sdg_keyword_mode': self.sdg_keyword_mode, 'sdg_high_frequency_rules': self.sdg_high_frequency_rules}
+
+    def _w2v_meta(self):
+        meta_path = os.path.join(self.w2v_cache_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_bundle(self, path):
+        """Write the reference data, its matchers and, with a word2vec cache, its embeddings to ``path``."""
+        w2v_meta = self._w2v_meta()
+        matchers = dict()
+        for name in BUNDLED_MATCHERS:
+            if name in EMBEDDING_MATCHERS and w2v_meta is None:
+                continue
+            matcher = getattr(self, name)
+            if name == 'organization_linker':
+                matcher.precompute()
+            if name in EMBEDDING_MATCHERS:
+                # The word vectors are read from the cache at run time, never stored in the bundle.
+                matcher = copy.copy(matcher)
+                matcher.w2v = None
+            matchers[name] = dump_section(matcher)
+        attributes = {key: value for key, value in self.__dict__.items()
+                      if not key.startswith('_') and key not in _RUNTIME_ATTRIBUTES}
+        header = {
+                'extraction_version': EXTRACTION_VERSION,
+                'sources': source_hashes(self._source_paths()),
+                'options': self._bundle_options(),
+                'w2v_meta': w2v_meta,
+                'fingerprint': self.fingerprint,
+                }
+        write_bundle(path, header, {'attributes': attributes, 'matchers': matchers})
+        return header
+
+    def _load_bundle(self, path):
+        """Restore the lists saved by ``save_bundle``; ``False`` if the bundle is out of date.
+
+        The matchers stay pickled until first used.
+        """
+        header = read_bundle_header(path)
+        stale = [reason for reason, is_stale in [
+                ('format', header.get('format_version') != BUNDLE_FORMAT_VERSION),
+                ('extraction code', header.get('extraction_version') != EXTRACTION_VERSION),
+                ('options', header.get('options') != self._bundle_options()),
+                ('reference files', header.get('sources') != source_hashes(self._source_paths())),
+                ] if is_stale]
+        if stale:
+            warnings.warn('ignoring %s, compiled with other %s' % (path, ', '.join(stale)))
+            return False
+        header, state = read_bundle(path)
+        self.__dict__.update(state['attributes'])
+        self._bundled_matchers = state['matchers']
+        if header['w2v_meta'] != self._w2v_meta():
+            # Embeddings computed from another word2vec cache are recomputed when needed.
+            for name in EMBEDDING_MATCHERS:
+                self._bundled_matchers.pop(name, None)
+        return True
+
+    def _bundled_matcher(self, name):
+        """The matcher ``name`` loaded from the bundle, or ``None`` if it has to be built."""
+        data = self._bundled_matchers.pop(name, None)
+        return load_section(data) if data is not None else None
+
+    @property
+    def UNBIS_terms_gazetteer(self):
+        if self._UNBIS_terms_gazetteer is None:
+            self._UNBIS_terms_gazetteer = self._bundled_matcher('UNBIS_terms_gazetteer')
+        if self._UNBIS_terms_gazetteer is None:
+            self._UNBIS_terms_gazetteer = Gazetteer(self.UNBIS_terms, word_boundary=True)
+        return self._UNBIS_terms_gazetteer
+
+    @property
+    def country_names_gazetteer(self):
+        if self._country_names_gazetteer is None:
+            self._country_names_gazetteer = self._bundled_matcher('country_names_gazetteer')
+        if self._country_names_gazetteer is None:
+            self._country_names_gazetteer = Gazetteer(self.country_names, lowercase=True)
+        return self._country_names_gazetteer
+
+    @property
+    def known_un_org_gazetteer(self):
+        if self._known_un_org_gazetteer is None:
+            self._known_un_org_gazetteer = self._bundled_matcher('known_un_org_gazetteer')
+        if self._known_un_org_gazetteer is None:
+            self._known_un_org_gazetteer = Gazetteer(self.known_un_org_list)
+        return self._known_un_org_gazetteer
+
+    @property
+    def w2v_google(self):
+        """Word vectors, read through the memory-mapped cache."""
+        if self._w2v_google is None:
+            from .embeddings import EmbeddingStore
+            # Without the full model, words not in the cache are out of vocabulary.
+            self._w2v_google = EmbeddingStore(self.w2v_cache_dir, fallback_path=self.w2v_model_path)
+        return self._w2v_google
+
+    @property
+    def sdg_similarity_engine(self):
+        if self._sdg_similarity_engine is None:
+            self._sdg_similarity_engine = self._bundled_matcher('sdg_similarity_engine')
+            if self._sdg_similarity_engine is not None:
+                self._sdg_similarity_engine.w2v = self.w2v_google
+                self._sdg_similarity_engine.prune = self.sdg_prune
+        if self._sdg_similarity_engine is None:
+            from .sdg_similarity import SDGSimilarityEngine
+            self._sdg_similarity_engine = SDGSimilarityEngine(
+                    self.Targets, self.Indicators, self.Targets_SDG_dict, self.Indicators_SDG_dict, self.w2v_google,
+                    threshold_target=similarity_threshold_target,
+                    threshold_indicator=similarity_threshold_indicator,
+                    prune=self.sdg_prune,
+                    stop_words=self.stop_words,
+                    )
+        return self._sdg_similarity_engine
+
+    @property
+    def org_entity_extractor(self):
+        if self._org_entity_extractor is None:
+            from .ner import OrgEntityExtractor
+            self._org_entity_extractor = OrgEntityExtractor(
+                    self.spacy_model, nlp=self.ner_pipeline, batch_size=self.ner_batch_size, n_process=self.ner_n_process,
+                    cache_path=self.ner_cache_path)
+        return self._org_entity_extractor
+
+    @property
+    def organization_filter(self):
+        if self._organization_filter is None:
+            self._organization_filter = self._bundled_matcher('organization_filter')
+        if self._organization_filter is None:
+            from .org_filter import OrganizationFilter
+            self._organization_filter = OrganizationFilter(
+                    self.known_un_org_list, self.stop_words, self.key_words_un_org_list, self.key_words_not_un_org_list,
+                    self.operative_verb_list, self.preambular_verb_list)
+        return self._organization_filter
+
+    @property
+    def sdg_keyword_engine(self):
+        if self._sdg_keyword_engine is None:
+            self._sdg_keyword_engine = self._bundled_matcher('sdg_keyword_engine')
+        if self._sdg_keyword_engine is None:
+            self._sdg_keyword_engine = SDGKeywordRules(self.sdg_keyword_rules, self.sdg_keyword_mode)
+        return self._sdg_keyword_engine
+
+    @property
+    def paragraph_type_classifier(self):
+        if self._paragraph_type_classifier is None:
+            from .paragraph_structure import ParagraphTypeClassifier
+            self._paragraph_type_classifier = ParagraphTypeClassifier(self.preambular_verb_list, self.operative_verb_list)
+        return self._paragraph_type_classifier
+
+    @property
+    def organization_linker(self):
+        if self._organization_linker is None:
+            self._organization_linker = self._bundled_matcher('organization_linker')
+            if self._organization_linker is not None:
+                self._organization_linker.w2v = self.w2v_google
+        if self._organization_linker is None:
+            from .org_linking import OrganizationLinker
+            self._organization_linker = OrganizationLinker(self.known_un_org_list, self.w2v_google)
+        return self._organization_linker
+
+    @property
+    def fingerprint(self):
+        """Hash of everything the extraction results depend on besides the corpus.
+
+        Covers the term, verb, keyword, country and organization lists, the SDG
+        keyword rules and mode, the SDG targets/indicators, the similarity
+        thresholds, the word2vec cache and the spaCy model name and
+        ``EXTRACTION_VERSION``, so it changes whenever re-running the
+        extraction could give different results.
+        """
+        if self._fingerprint is None:
+            w2v_meta = self._w2v_meta()
+            content = json.dumps([
+                    self.UNBIS_terms,
+                    sorted(self.Targets_SDG_dict.items()),
+                    sorted(self.Indicators_SDG_dict.items()),
+                    self.preambular_verb_list,
+                    self.operative_verb_list,
+                    self.country_names,
+                    self.known_un_org_list,
+                    self.key_words_un_org_list,
+                    self.key_words_not_un_org_list,
+                    self.sdg_keyword_rules,
+                    self.sdg_keyword_mode,
+                    sorted(self.stop_words),
+                    similarity_threshold_target,
+                    similarity_threshold_indicator,
+                    self.sdg_prune,
+                    w2v_meta,
+                    self.spacy_model,
+                    EXTRACTION_VERSION,
+                    ], default=str)
+            self._fingerprint = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return self._fingerprint
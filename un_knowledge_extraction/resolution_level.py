@@ -0,0 +1,80 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Resolution level metadata: session, agenda item, number, title and adoption date.
+
+The corpus is sorted once by ``SourceFile`` and ``Index`` and every resolution
+is read in a single pass over its own rows, stopping as soon as all fields have
+been found. The output columns are built in bulk at the end.
+"""
+
+import re
+
+import pandas as pd
+
+
+RESOLUTION_NUMBER_TITLE = re.compile(r'(\d+/\d+)\s{0,1}\.\s{0,1}(.*)')
+ADOPTION_DATE = re.compile(r'(.*)on (\d{1,2}\s\w+\s\d{4})$')
+DATE_PARTS = re.compile(r'(\d{1,2})\s(\w+)\s(\d{4})')
+
+RESOLUTION_LEVEL_COLUMNS = [
+    'Resolutuion_Session',
+    'Resolutuion_Agenda_item',
+    'Resolutuion_Number',
+    'Resolutuion_Title',
+    'Resolutuion_Adoption_DateMonthYear',
+    'Resolutuion_Adoption_Day',
+    'Resolutuion_Adoption_Month',
+    'Resolutuion_Adoption_Year',
+]
+
+
+def resolution_info(types, contents):
+    """Return ``[session, agenda item, number, title, adoption date]`` of one resolution.
+
+    ``types`` and ``contents`` are the ``Type`` and ``Content`` values of the
+    resolution's rows in ``Index`` order. The first match of each field wins.
+    """
+    session = agenda_item = number = title = adoption_date = ''
+    for Type, Content in zip(types, contents):
+        if session == '' and Type == 'Session':
+            session = Content
+        elif agenda_item == '' and Type == 'AgendaItem':
+            agenda_item = Content
+        else:
+            number_title = RESOLUTION_NUMBER_TITLE.match(Content) if number == '' and title == '' else None
+            if number_title:
+                number, title = number_title.groups()
+            elif adoption_date == '':
+                date = ADOPTION_DATE.match(Content)
+                if date:
+                    adoption_date = date.group(2)
+        if session and agenda_item and (number or title) and adoption_date:
+            break
+    return [session, agenda_item, number, title, adoption_date]
+
+
+def extract_resolution_metadata(UN_DOCS):
+    """One row of resolution level metadata per ``SourceFile``, in order of first appearance."""
+    docs = UN_DOCS[['SourceFile', 'Index', 'Type', 'Content']]
+    source_files = docs['SourceFile'].drop_duplicates().tolist()
+    docs = docs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+    source_file_values = docs['SourceFile'].to_numpy()
+    types = docs['Type'].astype(object).fillna('').to_numpy()
+    contents = docs['Content'].astype(object).fillna('').to_numpy()
+
+    info = dict()
+    start = 0
+    for end in range(1, len(docs) + 1):
+        if end == len(docs) or source_file_values[end] != source_file_values[start]:
+            info[source_file_values[start]] = resolution_info(types[start:end], contents[start:end])
+            start = end
+
+    rows = []
+    for SourceFile in source_files:
+        session, agenda_item, number, title, adoption_date = info.get(SourceFile, [''] * 5)
+        day = month = year = ''
+        if adoption_date != '':
+            day, month, year = DATE_PARTS.match(adoption_date).groups()
+        rows.append([SourceFile, session, agenda_item, number, title, adoption_date, day, month, year])
+    return pd.DataFrame(rows, columns=['SourceFile'] + RESOLUTION_LEVEL_COLUMNS)
@@ -0,0 +1,224 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Content-addressed result store for incremental paragraph level runs.
+
+Results are kept in a SQLite file at two levels, both keyed by hashes that
+include the ``ReferenceData.fingerprint``:
+
+* per paragraph: results of paragraph-local stages (such as the SDG target
+  similarity), keyed by the hash of the paragraph ``Type`` and ``Content``;
+* per resolution: every output column of the resolution's paragraphs and its
+  organization row, keyed by the hash of all of its rows.
+
+``run_incremental`` reuses the stored output of unchanged resolutions and
+only runs the extraction on new or changed ``SourceFile``s. Within those, the
+paragraph-level entries spare the expensive stages for paragraphs that did not
+change. Any change of the reference data changes the fingerprint and
+invalidates every entry; the entries of an older fingerprint are deleted when
+the store is opened with a new one.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from .paragraph_level import extract_paragraph_level
+from .parallel import merge_shard_results, run_sharded, shard_pool
+from .reference_data import ReferenceData
+
+
+TUPLE_LIST_COLUMNS = ['Organization_Names_not_from_known_inferred']
+
+# Number of keys per ``IN (...)`` query, below SQLite's limit of bound parameters.
+QUERY_BATCH = 500
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError('%r is not JSON serializable' % (value,))
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+
+def _restore_record(record):
+    for column in TUPLE_LIST_COLUMNS:
+        if isinstance(record.get(column), list):
+            record[column] = [tuple(x) for x in record[column]]
+    return record
+
+
+def resolution_keys(UN_DOCS_Paragraphs, fingerprint):
+    """``{SourceFile: hash}`` over the ``Index``, ``Type`` and ``Content`` of the resolution's rows."""
+    docs = UN_DOCS_Paragraphs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+    keys = dict()
+    for SourceFile, group in docs.groupby('SourceFile', sort=False, observed=True):
+        h = hashlib.sha256(fingerprint.encode('utf-8'))
+        for Index, Type, Content in zip(group['Index'], group['Type'], group['Content']):
+            h.update(('\x1e%s\x1f%s\x1f%s' % (Index, Type, Content)).encode('utf-8'))
+        keys[SourceFile] = h.hexdigest()
+    return keys
+
+
+class ResultStore:
+    """SQLite store of paragraph and resolution results for one reference data fingerprint."""
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.paragraph_hits = 0
+        with self._connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS paragraphs ('
+                               'stage TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL, '
+                               'PRIMARY KEY (stage, key))')
+            connection.execute('CREATE TABLE IF NOT EXISTS resolutions ('
+                               'SourceFile TEXT PRIMARY KEY, key TEXT NOT NULL, '
+                               'paragraphs TEXT NOT NULL, resolution TEXT)')
+            connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            row = connection.execute("SELECT value FROM meta WHERE name = 'fingerprint'").fetchone()
+            if row is None or row[0] != fingerprint:
+                # Every key includes the fingerprint, so none of the entries of another one can be found again.
+                connection.execute('DELETE FROM paragraphs')
+                connection.execute('DELETE FROM resolutions')
+                connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('fingerprint', ?)", (fingerprint,))
+        connection.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60)
+
+    def paragraph_key(self, Type, Content):
+        return hashlib.sha256(('%s\x1f%s\x1f%s' % (self.fingerprint, Type, Content)).encode('utf-8')).hexdigest()
+
+    def get_paragraph_results(self, stage, keys):
+        """``{key: result}`` for the keys of ``stage`` present in the store."""
+        found = dict()
+        unique_keys = list(set(keys))
+        connection = self._connect()
+        try:
+            for start in range(0, len(unique_keys), QUERY_BATCH):
+                chunk = unique_keys[start:start + QUERY_BATCH]
+                query = 'SELECT key, result FROM paragraphs WHERE stage = ? AND key IN (%s)' % ','.join('?' * len(chunk))
+                for key, result in connection.execute(query, [stage] + chunk):
+                    found[key] = json.loads(result)
+        finally:
+            connection.close()
+        self.paragraph_hits += len(found)
+        return found
+
+    def put_paragraph_results(self, stage, results):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany('INSERT OR REPLACE INTO paragraphs (stage, key, result) VALUES (?, ?, ?)',
+                                       [(stage, key, _dumps(result)) for key, result in results.items()])
+        finally:
+            connection.close()
+
+    def get_resolutions(self, keys):
+        """``{SourceFile: (paragraph records, resolution record)}`` of the resolutions stored under ``keys``."""
+        found = dict()
+        source_files = list(keys)
+        connection = self._connect()
+        try:
+            for start in range(0, len(source_files), QUERY_BATCH):
+                chunk = source_files[start:start + QUERY_BATCH]
+                query = ('SELECT SourceFile, key, paragraphs, resolution FROM resolutions WHERE SourceFile IN (%s)'
+                         % ','.join('?' * len(chunk)))
+                for SourceFile, key, paragraphs, resolution in connection.execute(query, chunk):
+                    if keys[SourceFile] == key:
+                        found[SourceFile] = (
+                                [_restore_record(record) for record in json.loads(paragraphs)],
+                                _restore_record(json.loads(resolution)) if resolution is not None else None,
+                                )
+        finally:
+            connection.close()
+        return found
+
+    def put_resolutions(self, UN_DOCS_Paragraphs, UN_DOCS_Resolutions, keys, input_columns):
+        """Store the computed columns of every resolution of ``UN_DOCS_Paragraphs``."""
+        computed_columns = [column for column in UN_DOCS_Paragraphs.columns if column not in input_columns]
+        resolution_records = {record['SourceFile']: record for record in UN_DOCS_Resolutions.to_dict('records')}
+        docs = UN_DOCS_Paragraphs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+        rows = []
+        for SourceFile, group in docs.groupby('SourceFile', sort=False, observed=True):
+            resolution = resolution_records.get(SourceFile)
+            rows.append((
+                    SourceFile,
+                    keys[SourceFile],
+                    _dumps(group[computed_columns].to_dict('records')),
+                    _dumps(resolution) if resolution is not None else None,
+                    ))
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany('INSERT OR REPLACE INTO resolutions (SourceFile, key, paragraphs, resolution) '
+                                       'VALUES (?, ?, ?, ?)', rows)
+        finally:
+            connection.close()
+
+
+def _stored_frames(UN_DOCS_Paragraphs, stored):
+    """Rebuild the output frames of the unchanged resolutions from their stored records."""
+    docs = UN_DOCS_Paragraphs.sort_values(by=['SourceFile', 'Index'], kind='mergesort')
+    records = []
+    resolutions = []
+    for SourceFile, group in docs.groupby('SourceFile', sort=False, observed=True):
+        paragraph_records, resolution = stored[SourceFile]
+        records.extend(paragraph_records)
+        if resolution is not None:
+            resolutions.append(resolution)
+    computed = pd.DataFrame(records, index=docs.index)
+    return pd.concat([docs, computed], axis=1), pd.DataFrame(resolutions)
+
+
+def _incremental_chunk(UN_DOCS_Paragraphs, ref, store, reference_data_kwargs, workers, executor, metrics=None):
+    input_columns = list(UN_DOCS_Paragraphs.columns)
+    keys = resolution_keys(UN_DOCS_Paragraphs, ref.fingerprint)
+    stored = store.get_resolutions(keys)
+
+    changed_rows = ~UN_DOCS_Paragraphs['SourceFile'].isin(list(stored.keys()))
+    changed = UN_DOCS_Paragraphs.loc[changed_rows]
+    results = []
+    if len(changed.index) > 0:
+        if workers > 1:
+            paragraphs, resolutions = run_sharded(changed, reference_data_kwargs, workers, store_path=store.path,
+                                                  executor=executor, metrics=metrics)
+        else:
+            paragraphs, resolutions = extract_paragraph_level(changed, ref, store=store, metrics=metrics)
+        store.put_resolutions(paragraphs, resolutions, keys, input_columns)
+        results.append((paragraphs, resolutions))
+    if changed_rows.sum() < len(UN_DOCS_Paragraphs.index):
+        results.append(_stored_frames(UN_DOCS_Paragraphs.loc[~changed_rows], stored))
+
+    UN_DOCS_Paragraphs, UN_DOCS_Resolutions = merge_shard_results(results)
+    return UN_DOCS_Paragraphs, UN_DOCS_Resolutions, sorted(str(x) for x in changed['SourceFile'].unique())
+
+
+def iter_incremental(chunks, reference_data_kwargs, store_path, workers=1, metrics=None):
+    """``run_incremental`` on every chunk of ``chunks`` (frames of whole resolutions), yielded as computed."""
+    ref = ReferenceData(**reference_data_kwargs)
+    store = ResultStore(store_path, ref.fingerprint)
+    if workers > 1:
+        with shard_pool(reference_data_kwargs, workers, store_path) as executor:
+            for chunk in chunks:
+                yield _incremental_chunk(chunk, ref, store, reference_data_kwargs, workers, executor, metrics)
+    else:
+        for chunk in chunks:
+            yield _incremental_chunk(chunk, ref, store, reference_data_kwargs, workers, None, metrics)
+
+
+def run_incremental(UN_DOCS_Paragraphs, reference_data_kwargs, store_path, workers=1):
+    """Paragraph level extraction that only recomputes new or changed resolutions.
+
+    Returns the same frames as ``extract_paragraph_level`` on the whole corpus,
+    plus the list of the ``SourceFile``s that were recomputed.
+    """
+    return next(iter_incremental([UN_DOCS_Paragraphs], reference_data_kwargs, store_path, workers))
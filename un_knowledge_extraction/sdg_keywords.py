@@ -0,0 +1,127 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Keyword SDG tagging of the paragraphs, driven by a rule file.
+
+Every rule of ``sdg_keyword_rules.json`` names an SDG and the words that tag
+a paragraph with it::
+
+    {"sdg": "Reduced Inequalities",
+     "tokens": ["inequalities", "inequality"],
+     "phrases": [],
+     "required_tokens": [],
+     "excluded_phrases": ["gender equality"]}
+
+A rule matches when one of its ``tokens`` is a token of the paragraph or one
+of its ``phrases`` occurs in the lowercased paragraph text (a rule with
+neither always passes this test), all its ``required_tokens`` are tokens of
+the paragraph and none of its ``excluded_phrases`` occurs in the text.
+Missing keys are empty lists.
+
+``SDGKeywordRules`` compiles the rules once: tokens go to a dictionary from
+token to rules, every phrase of every rule to a single ``Gazetteer``, so a
+paragraph costs one lookup per distinct token and one scan of its text
+whatever the number of rules. ``mode='first'`` reports the first matching
+rule in file order, as the original ``elif`` chain did; ``mode='all'``
+reports the SDG of every matching rule.
+
+``rules_from_high_frequency_words`` turns
+``ReferenceData.SDG_Targets_Indicators_High_Frequency_Words`` into token
+rules, one per SDG.
+"""
+
+import json
+
+from .gazetteer import Gazetteer
+
+
+SDG_KEYWORD_RULES_FILE = 'sdg_keyword_rules.json'
+SDG_KEYWORD_MODES = ['first', 'all']
+
+_RULE_KEYS = ['tokens', 'phrases', 'required_tokens', 'excluded_phrases']
+
+
+def normalize_rule(rule):
+    """``rule`` with every key present and every word lowercased."""
+    normalized = {'sdg': rule['sdg']}
+    for key in _RULE_KEYS:
+        normalized[key] = [word.lower() for word in rule.get(key, [])]
+    unknown = set(rule) - set(normalized)
+    if unknown:
+        raise ValueError('unknown keys %s in the SDG keyword rule of %s' % (sorted(unknown), rule['sdg']))
+    return normalized
+
+
+def load_sdg_keyword_rules(path):
+    with open(path, encoding='utf-8') as f:
+        return [normalize_rule(rule) for rule in json.load(f)['rules']]
+
+
+def rules_from_high_frequency_words(high_frequency_words, min_count=1, exclude=()):
+    """One token rule per SDG with its high frequency words counted at least ``min_count`` times."""
+    exclude = set(exclude)
+    rules = []
+    for sdg, words in high_frequency_words.items():
+        tokens = [word for word, count in words if count >= min_count and word not in exclude]
+        if tokens:
+            rules.append(normalize_rule({'sdg': sdg, 'tokens': tokens}))
+    return rules
+
+
+class SDGKeywordRules:
+    """Keyword SDG rules compiled for matching many paragraphs."""
+
+    def __init__(self, rules, mode='first'):
+        if mode not in SDG_KEYWORD_MODES:
+            raise ValueError('unknown SDG keyword mode %r, expected one of %s' % (mode, SDG_KEYWORD_MODES))
+        self.rules = [normalize_rule(rule) for rule in rules]
+        self.mode = mode
+
+        self._token_rules = dict()
+        self._always = []
+        phrases = []
+        self._phrase_rules = []
+        for i, rule in enumerate(self.rules):
+            for token in set(rule['tokens']):
+                self._token_rules.setdefault(token, []).append(i)
+            for phrase in rule['phrases']:
+                phrases.append(phrase)
+                self._phrase_rules.append((i, False))
+            for phrase in rule['excluded_phrases']:
+                phrases.append(phrase)
+                self._phrase_rules.append((i, True))
+            if not rule['tokens'] and not rule['phrases']:
+                self._always.append(i)
+        self._required_tokens = [frozenset(rule['required_tokens']) for rule in self.rules]
+        self._phrases = Gazetteer(phrases)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def match_indices(self, token_set, text):
+        """Indices of the matching rules, in rule order, given the paragraph tokens and lowercased text."""
+        candidates = set(self._always)
+        for token in token_set:
+            rules = self._token_rules.get(token)
+            if rules is not None:
+                candidates.update(rules)
+        excluded = set()
+        for phrase_index in self._phrases.match_indices(text):
+            i, is_excluded = self._phrase_rules[phrase_index]
+            if is_excluded:
+                excluded.add(i)
+            else:
+                candidates.add(i)
+        matching = [i for i in sorted(candidates)
+                    if i not in excluded and self._required_tokens[i] <= token_set]
+        if self.mode == 'first':
+            return matching[:1]
+        return matching
+
+    def match(self, token_set, text):
+        """SDGs of the matching rules, without duplicates."""
+        sdgs = []
+        for i in self.match_indices(token_set, text):
+            if self.rules[i]['sdg'] not in sdgs:
+                sdgs.append(self.rules[i]['sdg'])
+        return sdgs
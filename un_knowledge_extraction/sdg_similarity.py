@@ -0,0 +1,216 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Batched paragraph to SDG target/indicator similarity.
+
+For every (paragraph, target) pair the original loop took the three longest
+common substrings reported by ``difflib``, kept the words of those substrings
+that are tokens of the paragraph, summed their word2vec vectors and compared
+the sum with the summed vector of the target. ``SDGSimilarityEngine`` keeps
+that scoring rule but
+
+* precompiles one ``SequenceMatcher`` per target/indicator, so ``difflib``
+  indexes each target once instead of once per paragraph,
+* prunes the targets/indicators scored for a paragraph through an inverted
+  index on their (non stop word) tokens, and
+* computes the cosine similarities of a whole batch of paragraphs with NumPy
+  against a precomputed, row-normalized target/indicator matrix.
+
+With ``prune=False`` every target and indicator is scored and the results are
+the ones of the original loop. Pruning (the default) changes the output: a
+target sharing no word but stop words with the paragraph is not scored and
+counts as 0, while the original loop could give it a score from the stop
+words or word fragments of the common substrings. The
+``Closest_Target_Similarity_Score`` and ``Closest_Indicator_Similarity_Score``
+of a paragraph are then the best scores of the pruned targets, and can be
+lower than those of the original loop; ``paragraphs --no-sdg-pruning`` gives
+the original scores.
+"""
+
+import difflib
+from collections import namedtuple
+
+import numpy as np
+
+from .normalization import alpha_tokens, word_tokenize
+
+
+SDGMatch = namedtuple('SDGMatch', [
+    'target_score',
+    'indicator_score',
+    'closest_target',
+    'closest_indicator',
+    'sdg',
+    'top_targets',
+    'top_indicators',
+])
+
+
+def summed_vector(words, w2v):
+    """Sum of the word2vec vectors of ``words`` that are in the vocabulary, or ``None``."""
+    words_in_vocab = [word for word in words if word in w2v.vocab]
+    if len(words_in_vocab) == 0:
+        return None
+    return np.sum(w2v[words_in_vocab], axis=0)
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SDGCatalog:
+    """Targets or indicators of the SDG framework, precompiled for scoring."""
+
+    def __init__(self, contents, w2v, tokenize=word_tokenize, stop_words=()):
+        self.contents = list(contents)
+        self.tokens = [alpha_tokens(content, tokenize) for content in self.contents]
+        self.isalpha = [' '.join(tokens) for tokens in self.tokens]
+        self.word_counts = [len(text.split()) for text in self.isalpha]
+
+        self.vectors = np.zeros((len(self.contents), w2v.vector_size))
+        for i, tokens in enumerate(self.tokens):
+            vector = summed_vector(tokens, w2v)
+            if vector is not None:
+                self.vectors[i] = vector
+        self.normalized_vectors = _normalize_rows(self.vectors)
+
+        self.matchers = []
+        for text in self.isalpha:
+            matcher = difflib.SequenceMatcher(None)
+            matcher.set_seq2(text)
+            self.matchers.append(matcher)
+
+        stop_words = set(stop_words)
+        self.index = dict()
+        for i, tokens in enumerate(self.tokens):
+            for token in set(tokens):
+                if token not in stop_words:
+                    self.index.setdefault(token, []).append(i)
+
+    def __len__(self):
+        return len(self.contents)
+
+    def candidates(self, paragraph_tokens, min_shared_tokens=1):
+        """Indices of the entries sharing at least ``min_shared_tokens`` indexed tokens."""
+        shared = dict()
+        for token in set(paragraph_tokens):
+            for i in self.index.get(token, ()):
+                shared[i] = shared.get(i, 0) + 1
+        return sorted(i for i, count in shared.items() if count >= min_shared_tokens)
+
+    def common_substring_words(self, i, paragraph_isalpha, paragraph_token_set):
+        """Words of the three longest common substrings that are paragraph tokens."""
+        matcher = self.matchers[i]
+        matcher.set_seq1(paragraph_isalpha)
+        blocks = sorted(matcher.get_matching_blocks(), key=lambda block: block[2], reverse=True)[:3]
+        aggregated = ' '.join(paragraph_isalpha[block.a:block.a + block.size] for block in blocks)
+        return [word for word in aggregated.split() if word in paragraph_token_set]
+
+
+class SDGSimilarityEngine:
+    """Find the closest SDG target or indicator of many paragraphs at once."""
+
+    def __init__(self, targets, indicators, targets_sdg, indicators_sdg, w2v,
+                 threshold_target=0.9, threshold_indicator=0.9,
+                 prune=True, min_shared_tokens=1, stop_words=(), tokenize=word_tokenize):
+        self.w2v = w2v
+        self.targets = SDGCatalog(targets, w2v, tokenize, stop_words)
+        self.indicators = SDGCatalog(indicators, w2v, tokenize, stop_words)
+        self.targets_sdg = targets_sdg
+        self.indicators_sdg = indicators_sdg
+        self.threshold_target = threshold_target
+        self.threshold_indicator = threshold_indicator
+        self.prune = prune
+        self.min_shared_tokens = min_shared_tokens
+        self.tokenize = tokenize
+        self.difflib_calls = 0
+
+    def _score_catalog(self, catalog, batch_tokens):
+        """Return one score array (over the whole catalog) per paragraph of the batch."""
+        pair_paragraph = []
+        pair_entry = []
+        pair_fallback = []
+        word_pair = []
+        words = []
+        for p, paragraph_tokens in enumerate(batch_tokens):
+            if self.prune:
+                entries = catalog.candidates(paragraph_tokens, self.min_shared_tokens)
+            else:
+                entries = range(len(catalog))
+            paragraph_isalpha = ' '.join(paragraph_tokens)
+            paragraph_token_set = set(paragraph_tokens)
+            for i in entries:
+                self.difflib_calls += 1
+                common_words = catalog.common_substring_words(i, paragraph_isalpha, paragraph_token_set)
+                in_vocab = [word for word in common_words if word in self.w2v.vocab]
+                pair = len(pair_paragraph)
+                pair_paragraph.append(p)
+                pair_entry.append(i)
+                if in_vocab:
+                    pair_fallback.append(None)
+                    word_pair.extend([pair] * len(in_vocab))
+                    words.extend(in_vocab)
+                else:
+                    pair_fallback.append(len(common_words) / catalog.word_counts[i] if catalog.word_counts[i] else 0.0)
+
+        scores = np.zeros((len(batch_tokens), len(catalog)))
+        if not pair_paragraph:
+            return scores
+        pair_paragraph = np.asarray(pair_paragraph)
+        pair_entry = np.asarray(pair_entry)
+        pair_scores = np.zeros(len(pair_entry))
+
+        if words:
+            unique_words, word_index = np.unique(np.asarray(words, dtype=object), return_inverse=True)
+            word_vectors = np.asarray(self.w2v[list(unique_words)], dtype=np.float64)
+            sums = np.zeros((len(pair_entry), word_vectors.shape[1]))
+            np.add.at(sums, np.asarray(word_pair), word_vectors[word_index])
+            sums = _normalize_rows(sums)
+            pair_scores = np.einsum('ij,ij->i', sums, catalog.normalized_vectors[pair_entry])
+
+        for pair, fallback in enumerate(pair_fallback):
+            if fallback is not None:
+                pair_scores[pair] = fallback
+        scores[pair_paragraph, pair_entry] = pair_scores
+        return scores
+
+    def _top_k(self, catalog, scores, top_k):
+        order = np.argsort(-scores, kind='stable')[:top_k]
+        return [(catalog.contents[i], float(scores[i])) for i in order if scores[i] > 0]
+
+    def match_tokens(self, paragraphs_tokens, batch_size=256, top_k=None):
+        """Yield an ``SDGMatch`` per paragraph, given its ``normalization.alpha_tokens``."""
+        paragraphs_tokens = list(paragraphs_tokens)
+        for start in range(0, len(paragraphs_tokens), batch_size):
+            batch = paragraphs_tokens[start:start + batch_size]
+            target_scores = self._score_catalog(self.targets, batch)
+            indicator_scores = self._score_catalog(self.indicators, batch)
+            for p in range(len(batch)):
+                yield self._decide(target_scores[p], indicator_scores[p], top_k)
+
+    def match(self, paragraphs, batch_size=256, top_k=None):
+        """Yield an ``SDGMatch`` per raw paragraph text."""
+        return self.match_tokens((alpha_tokens(paragraph, self.tokenize) for paragraph in paragraphs),
+                                 batch_size=batch_size, top_k=top_k)
+
+    def _decide(self, target_scores, indicator_scores, top_k):
+        max_target = float(target_scores.max()) if len(target_scores) else 0.0
+        max_indicator = float(indicator_scores.max()) if len(indicator_scores) else 0.0
+        closest_target = None
+        closest_indicator = None
+        sdg = None
+        if max_target >= self.threshold_target and max_target >= max_indicator:
+            closest_target = self.targets.contents[int(np.argmax(target_scores))]
+            sdg = self.targets_sdg[closest_target]
+        elif max_indicator >= self.threshold_indicator and max_target <= max_indicator:
+            closest_indicator = self.indicators.contents[int(np.argmax(indicator_scores))]
+            sdg = self.indicators_sdg[closest_indicator]
+        top_targets = None
+        top_indicators = None
+        if top_k:
+            top_targets = self._top_k(self.targets, target_scores, top_k)
+            top_indicators = self._top_k(self.indicators, indicator_scores, top_k)
+        return SDGMatch(max_target, max_indicator, closest_target, closest_indicator,
+                        sdg, top_targets, top_indicators)
@@ -0,0 +1,211 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Synthetic UN resolution corpus for benchmarks.
+
+``UN_RES_DOCS_2009_2018.csv`` and the UNBIS thesaurus are not part of the
+repository. ``write_data_dir`` builds a data directory the scripts can run on
+from the reference files of ``Data/``: it copies them, writes an
+``UNBIS_terms.csv`` of terms taken from the SDG targets and indicators when
+``Data/`` has none, and generates a corpus of about ``paragraphs`` paragraph
+rows::
+
+    python -m un_knowledge_extraction.synthetic_corpus --paragraphs 10000 --output-dir ./benchmark/data/
+
+Every resolution has the ``Session``, ``AgendaItem`` and ``Title`` rows and
+the adoption date paragraph the resolution level script reads, then
+preambular paragraphs starting with a verb of ``preambular_verb_list.txt``
+and numbered operative paragraphs starting with a verb of
+``operative_verb_list.txt``, some continued by lowercase sub-paragraphs. The
+paragraphs cite earlier resolutions, name countries and organizations of the
+country and organization lists, use UNBIS terms and quote SDG targets and
+indicators. The same ``seed`` always gives the same corpus.
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import shutil
+from collections import Counter
+
+import pandas as pd
+
+from .ingestion import CORPUS_FILE
+from .reference_data import REFERENCE_FILES, read_lines
+from .sdg_keywords import SDG_KEYWORD_RULES_FILE
+
+
+UNBIS_TERMS_FILE = 'UNBIS_terms.csv'
+DEFAULT_SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Data')
+
+# Sessions of the General Assembly from 2009 to 2018; session ``n`` adopts its resolutions in ``1945 + n``.
+SESSIONS = {
+        64: 'Sixty-fourth', 65: 'Sixty-fifth', 66: 'Sixty-sixth', 67: 'Sixty-seventh', 68: 'Sixty-eighth',
+        69: 'Sixty-ninth', 70: 'Seventieth', 71: 'Seventy-first', 72: 'Seventy-second', 73: 'Seventy-third',
+        }
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+FILLERS = [
+        'in accordance with the Charter of the United Nations',
+        'for the people of the world in all regions',
+        'with the full participation of all Member States',
+        'taking into account the needs of developing countries',
+        'within existing resources and in a transparent manner',
+        'at the national, regional and international levels',
+        'and requests the Secretary-General to report thereon at its next session',
+        ]
+
+_STOP_WORDS = {
+        'a', 'all', 'an', 'and', 'any', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'including', 'into', 'its',
+        'of', 'on', 'or', 'other', 'per', 'such', 'that', 'the', 'their', 'to', 'with', 'within',
+        }
+_WORD = re.compile(r'[A-Za-z][a-z]+')
+
+
+def synthetic_unbis_terms(texts, count=2000):
+    """The ``count`` most frequent one and two word phrases of ``texts`` without stop words, title cased."""
+    phrases = Counter()
+    for text in texts:
+        words = [word.lower() for word in _WORD.findall(text)]
+        for i, word in enumerate(words):
+            if word in _STOP_WORDS:
+                continue
+            phrases[word] += 1
+            if i + 1 < len(words) and words[i + 1] not in _STOP_WORDS:
+                phrases[word + ' ' + words[i + 1]] += 1
+    ranked = sorted(phrases.items(), key=lambda item: (-item[1], item[0]))
+    return [phrase.title() for phrase, _ in ranked[:count]]
+
+
+class SyntheticCorpus:
+    """Generator of synthetic resolutions from the verb, country and organization lists of ``source_dir``."""
+
+    def __init__(self, source_dir=DEFAULT_SOURCE_DIR, unbis_terms=None, seed=0):
+        self.preambular_verbs = [verb for verb in read_lines(os.path.join(source_dir, 'preambular_verb_list.txt')) if verb]
+        self.operative_verbs = [verb for verb in read_lines(os.path.join(source_dir, 'operative_verb_list.txt')) if verb]
+        countries = pd.read_excel(os.path.join(source_dir, 'country_list.xlsx')).fillna('')
+        self.countries = [country.strip() for country in countries['Country'] if country.strip()]
+        organizations = (pd.read_excel(os.path.join(source_dir, 'agencies.xlsx')).fillna('')['Title'].tolist()
+                         + pd.read_excel(os.path.join(source_dir, 'un_entities_20191017.xlsx')).fillna('')['Entity'].tolist())
+        self.organizations = sorted(set(str(org).strip() for org in organizations if str(org).strip()))
+        sdg = pd.read_csv(os.path.join(source_dir, 'SDG_Targets_Indicators.csv'), encoding='cp1252')
+        self.sdg_texts = [str(text).strip() for text in sdg['Content'].dropna()]
+        self.unbis_terms = unbis_terms if unbis_terms is not None else synthetic_unbis_terms(self.sdg_texts)
+        self.seed = seed
+
+    def _date(self, rng, year):
+        return '%d %s %d' % (rng.randint(1, 28), rng.choice(MONTHS), year)
+
+    def _citation(self, rng, session):
+        cited = rng.randint(session - 10, session - 1)
+        number = rng.randint(1, 300)
+        form = rng.randrange(4)
+        if form == 0:
+            return 'its resolution %d/%d of %s' % (cited, number, self._date(rng, 1945 + cited))
+        if form == 1:
+            return 'resolutions %d/%d and %d/%d' % (cited, number, cited - 1, rng.randint(1, 300))
+        if form == 2:
+            return 'resolution %d/%d' % (cited, number)
+        return 'resolutions %d/%d of %s and %d/%d of %s' % (
+                cited, number, self._date(rng, 1945 + cited),
+                cited + 1, rng.randint(1, 300), self._date(rng, 1946 + cited))
+
+    def _clause(self, rng, session):
+        kind = rng.randrange(6)
+        if kind == 0:
+            return self._citation(rng, session)
+        if kind == 1:
+            return 'the work of the %s' % rng.choice(self.organizations)
+        if kind == 2:
+            return 'the efforts of %s and %s' % (rng.choice(self.countries), rng.choice(self.countries))
+        if kind == 3:
+            text = rng.choice(self.sdg_texts)
+            return text[0].lower() + text[1:]
+        if kind == 4:
+            return 'on %s and %s' % (rng.choice(self.unbis_terms).lower(), rng.choice(self.unbis_terms).lower())
+        return rng.choice(FILLERS)
+
+    def _text(self, rng, session):
+        return ', '.join(self._clause(rng, session) for _ in range(rng.randint(2, 4))) + ', ' + rng.choice(FILLERS)
+
+    def resolution_rows(self, rng, session, number, paragraphs):
+        """``(Type, Content)`` rows of one resolution with ``paragraphs`` paragraph rows."""
+        year = 1945 + session
+        rows = [
+                ('Session', '%s session' % SESSIONS[session]),
+                ('AgendaItem', 'Agenda item %d' % rng.randint(1, 180)),
+                ('Title', '%d/%d. %s' % (session, number, rng.choice(self.unbis_terms))),
+                ('Paragraph', 'Resolution adopted by the General Assembly on %d December %d' % (rng.randint(1, 28), year)),
+                ]
+        remaining = paragraphs - 1
+        preambular = remaining * 2 // 5
+        for _ in range(preambular):
+            rows.append(('Paragraph', '%s %s' % (rng.choice(self.preambular_verbs).capitalize(), self._text(rng, session))))
+        operative = 0
+        for _ in range(remaining - preambular):
+            if operative and rng.random() < 0.1:
+                rows.append(('Paragraph', 'to %s' % self._text(rng, session)))
+            else:
+                operative += 1
+                rows.append(('Paragraph', '%d. %s %s' % (operative, rng.choice(self.operative_verbs).capitalize(),
+                                                          self._text(rng, session))))
+        return rows
+
+    def rows(self, paragraphs):
+        """``(SourceFile, Index, Type, Content)`` rows of resolutions with ``paragraphs`` paragraph rows in total."""
+        rng = random.Random(self.seed)
+        sessions = sorted(SESSIONS)
+        numbers = Counter()
+        while paragraphs > 0:
+            session = rng.choice(sessions)
+            numbers[session] += 1
+            count = min(paragraphs, rng.randint(8, 40))
+            paragraphs -= count
+            SourceFile = 'A_RES_%d_%d.pdf' % (session, numbers[session])
+            for Index, (Type, Content) in enumerate(self.resolution_rows(rng, session, numbers[session], count)):
+                yield SourceFile, Index, Type, Content
+
+    def write(self, path, paragraphs):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['SourceFile', 'Index', 'Type', 'Content'])
+            writer.writerows(self.rows(paragraphs))
+
+
+def write_data_dir(output_dir, paragraphs, source_dir=DEFAULT_SOURCE_DIR, seed=0):
+    """Copy the reference files of ``source_dir`` to ``output_dir`` and write a synthetic corpus next to them."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name in REFERENCE_FILES + [SDG_KEYWORD_RULES_FILE]:
+        path = os.path.join(source_dir, name)
+        if os.path.exists(path):
+            shutil.copyfile(path, os.path.join(output_dir, name))
+    unbis_terms_path = os.path.join(source_dir, UNBIS_TERMS_FILE)
+    unbis_terms = None
+    if os.path.exists(unbis_terms_path):
+        unbis_terms = pd.read_csv(unbis_terms_path, encoding='cp1252')['Term'].dropna().tolist()
+    corpus = SyntheticCorpus(source_dir, unbis_terms, seed)
+    if unbis_terms is None:
+        pd.DataFrame({'Term': corpus.unbis_terms}).to_csv(
+                os.path.join(output_dir, UNBIS_TERMS_FILE), index=False, encoding='cp1252')
+    corpus.write(os.path.join(output_dir, CORPUS_FILE), paragraphs)
+    return output_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a data directory with a synthetic UN resolution corpus.')
+    parser.add_argument('--paragraphs', type=int, default=10000, help='paragraph rows of the corpus (default: 10000)')
+    parser.add_argument('--output-dir', default='./benchmark/data/')
+    parser.add_argument('--source-dir', default=DEFAULT_SOURCE_DIR,
+                        help='directory of the reference files (default: the Data directory of the repository)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    write_data_dir(args.output_dir, args.paragraphs, args.source_dir, args.seed)
+    print('wrote a corpus of %d paragraphs to %s' % (args.paragraphs, args.output_dir))
+
+
+if __name__ == '__main__':
+    main()